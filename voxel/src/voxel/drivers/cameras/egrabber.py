@@ -319,6 +319,18 @@ class VieworksCamera(SpimCamera):
 
     def grab_frame(self) -> np.ndarray:
         """Grab a frame from the camera buffer."""
+        return self._grab(out=None)
+
+    def grab_frame_into(self, out: np.ndarray) -> None:
+        """Grab a frame from the camera buffer, copying it once into `out`.
+
+        The copy happens while the GenTL buffer is still held, so `out` never
+        aliases memory that the grabber recycles.
+        """
+        self._grab(out=out)
+
+    def _grab(self, out: np.ndarray | None) -> np.ndarray:
+        """Wait for the next GenTL buffer and return it, or copy it into `out`."""
         # Note: creating the buffer and then "pushing" it at the end has the
         #   effect of moving the internal camera frame buffer from the output
         #   pool back to the input pool, so it can be reused.
@@ -342,7 +354,11 @@ class VieworksCamera(SpimCamera):
             buffer_size = column_count * row_count * bytes_per_pixel
             data = ct.cast(ptr, ct.POINTER(ct.c_ubyte * buffer_size)).contents
             frame = np.frombuffer(data, count=column_count * row_count, dtype=self.pixel_type.dtype)
-            return frame.reshape((row_count, column_count))
+            frame = frame.reshape((row_count, column_count))
+            if out is None:
+                return frame
+            np.copyto(out, frame)
+            return out
 
     def stop(self) -> None:
         """Stop the camera from acquiring frames."""
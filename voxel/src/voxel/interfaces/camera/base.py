@@ -239,6 +239,22 @@ class SpimCamera(SpimDevice):
             RuntimeError: If the camera is not started.
         """
 
+    def grab_frame_into(self, out: np.ndarray) -> None:
+        """Grab a frame from the camera buffer directly into a caller-owned array.
+
+        Intended for zero-copy acquisition into writer shared memory
+        (see `FrameSlotWriter.acquire_frame_slot`). The default copies the
+        result of `grab_frame`; drivers that can read their DMA buffer
+        directly should override this to copy exactly once.
+
+        Arguments:
+            out: Writable array of shape (height, width) and the camera's pixel dtype.
+
+        Raises:
+            RuntimeError: If the camera is not started.
+        """
+        np.copyto(out, self.grab_frame())
+
     @abstractmethod
     @describe(label="Stop", desc="Stop the camera acquisition.")
     def stop(self) -> None:
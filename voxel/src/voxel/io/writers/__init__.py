@@ -34,12 +34,18 @@ Example:
     ```
 """
 
-from .protocol import VoxelWriter
+from .adaptive import CompressionController
+from .codec import CodecSpec, get_codec, register_codec
+from .engine import FrameSlot, WriterPool
+from .noise import NoiseQuantizer
+from .protocol import FrameSlotWriter, VoxelWriter
 from .types import (
     BufferStage,
     BufferStatus,
     Dtype,
     FrameShape,
+    NoiseQuantization,
+    OverflowPolicy,
     Position,
     StreamMetrics,
     StreamStatus,
@@ -47,24 +53,53 @@ from .types import (
     VoxelSize,
     WriterConfig,
 )
+from .fanout import FanOutWriter, MaxProjectionSink, OverviewSink
 from .imaris import ImarisWriter
 from .ometiff import OMETiffWriter
 from .omezarr import OMEZarrWriter, create_ozw_config
+from .pyramid import PyramidBuilder, build_pyramid
+from .raw import RawStack, RawStreamWriter, convert_raw_stacks
+from .shardzarr import ShardedZarrWriter
+from .split import SplitOMETiffWriter
+from .staged import StagedWriter
+from .zarrstore import ZarrStore
 
 __all__ = [
     "BufferStage",
     "BufferStatus",
+    "CodecSpec",
+    "CompressionController",
     "Dtype",
+    "FanOutWriter",
     "FrameShape",
+    "FrameSlot",
+    "FrameSlotWriter",
     "ImarisWriter",
+    "MaxProjectionSink",
+    "NoiseQuantization",
+    "NoiseQuantizer",
     "OMETiffWriter",
     "OMEZarrWriter",
+    "OverflowPolicy",
+    "OverviewSink",
     "Position",
+    "PyramidBuilder",
+    "RawStack",
+    "RawStreamWriter",
+    "ShardedZarrWriter",
+    "SplitOMETiffWriter",
+    "StagedWriter",
     "StreamMetrics",
     "StreamStatus",
     "VolumeShape",
     "VoxelWriter",
     "VoxelSize",
     "WriterConfig",
+    "WriterPool",
+    "ZarrStore",
+    "build_pyramid",
+    "convert_raw_stacks",
     "create_ozw_config",
+    "get_codec",
+    "register_codec",
 ]
@@ -0,0 +1,181 @@
+"""Adaptive compression level that tracks the acquisition rate.
+
+A fixed codec level either wastes disk on tiles that compress easily or falls
+behind on dense ones. CompressionController picks the level batch by batch:
+it steps down as soon as the writer falls behind and creeps back up while
+there is sustained headroom, so output keeps pace with acquisition at the
+strongest compression the data and CPU allow.
+
+Two signals drive it, both measured by WriterProcess in the writer subprocess:
+
+    headroom    time between batch submissions / time spent processing a batch
+                (> 1 means the writer is faster than the camera)
+    backlog     batches waiting in the ring behind the one being processed
+
+Hysteresis keeps the level from oscillating: lowering needs one bad batch,
+raising needs `patience` consecutive good ones with an empty backlog and
+headroom above `raise_above`, which sits well above `lower_below`. The
+smoothed headroom is reset after every change so the next decision is based
+on batches encoded at the new level only.
+
+Changing the level mid-stream is safe for every registry codec: Blosc, Zstd
+and gzip decoders don't need the level, so a store written at mixed levels
+reads back with the codec metadata written at the start.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .codec import CodecSpec
+
+MAX_ADAPTIVE_LEVEL = 19
+"""Highest level chosen automatically (Zstd's ultra levels 20-22 need 64-128 MB windows per thread)."""
+
+
+class CompressionController:
+    """Steps a codec's level per batch from the writer's headroom and backlog.
+
+    Writers expose one as `codec_controller` (see AdaptiveBatchProcessor) when
+    `WriterConfig.adaptive_compression` is set. WriterProcess calls update()
+    after every batch and publishes the new level in the shared stats; the
+    writer encodes the next batch with `spec`.
+
+    Example:
+        ```python
+        controller = CompressionController(get_codec("zstd:3"))
+        for batch in batches:
+            encode(batch, controller.spec)
+            controller.update(seconds=0.08, interval_s=0.1, backlog=0, capacity=3)
+        ```
+    """
+
+    def __init__(
+        self,
+        spec: CodecSpec,
+        *,
+        min_level: int | None = None,
+        max_level: int | None = None,
+        lower_below: float = 1.1,
+        raise_above: float = 1.5,
+        patience: int = 4,
+        smoothing: float = 0.5,
+    ) -> None:
+        """Initialize the CompressionController.
+
+        Args:
+            spec: Codec to adapt, starting at its level
+            min_level: Lowest level to use (None = algorithm minimum)
+            max_level: Highest level to use (None = algorithm maximum, at most MAX_ADAPTIVE_LEVEL)
+            lower_below: Step down when the smoothed headroom drops below this
+            raise_above: Step up after `patience` batches with headroom above this and no backlog
+            patience: Consecutive good batches needed before stepping up
+            smoothing: Weight of the newest batch in the smoothed headroom (0-1]
+
+        Raises:
+            ValueError: If the thresholds leave no hysteresis band or smoothing is out of range.
+        """
+        if raise_above <= lower_below or lower_below < 1.0:
+            msg = f"Need 1 <= lower_below < raise_above, got {lower_below} and {raise_above}"
+            raise ValueError(msg)
+        if not 0 < smoothing <= 1:
+            msg = f"smoothing must be in (0, 1], got {smoothing}"
+            raise ValueError(msg)
+
+        low, high = spec.levels
+        self._min_level = max(low, min_level if min_level is not None else low)
+        self._max_level = min(high, max_level if max_level is not None else MAX_ADAPTIVE_LEVEL)
+        self._max_level = max(self._max_level, self._min_level)
+        self._spec = spec.with_level(min(max(spec.level, self._min_level), self._max_level))
+        self._lower_below = lower_below
+        self._raise_above = raise_above
+        self._patience = patience
+        self._smoothing = smoothing
+
+        self._headroom: float | None = None
+        self._good_batches = 0
+        self._changes = 0
+
+    @property
+    def spec(self) -> CodecSpec:
+        """Codec (with level) to encode the next batch with."""
+        return self._spec
+
+    @property
+    def level(self) -> int:
+        """Current level."""
+        return self._spec.level
+
+    @property
+    def headroom(self) -> float:
+        """Smoothed headroom since the last level change (0 before the first batch)."""
+        return self._headroom or 0.0
+
+    @property
+    def changes(self) -> int:
+        """Number of level changes so far."""
+        return self._changes
+
+    def update(self, seconds: float, interval_s: float, backlog: int, capacity: int) -> CodecSpec:
+        """Feed the measurements of one processed batch and pick the level for the next.
+
+        Args:
+            seconds: Time spent processing the batch
+            interval_s: Time between this batch's submission and the previous one's
+            backlog: Batches waiting behind this one
+            capacity: Slots in the ring
+
+        Returns:
+            The codec to use for the next batch.
+        """
+        if seconds <= 0 or interval_s <= 0:
+            return self._spec
+
+        headroom = interval_s / seconds
+        if self._headroom is None:
+            self._headroom = headroom
+        else:
+            self._headroom += self._smoothing * (headroom - self._headroom)
+
+        if backlog >= max(1, capacity // 2) or self._headroom < self._lower_below:
+            self._good_batches = 0
+            if self._spec.level > self._min_level:
+                self._set_level(self._spec.level - 1)
+        elif backlog == 0 and self._headroom > self._raise_above:
+            self._good_batches += 1
+            if self._good_batches >= self._patience and self._spec.level < self._max_level:
+                self._set_level(self._spec.level + 1)
+        else:
+            self._good_batches = 0
+        return self._spec
+
+    def _set_level(self, level: int) -> None:
+        self._spec = self._spec.with_level(level)
+        self._headroom = None
+        self._good_batches = 0
+        self._changes += 1
+
+    def __repr__(self) -> str:
+        return (
+            f"CompressionController(codec={self._spec.label!r}, "
+            f"levels={self._min_level}-{self._max_level}, headroom={self.headroom:.2f})"
+        )
+
+
+def test_compression_controller() -> None:
+    """Simulate a codec whose cost grows with level against a fixed frame interval."""
+    from .codec import get_codec
+
+    controller = CompressionController(get_codec("zstd:3"))
+    interval_s = 0.1
+    for batch in range(60):
+        # Dense tissue halfway through makes every level 3x slower
+        cost = 0.01 * controller.level * (3 if 20 <= batch < 40 else 1)
+        backlog = 2 if cost > interval_s else 0
+        controller.update(cost, interval_s, backlog, capacity=3)
+        print(f"batch {batch:2d}: cost {cost * 1000:5.1f} ms -> {controller}")
+
+
+if __name__ == "__main__":
+    test_compression_controller()
@@ -0,0 +1,356 @@
+"""Chunk/shard/codec autotuning for OME-Zarr output.
+
+Micro-benchmarks candidate layouts by writing a sample of real frames to the
+target storage with the actual writer, then picks the best-compressing layout
+that still keeps up with the camera (or the fastest one if none does).
+Measurements are cached per instrument, storage location, frame geometry,
+dtype and batch size, so a rig only pays for tuning once.
+
+Example:
+    ```python
+    from voxel.io.writers.autotune import tune_config
+
+    sample = np.stack([camera.grab_frame() for _ in range(16)])
+    cfg = tune_config(cfg, sample, instrument="exaspim-01", frame_rate=camera.frame_rate)  # cached after the first call
+
+    with ShardedZarrWriter(cfg) as writer:
+        ...
+    ```
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import socket
+import tempfile
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import psutil
+
+from .engine import WriterPool
+from .formats import open_writer
+from .types import FrameShape, VolumeShape, WriterConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy as np
+
+DEFAULT_CACHE = Path.home() / ".voxel" / "writer_autotune.json"
+"""Where tuned layouts are persisted by default."""
+
+SAMPLE_EDGE = 2048
+"""Frames are cropped to at most this many pixels in y and x while benchmarking."""
+
+BENCH_SHARDS = 4
+"""Shard depths written per candidate, so per-batch cost dominates the first batches' warm-up."""
+
+DEFAULT_CHUNKS = ((64, 64, 64), (32, 128, 128))
+DEFAULT_SHARD_EDGES = (256, 512)
+DEFAULT_CODECS = ("blosc.lz4", "blosc.zstd")
+
+
+@dataclass(frozen=True)
+class LayoutCandidate:
+    """One chunk/shard/codec combination to benchmark."""
+
+    chunk_shape: tuple[int, int, int]
+    shard_shape: tuple[int, int, int]
+    compression: str | None
+
+
+@dataclass(frozen=True)
+class TunedLayout:
+    """Measured layout, as cached and applied to a WriterConfig."""
+
+    chunk_shape: tuple[int, int, int]
+    shard_shape: tuple[int, int, int]
+    compression: str | None
+    throughput_gbs: float
+    ratio: float
+    """Raw size over stored size (higher is better), as in CodecCounts.ratio."""
+
+    def apply(self, cfg: WriterConfig) -> WriterConfig:
+        """Return a copy of cfg using this layout."""
+        return cfg.model_copy(
+            update={
+                "chunk_shape": _volume(self.chunk_shape),
+                "shard_shape": _volume(self.shard_shape),
+                "compression": self.compression,
+            },
+        )
+
+
+class AutotuneCache:
+    """JSON file of measured layouts keyed by instrument, storage location and geometry."""
+
+    def __init__(self, path: Path | str = DEFAULT_CACHE) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: JSON file to read and update
+        """
+        self.path = Path(path)
+
+    @staticmethod
+    def key(
+        instrument: str,
+        target: Path,
+        frame_shape: FrameShape,
+        dtype: str,
+        writer: str,
+        *,
+        batch_size: int,
+    ) -> str:
+        """Cache key for one instrument, storage location and acquisition geometry.
+
+        The storage location is the mount point (drive) holding `target`, so
+        every acquisition written to the same disk shares one set of
+        measurements. The batch size is included because it sets shard depth.
+        """
+        return f"{instrument}|{storage_root(target)}|{frame_shape.y}x{frame_shape.x}|{dtype}|{writer}|b{batch_size}"
+
+    def get(self, key: str) -> list[TunedLayout] | None:
+        """Look up the layouts measured for a key."""
+        entries = self._load().get(key)
+        if entries is None:
+            return None
+        return [
+            TunedLayout(
+                chunk_shape=tuple(entry["chunk_shape"]),
+                shard_shape=tuple(entry["shard_shape"]),
+                compression=entry["compression"],
+                throughput_gbs=entry["throughput_gbs"],
+                ratio=entry["ratio"],
+            )
+            for entry in entries
+        ]
+
+    def put(self, key: str, layouts: Sequence[TunedLayout]) -> None:
+        """Store measured layouts, replacing any previous ones for the key."""
+        entries = self._load()
+        entries[key] = [asdict(layout) for layout in layouts]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps(entries, indent=2))
+        tmp.replace(self.path)
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text())
+
+
+def storage_root(path: Path | str) -> str:
+    """Mount point (or drive) of the filesystem holding path."""
+    resolved = Path(path).resolve()
+    mounts = [p.mountpoint for p in psutil.disk_partitions(all=True) if resolved.is_relative_to(p.mountpoint)]
+    return max(mounts, key=len) if mounts else resolved.anchor
+
+
+def _volume(shape: tuple[int, int, int]) -> VolumeShape:
+    z, y, x = shape
+    return VolumeShape(z=z, y=y, x=x)
+
+
+def default_candidates(
+    sample_shape: FrameShape,
+    batch_size: int,
+    codecs: Sequence[str | None] = DEFAULT_CODECS,
+) -> list[LayoutCandidate]:
+    """Candidate layouts that fit the benchmark frame shape.
+
+    Shards are one batch deep (rounded up to whole chunks) and span
+    DEFAULT_SHARD_EDGES in y/x.
+    """
+    candidates = []
+    for chunk in DEFAULT_CHUNKS:
+        depth = -(-batch_size // chunk[0]) * chunk[0]
+        for edge in DEFAULT_SHARD_EDGES:
+            if edge % chunk[1] or edge % chunk[2] or edge > min(sample_shape.y, sample_shape.x):
+                continue
+            candidates.extend(LayoutCandidate(chunk, (depth, edge, edge), codec) for codec in codecs)
+    return candidates
+
+
+def benchmark_layout(
+    cfg: WriterConfig,
+    candidate: LayoutCandidate,
+    frames: np.ndarray,
+    work_dir: Path,
+    *,
+    writer: str = "zarr-local",
+    threads: int | None = None,
+    pool: WriterPool | None = None,
+) -> TunedLayout:
+    """Write BENCH_SHARDS shards' depth of sample frames with one layout and measure it.
+
+    Only the time from the first frame until every batch is written counts;
+    process startup, buffer allocation and finalization are excluded.
+
+    Args:
+        cfg: Base configuration (dtype, batch size, voxel size)
+        candidate: Layout to test
+        frames: Sample frames (n, y, x), cycled to fill the run
+        work_dir: Directory on the target storage to write into (removed afterwards)
+        writer: Format name for open_writer
+        threads: Writer thread count
+        pool: WriterPool to lease the writer lane from (None = a pool for this run only)
+
+    Returns:
+        TunedLayout with the measured throughput and compression ratio.
+    """
+    frame_count = candidate.shard_shape[0] * BENCH_SHARDS
+    run_cfg = cfg.model_copy(
+        update={
+            "name": "autotune",
+            "path": work_dir,
+            "frame_count": frame_count,
+            "frame_shape": FrameShape(frames.shape[1], frames.shape[2]),
+            "chunk_shape": _volume(candidate.chunk_shape),
+            "shard_shape": _volume(candidate.shard_shape),
+            "compression": candidate.compression,
+            "trace_path": None,
+        },
+    )
+
+    try:
+        with WriterPool(max_workers=1) if pool is None else nullcontext(pool) as lanes:
+            with open_writer(writer, run_cfg, pool=lanes, threads=threads) as w:
+                start = time.perf_counter()
+                for i in range(frame_count):
+                    w.add_frame(frames[i % len(frames)])
+                w.wait_all()
+                seconds = time.perf_counter() - start
+            lanes.wait_all()  # finalized before measuring what was stored
+        stored = sum(f.stat().st_size for f in work_dir.rglob("*") if f.is_file())
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    raw = frame_count * run_cfg.frame_bytes
+    return TunedLayout(
+        chunk_shape=candidate.chunk_shape,
+        shard_shape=candidate.shard_shape,
+        compression=candidate.compression,
+        throughput_gbs=raw / (1024**3) / seconds if seconds > 0 else 0.0,
+        ratio=raw / stored if stored else 0.0,
+    )
+
+
+def select_layout(results: Sequence[TunedLayout], required_gbs: float | None = None) -> TunedLayout:
+    """Best-compressing layout that sustains required_gbs, else the fastest.
+
+    Args:
+        results: Measured layouts (at least one)
+        required_gbs: Throughput the layout must reach (None = pick the fastest)
+    """
+    fast_enough = [r for r in results if required_gbs is not None and r.throughput_gbs >= required_gbs]
+    if fast_enough:
+        return max(fast_enough, key=lambda r: (r.ratio, r.throughput_gbs))
+    return max(results, key=lambda r: (r.throughput_gbs, r.ratio))
+
+
+def autotune_layout(
+    cfg: WriterConfig,
+    frames: np.ndarray,
+    *,
+    instrument: str | None = None,
+    frame_rate: float | None = None,
+    candidates: Sequence[LayoutCandidate] | None = None,
+    writer: str = "zarr-local",
+    threads: int | None = None,
+    cache: AutotuneCache | None = None,
+    force: bool = False,
+) -> TunedLayout:
+    """Find the best chunk/shard/codec layout for cfg.path, using cached measurements when possible.
+
+    The layout with the highest compression ratio among those that sustain
+    frame_rate is chosen; without a frame rate, or if no layout is fast
+    enough, the fastest layout is.
+
+    Args:
+        cfg: Configuration of the acquisition to tune for (cfg.path is the storage benchmarked)
+        frames: Sample of real frames (n, y, x); cropped to SAMPLE_EDGE pixels in y and x
+        instrument: Instrument name for the cache key (None = host name)
+        frame_rate: Camera frame rate (frames/s) the layout must keep up with
+        candidates: Layouts to try (None = default_candidates())
+        writer: Format name for open_writer ("zarr-local" or "ome-zarr")
+        threads: Writer thread count
+        cache: Where to read and persist results (None = DEFAULT_CACHE)
+        force: Re-run the benchmark even if cached measurements exist
+
+    Returns:
+        The best TunedLayout.
+
+    Raises:
+        ValueError: If no candidate could be benchmarked.
+    """
+    from voxel.utils.log import VoxelLogging
+
+    log = VoxelLogging.get_logger(__name__)
+    cache = cache if cache is not None else AutotuneCache()
+    key = AutotuneCache.key(
+        instrument or socket.gethostname(),
+        cfg.path,
+        cfg.frame_shape,
+        cfg.dtype.value,
+        writer,
+        batch_size=cfg.batch_size,
+    )
+    required_gbs = frame_rate * cfg.frame_bytes / (1024**3) if frame_rate else None
+
+    if not force and (cached := cache.get(key)):
+        best = select_layout(cached, required_gbs)
+        log.info("Using cached measurements for %s: %s", key, best)
+        return best
+
+    sample = frames[:, :SAMPLE_EDGE, :SAMPLE_EDGE]
+    sample_shape = FrameShape(sample.shape[1], sample.shape[2])
+    candidates = candidates if candidates is not None else default_candidates(sample_shape, cfg.batch_size)
+
+    Path(cfg.path).mkdir(parents=True, exist_ok=True)
+    results: list[TunedLayout] = []
+    with WriterPool(max_workers=1) as pool:  # one writer process reused by every candidate
+        for candidate in candidates:
+            work_dir = Path(tempfile.mkdtemp(prefix=".autotune-", dir=cfg.path))
+            try:
+                result = benchmark_layout(cfg, candidate, sample, work_dir, writer=writer, threads=threads, pool=pool)
+            except Exception:
+                log.exception("Layout %s failed", candidate)
+                continue
+            log.info(
+                "chunk=%s shard=%s codec=%s: %.2f GB/s, ratio %.2f",
+                result.chunk_shape,
+                result.shard_shape,
+                result.compression,
+                result.throughput_gbs,
+                result.ratio,
+            )
+            results.append(result)
+
+    if not results:
+        msg = "No layout candidate could be benchmarked"
+        raise ValueError(msg)
+
+    cache.put(key, results)
+    best = select_layout(results, required_gbs)
+    if required_gbs is not None and best.throughput_gbs < required_gbs:
+        log.warning("No layout reaches %.2f GB/s; using the fastest", required_gbs)
+    log.info("Best layout for %s: %s", key, best)
+    return best
+
+
+def tune_config(cfg: WriterConfig, frames: np.ndarray, **kwargs: object) -> WriterConfig:
+    """Return cfg with chunk_shape, shard_shape and compression from autotune_layout().
+
+    Args:
+        cfg: Configuration to tune
+        frames: Sample of real frames (n, y, x)
+        **kwargs: Passed to autotune_layout()
+    """
+    return autotune_layout(cfg, frames, **kwargs).apply(cfg)
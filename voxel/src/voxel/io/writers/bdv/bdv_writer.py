@@ -1,29 +1,43 @@
-"""BdvWriter - Writer for BigDataViewer/BigStitcher N5/HDF5 format.
+"""BdvWriter - Writer for BigDataViewer/BigStitcher HDF5 format.
 
-This module provides a writer for voxel data that outputs to BigDataViewer format,
-implementing the VoxelWriter Protocol.
+This module provides a writer for voxel data that outputs to BigDataViewer
+HDF5 (.h5 + .xml), implementing the VoxelWriter Protocol using composition.
+
+Batches are written by the npy2bdv SDK in the writer subprocess, off the
+acquisition thread: each batch is binned into the resolution levels on a
+thread pool, then appended to the virtual stack of every level through an
+HDF5 chunk cache sized to hold a full row of chunks.
 """
 
 from __future__ import annotations
 
-import time
+import os
 from enum import StrEnum
-from math import ceil
+from math import ceil, prod
 from pathlib import Path
 from typing import Self
 
 import numpy as np
-from voxel.io.writers.types import BdvWriterConfig, BufferStage, BufferStatus, FrameShape, StreamMetrics, StreamStatus
+from voxel.io.writers.codec import get_codec
+from voxel.io.writers.engine import BufferManager, FrameSlot, OverflowHandler, WriterPool, WriterProcess
+from voxel.io.writers.noise import DEFAULT_GAIN, DEFAULT_READ_NOISE, NoiseQuantizer
+from voxel.io.writers.stats import PhaseTimer
+from voxel.io.writers.types import BdvWriterConfig, FrameShape, StreamMetrics, StreamStatus
 
 from .sdk import npy2bdv
 
-CHUNK_SIZE_PX = 64
+# Pyramid subsampling factors and HDF5 chunk size (zyx order)
+SUBSAMP = ((1, 1, 1), (2, 2, 2), (4, 4, 4))
+BLOCKDIM = (4, 256, 256)
+
+CHUNK_CACHE_MAX = 256 * 1024 * 1024
+"""Upper bound on the per-dataset HDF5 chunk cache chosen by default."""
 
 B3D_QUANT_SIGMA = 1  # quantization step
 B3D_COMPRESSION_MODE = 1
 B3D_BACKGROUND_OFFSET = 0  # ADU
-B3D_GAIN = 2.1845  # ADU/e-
-B3D_READ_NOISE = 1.5  # e-
+B3D_GAIN = DEFAULT_GAIN  # ADU/e-
+B3D_READ_NOISE = DEFAULT_READ_NOISE  # e-
 
 B3D_COMPRESSION_OPTS = (
     int(B3D_QUANT_SIGMA * 1000),
@@ -41,12 +55,48 @@ class BdvCompression(StrEnum):
     B3D = "b3d"
 
 
+def chunk_cache_size(
+    frame_shape: FrameShape,
+    nbytes: int | None = None,
+    blockdim: tuple[int, int, int] = BLOCKDIM,
+) -> tuple[int, int]:
+    """HDF5 chunk cache (bytes, hash slots), by default holding one full z-row of chunks of a frame.
+
+    A batch whose depth is not a multiple of the chunk depth (the last batch,
+    or a coarse level) leaves a row of partly written chunks; keeping that
+    row cached means the next batch completes them in memory instead of
+    reading them back from disk.
+
+    Args:
+        frame_shape: Frame (y, x) size at full resolution
+        nbytes: Cache size to use instead of one row of chunks
+        blockdim: Chunk shape (z, y, x)
+
+    Returns:
+        (rdcc_nbytes, rdcc_nslots); the default size is capped at CHUNK_CACHE_MAX.
+    """
+    chunk_bytes = prod(blockdim) * np.dtype(np.int16).itemsize
+    if nbytes is None:
+        row_chunks = ceil(frame_shape.y / blockdim[1]) * ceil(frame_shape.x / blockdim[2])
+        nbytes = min(row_chunks * chunk_bytes, CHUNK_CACHE_MAX)
+    # HDF5 recommends a prime number of slots, ~100x the chunks that fit
+    return nbytes, _next_prime(100 * max(1, nbytes // chunk_bytes))
+
+
+def _next_prime(n: int) -> int:
+    """Smallest prime >= n."""
+    n = max(n, 2)
+    while any(n % d == 0 for d in range(2, int(n**0.5) + 1)):
+        n += 1
+    return n
+
+
 class BdvWriter:
-    """Writer for voxel data that outputs to BigDataViewer N5 format.
+    """Writer for voxel data that outputs to BigDataViewer HDF5 format.
 
-    Implements the VoxelWriter Protocol with synchronous I/O through
-    the npy2bdv SDK. Supports multi-tile and multi-channel datasets
-    with affine transformations for deskewing.
+    Implements the VoxelWriter Protocol using composition with
+    BufferManager and WriterProcess components. The file holds one view
+    (one tile, one channel) with deskew, scale and shift affines.
 
     Example:
         ```python
@@ -68,54 +118,62 @@ class BdvWriter:
         ```
     """
 
-    def __init__(self, cfg: BdvWriterConfig) -> None:
+    def __init__(
+        self,
+        cfg: BdvWriterConfig,
+        *,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+        pyramid_workers: int | None = None,
+        chunk_cache_bytes: int | None = None,
+    ) -> None:
         """Initialize the BdvWriter.
 
         Args:
             cfg: Writer configuration specifying output path, dimensions, etc.
+            slots: Number of shared memory ring buffer slots (minimum 2)
+            pool: Optional WriterPool to lease a persistent subprocess and buffer from
+            pyramid_workers: Threads binning each batch into resolution levels (None = CPU count)
+            chunk_cache_bytes: HDF5 chunk cache per dataset (None = one row of chunks, see chunk_cache_size)
+
+        Raises:
+            ValueError: If cfg.batch_size is not a multiple of the coarsest z subsampling factor.
         """
         from voxel.utils.log import VoxelLogging
 
         self._cfg = cfg
         self.log = VoxelLogging.get_logger(obj=self)
+        self._log_queue = VoxelLogging.get_queue()
 
-        self._theta_deg = cfg.theta_deg
-        self._output_file = Path(cfg.path) / f"{cfg.name}.n5"
+        # Batches start at z offsets that every level can address
+        z_factor = SUBSAMP[-1][0]
+        if cfg.batch_size % z_factor:
+            msg = f"BDV batch_size must be a multiple of {z_factor}, got {cfg.batch_size}"
+            raise ValueError(msg)
+
+        self._output_file = Path(cfg.path) / f"{cfg.name}.h5"
 
-        # Map compression string to enum
+        # Map compression string to enum; gzip takes a codec registry level ("gzip:7")
         self._compression: BdvCompression = BdvCompression.NONE
+        self._gzip_level: int | None = None
         if cfg.compression:
             try:
-                self._compression = BdvCompression(cfg.compression.lower())
+                self._compression = BdvCompression(cfg.compression.lower().partition(":")[0])
+                if self._compression == BdvCompression.GZIP:
+                    self._gzip_level = get_codec(cfg.compression).level
             except ValueError:
                 self.log.warning("Invalid compression %s, using 'none'", cfg.compression)
+                self._compression = BdvCompression.NONE
 
-        # Multi-tile/channel tracking
-        self._tiles_set: set[tuple[float, float, float]] = set()
-        self._channels_set: set[str] = set()
-        self._tile_idx = 0
-        self._tile_shape_dict: dict[tuple[int, int], tuple[int, int, int]] = {}
+        self._pyramid_workers = pyramid_workers or os.cpu_count() or 1
+        self._chunk_cache = chunk_cache_size(cfg.frame_shape, chunk_cache_bytes)
 
-        # Affine transformation matrices
-        self._affine_deskew_dict: dict[tuple[int, int], np.ndarray] = {}
-        self._affine_scale_dict: dict[tuple[int, int], np.ndarray] = {}
-        self._affine_shift_dict: dict[tuple[int, int], np.ndarray] = {}
+        # Affine transformations, computed up front and written on finalize
+        self._affines: dict[str, np.ndarray] = self._compute_affines()
 
-        # Frame buffer for batch collection
-        self._batch_buffer: np.ndarray | None = None
-        self._frames_in_buffer = 0
-        self._frames_added = 0
-        self._batch_count = 0
-
-        # npy2bdv SDK instance
+        # npy2bdv SDK instance (initialized in subprocess)
         self._npy2bdv: npy2bdv.BdvWriter | None = None
-
-        # Performance tracking
-        self._start_time = 0.0
-        self._metrics: StreamMetrics | None = None
-
-        # State
-        self._is_running = False
+        self._frames_written = 0
 
         # Setup output directory
         output_dir = Path(cfg.path)
@@ -123,8 +181,42 @@ class BdvWriter:
             output_dir.mkdir(parents=True, exist_ok=True)
             self.log.warning("Created output directory: %s", output_dir)
 
-        # Configure and start
-        self._configure()
+        # Compose components (leased from the pool when one is given)
+        self._pool = pool
+        if pool is not None:
+            self._buffer, self._process = pool.acquire(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+        else:
+            self._buffer = BufferManager(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+
+            self._process = WriterProcess(
+                name=f"BdvWriter-{cfg.name}",
+                processor=self,  # BdvWriter implements BatchProcessor
+                buffer_mgr=self._buffer,
+                frame_count=cfg.frame_count,
+                log_queue=self._log_queue,
+            )
+
+        # Applies cfg.overflow_policy when the writer falls behind
+        self._overflow = OverflowHandler(self._buffer, self._process, cfg.overflow_policy, cfg.spill_dir)
+
+        # Performance tracking
+        self._metrics: StreamMetrics | None = None
+        self.phases = PhaseTimer()  # per-batch phase times, collected by WriterProcess
+        self.prefilter = NoiseQuantizer.from_config(cfg, self._pyramid_workers)  # cfg.lossy, run by WriterProcess
+
+        # Start the writer
         self._start()
 
     @property
@@ -135,7 +227,7 @@ class BdvWriter:
     @property
     def is_running(self) -> bool:
         """Whether the writer is actively running."""
-        return self._is_running
+        return self._process.is_running
 
     @property
     def compression(self) -> str | None:
@@ -146,136 +238,59 @@ class BdvWriter:
 
     @property
     def batch_size(self) -> int:
-        """Frames per batch (chunk size for BDV)."""
-        return CHUNK_SIZE_PX
+        """Frames per batch."""
+        return self._cfg.batch_size
 
     @property
     def frames_added(self) -> int:
         """Number of frames added to the writer."""
-        return self._frames_added
+        return self._process.frames_added
 
     @property
     def frames_processed(self) -> int:
         """Number of frames processed (written)."""
-        return self._batch_count * self.batch_size
+        return self._process.frames_processed
 
     @property
     def batch_count(self) -> int:
         """Number of batches processed."""
-        return self._batch_count
-
-    def _configure(self) -> None:
-        """Configure writer metadata from config."""
-        position_tuple = (
-            self._cfg.position.x,
-            self._cfg.position.y,
-            self._cfg.position.z,
-        )
-        self._tiles_set.add(position_tuple)
-        self._channels_set.add(self._cfg.channel_name)
+        return self._process.batch_count
 
-        dict_key = (len(self._tiles_set), self._cfg.channel_idx)
-
-        if dict_key in self._tile_shape_dict:
-            msg = f"Duplicate tile/channel configuration: {dict_key}"
-            raise ValueError(msg)
-
-        self._tile_shape_dict[dict_key] = (
-            self._cfg.frame_count,
-            self._cfg.frame_shape.y,
-            self._cfg.frame_shape.x,
-        )
+    def _compute_affines(self) -> dict[str, np.ndarray]:
+        """Deskew, scale and shift affines (BDV order of application) from config."""
+        theta = self._cfg.theta_deg * np.pi / 180.0
+        voxel = self._cfg.voxel_size
+        position = self._cfg.position
 
         # Adjust y voxel size for theta
-        adjusted_voxel_y = self._cfg.voxel_size.y * np.cos(self._theta_deg * np.pi / 180.0)
+        adjusted_voxel_y = voxel.y * np.cos(theta)
 
         # Shearing based on theta and y/z pixel sizes
-        shear = -np.tan(self._theta_deg * np.pi / 180.0) * adjusted_voxel_y / self._cfg.voxel_size.z
-        self._affine_deskew_dict[dict_key] = np.array(
-            ([1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, shear, 1.0, 0.0]),
-        )
+        shear = -np.tan(theta) * adjusted_voxel_y / voxel.z
+        deskew = np.array(([1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, shear, 1.0, 0.0]))
 
-        scale_x = self._cfg.voxel_size.x / adjusted_voxel_y
+        scale_x = voxel.x / adjusted_voxel_y
         scale_y = 1.0
-        scale_z = self._cfg.voxel_size.z / adjusted_voxel_y
-        self._affine_scale_dict[dict_key] = np.array(
-            ([scale_x, 0.0, 0.0, 0.0], [0.0, scale_y, 0.0, 0.0], [0.0, 0.0, scale_z, 0.0]),
-        )
+        scale_z = voxel.z / adjusted_voxel_y
+        scale = np.array(([scale_x, 0.0, 0.0, 0.0], [0.0, scale_y, 0.0, 0.0], [0.0, 0.0, scale_z, 0.0]))
 
-        shift_x = scale_x * (self._cfg.position.x / self._cfg.voxel_size.x)
-        shift_y = scale_y * (self._cfg.position.y / adjusted_voxel_y)
-        shift_z = scale_z * (self._cfg.position.z / self._cfg.voxel_size.z)
-        self._affine_shift_dict[dict_key] = np.array(
-            ([1.0, 0.0, 0.0, shift_x], [0.0, 1.0, 0.0, shift_y], [0.0, 0.0, 1.0, shift_z]),
-        )
+        shift_x = scale_x * (position.x / voxel.x)
+        shift_y = scale_y * (position.y / adjusted_voxel_y)
+        shift_z = scale_z * (position.z / voxel.z)
+        shift = np.array(([1.0, 0.0, 0.0, shift_x], [0.0, 1.0, 0.0, shift_y], [0.0, 0.0, 1.0, shift_z]))
 
-    def _start(self) -> None:
-        """Start the writer and initialize npy2bdv."""
-        frame_bytes = self._cfg.frame_shape.y * self._cfg.frame_shape.x * 2
-        self._metrics = StreamMetrics(frame_bytes)
-        self._start_time = time.perf_counter()
-
-        # Pyramid subsampling factors (xyz order)
-        subsamp = (
-            (1, 1, 1),
-            (2, 2, 2),
-            (4, 4, 4),
-        )
-        # Chunk size (xyz order)
-        blockdim = (
-            (4, 256, 256),
-            (4, 256, 256),
-            (4, 256, 256),
-        )
-
-        compression_arg = None if self._compression == BdvCompression.NONE else self._compression.value
-        compression_opts = B3D_COMPRESSION_OPTS if self._compression == BdvCompression.B3D else None
+        return {"deskew": deskew, "scale": scale, "shift": shift}
 
-        self._npy2bdv = npy2bdv.BdvWriter(
-            filename=str(self._output_file),
-            subsamp=subsamp,
-            blockdim=blockdim,
-            compression=compression_arg,
-            compression_opts=compression_opts,
-            ntiles=len(self._tiles_set),
-            nchannels=len(self._channels_set),
-            overwrite=False,
-        )
-
-        # Pad Z to full batches for virtual stack
-        image_size_z = ceil(self._cfg.frame_count / CHUNK_SIZE_PX) * CHUNK_SIZE_PX
-
-        for key in self._tile_shape_dict:
-            append_tile, append_channel = key
-            self._npy2bdv.append_view(
-                stack=None,
-                virtual_stack_dim=(
-                    image_size_z,
-                    self._cfg.frame_shape.y,
-                    self._cfg.frame_shape.x,
-                ),
-                tile=append_tile,
-                channel=append_channel,
-                voxel_size_xyz=(
-                    self._cfg.voxel_size.x,
-                    self._cfg.voxel_size.y,
-                    self._cfg.voxel_size.z,
-                ),
-                voxel_units="um",
-            )
+    def _start(self) -> None:
+        """Start the writer subprocess."""
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
 
-        # Allocate batch buffer
-        self._batch_buffer = np.zeros(
-            (self.batch_size, self._cfg.frame_shape.y, self._cfg.frame_shape.x),
-            dtype=np.uint16,
-        )
-        self._frames_in_buffer = 0
+        self._process.start(self, trace_path=self._cfg.trace_path)
 
-        self._is_running = True
         self.log.info(
-            "Started BdvWriter: %d frames, batch_size=%d, output=%s",
+            "Started BdvWriter: %s frames, batch_size=%d, output=%s",
             self._cfg.frame_count,
-            self.batch_size,
+            self._cfg.batch_size,
             self._output_file,
         )
 
@@ -288,58 +303,38 @@ class BdvWriter:
         Raises:
             RuntimeError: If writer is not running or has been closed.
         """
-        if not self._is_running:
-            msg = "Cannot add frame: writer is not running"
-            raise RuntimeError(msg)
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
 
-        if self._batch_buffer is None:
-            msg = "Batch buffer not initialized"
-            raise RuntimeError(msg)
-
-        # Add frame to buffer
-        self._batch_buffer[self._frames_in_buffer] = frame
-        self._frames_in_buffer += 1
-        self._frames_added += 1
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in shared memory for zero-copy writes.
 
-        if self._metrics:
-            self._metrics.tick()
+        Fill `slot.data` in place and call `slot.commit()`, or use the slot
+        as a context manager. If the ring is full, cfg.overflow_policy decides
+        whether this blocks or returns a scratch frame.
 
-        is_last_frame = self._frames_added == self._cfg.frame_count
-        buffer_full = self._frames_in_buffer >= self.batch_size
-
-        if buffer_full or is_last_frame:
-            self._process_batch()
-
-        if is_last_frame:
-            self.log.info("Added last frame %d. Finalizing...", self._frames_added)
-
-    def _process_batch(self) -> None:
-        """Process and write the current batch."""
-        if not self._npy2bdv or self._batch_buffer is None:
-            return
-
-        if self._frames_in_buffer == 0:
-            return
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the ring buffer.
 
-        # Get actual data (may be partial batch)
-        batch_data = self._batch_buffer[: self._frames_in_buffer]
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        if not self.is_running:
+            msg = "Cannot add frame: writer is not running"
+            raise RuntimeError(msg)
 
-        self._npy2bdv.append_substack(
-            substack=batch_data,
-            z_start=self._batch_count * self.batch_size,
-            tile=self._tile_idx,
-            channel=self._cfg.channel_idx,
-        )
+        return self._overflow.acquire_slot(on_commit=self._commit_frame)
 
-        self._batch_count += 1
-        self._frames_in_buffer = 0
+    def _commit_frame(self) -> None:
+        """Track acquisition rate and flush the stream once the last frame is in."""
+        if self._metrics:
+            self._metrics.tick()
 
-        self.log.info(
-            "Batch %d/%d: %d frames written",
-            self._batch_count,
-            self._cfg.num_batches,
-            batch_data.shape[0],
-        )
+        if self._overflow.frames_received == self._cfg.frame_count:
+            self._overflow.flush()
+            self.log.info("Added last frame %d. Waiting for processing...", self.frames_added)
+            self._process.wait_all()
 
     def get_status(self) -> StreamStatus:
         """Get a snapshot of the current writer status.
@@ -347,111 +342,65 @@ class BdvWriter:
         Returns:
             StreamStatus with progress and performance metrics.
         """
-        frames_remaining = self._cfg.frame_count - self._frames_added
+        frames_received = self._overflow.frames_received
+        frames_remaining = self._cfg.frame_count - frames_received
 
         # Estimate remaining time
         estimated_remaining = None
         if self._metrics and self._metrics.fps > 0 and frames_remaining > 0:
             estimated_remaining = frames_remaining / self._metrics.fps
 
-        # Buffer status
-        buffers = {
-            0: BufferStatus(
-                batch_idx=self._batch_count,
-                stage=BufferStage.COLLECTING if self._is_running else BufferStage.IDLE,
-                filled=self._frames_in_buffer,
-                capacity=self.batch_size,
-            ),
-        }
-
-        elapsed = time.perf_counter() - self._start_time if self._start_time > 0 else 0.0
+        # Buffer status and writer metrics (one consistent read)
+        buffers = self._buffer.get_buffer_statuses()
+        stats = self._process.snapshot()
 
         return StreamStatus(
             fps=self._metrics.fps if self._metrics else 0.0,
             fps_inst=self._metrics.fps_inst if self._metrics else 0.0,
-            throughput_gbs=0.0,  # Not tracked for synchronous writes
-            throughput_gbs_inst=0.0,
-            frames_acquired=self._frames_added,
+            throughput_gbs=stats.avg_rate_gbs,
+            throughput_gbs_inst=stats.rolling_rate_gbs,
+            frames_acquired=frames_received,
             total_frames=self._cfg.frame_count,
             frames_remaining=frames_remaining,
-            current_batch=self._batch_count,
+            current_batch=stats.batch_count,
             total_batches=self._cfg.num_batches,
-            current_slot=0,
+            current_slot=self._buffer.write_slot_idx,
             buffers=buffers,
-            elapsed_time=elapsed,
+            elapsed_time=self._process.elapsed_time,
             estimated_remaining=estimated_remaining,
+            handoff_latency_ms=stats.avg_handoff_s * 1000,
+            **stats.latency_fields(),
+            overflow_policy=self._overflow.policy.value,
+            frames_dropped=self._overflow.frames_dropped,
+            spilled_bytes=self._overflow.spilled_bytes,
+            max_queue_depth=self._overflow.max_queue_depth,
         )
 
     def wait_all(self) -> None:
-        """Wait for all pending write operations to complete.
-
-        For BdvWriter, this is a no-op since writes are synchronous.
-        """
+        """Wait for all pending write operations to complete."""
+        self._process.wait_all()
 
     def close(self) -> None:
         """Close the writer and clean up resources."""
-        if not self._is_running:
+        if not self.is_running:
             return
 
-        # Process any remaining frames
-        if self._frames_in_buffer > 0:
-            self._process_batch()
+        self._overflow.flush()
+        self._process.stop()
+        self._overflow.close()
+        if self._pool is None:
+            self._buffer.close()
 
-        # Finalize the file
-        self._finalize()
-
-        self._is_running = False
-        self._batch_buffer = None
+        if self._overflow.frames_dropped:
+            self.log.warning("%s dropped %d frames on overflow", self._cfg.name, self._overflow.frames_dropped)
 
         self.log.info(
-            "Closed BdvWriter. Frames: %d/%d",
-            self._frames_added,
+            "Closed BdvWriter. Frames: %d/%d, Avg: %.2f GB/s",
+            self.frames_processed,
             self._cfg.frame_count,
+            self._process.avg_rate_gbs,
         )
 
-    def _finalize(self) -> None:
-        """Finalize the N5 file with XML metadata."""
-        if not self._npy2bdv:
-            return
-
-        try:
-            # Write XML metadata
-            self._npy2bdv.write_xml()
-
-            # Append affine transformations
-            for append_tile, append_channel in self._affine_deskew_dict:
-                self._npy2bdv.append_affine(
-                    m_affine=self._affine_deskew_dict[(append_tile, append_channel)],
-                    name_affine="deskew",
-                    tile=append_tile,
-                    channel=append_channel,
-                )
-
-            for append_tile, append_channel in self._affine_scale_dict:
-                self._npy2bdv.append_affine(
-                    m_affine=self._affine_scale_dict[(append_tile, append_channel)],
-                    name_affine="scale",
-                    tile=append_tile,
-                    channel=append_channel,
-                )
-
-            for append_tile, append_channel in self._affine_shift_dict:
-                self._npy2bdv.append_affine(
-                    m_affine=self._affine_shift_dict[(append_tile, append_channel)],
-                    name_affine="shift",
-                    tile=append_tile,
-                    channel=append_channel,
-                )
-
-            self._npy2bdv.close()
-            self._npy2bdv = None
-            self._tile_idx += 1
-
-            self.log.info("Finalized: %d frames to %s", self._cfg.frame_count, self._output_file)
-
-        except Exception:
-            self.log.exception("Failed to finalize BdvWriter")
-
     def __enter__(self) -> Self:
         """Enter context manager."""
         return self
@@ -470,10 +419,97 @@ class BdvWriter:
         return (
             f"BdvWriter("
             f"name={self._cfg.name!r}, "
-            f"frames={self._frames_added}/{self._cfg.frame_count}, "
-            f"running={self._is_running})"
+            f"frames={self.frames_added}/{self._cfg.frame_count}, "
+            f"running={self.is_running})"
+        )
+
+    def __getstate__(self) -> dict:
+        """Pickle only processor state; engine components stay in the parent process."""
+        state = self.__dict__.copy()
+        for key in ("_buffer", "_process", "_pool", "_overflow", "_metrics", "_log_queue"):
+            state[key] = None
+        return state
+
+    # =========================================================================
+    # BatchProcessor Protocol implementation (called in subprocess)
+    # =========================================================================
+
+    def initialize(self) -> None:
+        """Create the HDF5 file and the virtual stack of every resolution level in subprocess."""
+        compression_arg = None if self._compression == BdvCompression.NONE else self._compression.value
+        compression_opts = B3D_COMPRESSION_OPTS if self._compression == BdvCompression.B3D else self._gzip_level
+        rdcc_nbytes, rdcc_nslots = self._chunk_cache
+
+        self._npy2bdv = npy2bdv.BdvWriter(
+            filename=str(self._output_file),
+            subsamp=SUBSAMP,
+            blockdim=(BLOCKDIM,) * len(SUBSAMP),
+            compression=compression_arg,
+            compression_opts=compression_opts,
+            overwrite=False,
+            rdcc_nbytes=rdcc_nbytes,
+            rdcc_nslots=rdcc_nslots,
+            pyramid_workers=self._pyramid_workers,
+        )
+        self._npy2bdv.set_attribute_labels("channel", (self._cfg.channel_name,))
+
+        # Pad Z to full batches for virtual stack
+        image_size_z = ceil(self._cfg.frame_count / self._cfg.batch_size) * self._cfg.batch_size
+        self._npy2bdv.append_view(
+            stack=None,
+            virtual_stack_dim=(image_size_z, self._cfg.frame_shape.y, self._cfg.frame_shape.x),
+            voxel_size_xyz=(self._cfg.voxel_size.x, self._cfg.voxel_size.y, self._cfg.voxel_size.z),
+            voxel_units="um",
+        )
+        self._frames_written = 0
+
+        self.log.info(
+            "Initialized npy2bdv: %d levels, chunk cache %.0f MB. Output: %s",
+            len(SUBSAMP),
+            rdcc_nbytes / (1024 * 1024),
+            self._output_file,
+        )
+
+    def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:
+        """Bin the batch into every resolution level and append it to the virtual stacks."""
+        if not self._npy2bdv:
+            msg = "npy2bdv writer not initialized"
+            raise RuntimeError(msg)
+
+        with self.phases("downsample"):
+            levels = self._npy2bdv.subsample_substack(batch_data)
+        with self.phases("write"):
+            self._npy2bdv.append_substack(substack=batch_data, z_start=self._frames_written, levels=levels)
+        self._frames_written += batch_data.shape[0]
+
+        self.log.info(
+            "Batch %d/%d: %d frames written",
+            batch_idx,
+            self._cfg.num_batches,
+            batch_data.shape[0],
         )
 
+    def finalize(self) -> None:
+        """Write the XML metadata with the view's affines and close the HDF5 file."""
+        if self.prefilter is not None:
+            self.prefilter.close()
+        if not self._npy2bdv:
+            return
+
+        try:
+            self._npy2bdv.write_xml()
+            for name, m_affine in self._affines.items():
+                self._npy2bdv.append_affine(m_affine=m_affine, name_affine=name)
+
+            with self.phases("fsync"):
+                self._npy2bdv.close()
+            self._npy2bdv = None
+
+            self.log.info("Finalized: %d frames to %s", self._frames_written, self._output_file)
+
+        except Exception:
+            self.log.exception("Failed to finalize BdvWriter")
+
 
 # =============================================================================
 # Test function
@@ -505,7 +541,7 @@ def test_bdv_writer() -> None:
             if i % 25 == 0:
                 print(writer.get_status().summary())
 
-    print(f"Saved to: {cfg.path}/{cfg.name}.n5")
+    print(f"Saved to: {cfg.path}/{cfg.name}.h5")
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 # License: GPL-3.0
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
@@ -11,12 +12,83 @@ import numpy as np
 import skimage.transform
 from tqdm import trange
 
-from voxel.utils.processing.downsample.gpu.gputools.downsample_3d import (
-    GPUToolsDownSample3D,
-)
 from voxel.utils.log import VoxelLogging
 
 
+PYRAMID_SLAB_BYTES = 8 * 1024 * 1024
+"""Target size of the y-slabs a stack is split into for pyramid building (one task per slab)."""
+
+
+def _block_mean(stack, factor):
+    """Mean over (z,y,x) blocks of size `factor`, as float32.
+
+    The last z-block is completed by replicating the last plane; y/x edges
+    that do not fill a block are dropped.
+    """
+    fz, fy, fx = (int(f) for f in factor)
+    if stack.shape[0] % fz:
+        pad = fz - stack.shape[0] % fz
+        stack = np.concatenate([stack, np.repeat(stack[-1:], pad, axis=0)])
+    nz, ny, nx = stack.shape[0] // fz, stack.shape[1] // fy, stack.shape[2] // fx
+    blocks = stack[:, : ny * fy, : nx * fx].reshape(nz, fz, ny, fy, nx, fx)
+    return blocks.mean(axis=(1, 3, 5), dtype=np.float32)
+
+
+def block_mean_pyramid(stack, subsamp, executor=None):
+    """All resolution levels of a 3d stack (z,y,x) from one pass over it.
+
+    The stack is split into y-slabs aligned to every subsampling factor. Each
+    slab is reduced to all levels while it is hot in cache: a level whose
+    factors are multiples of the previous level's is reduced from that level's
+    (float32) block means, otherwise from the slab itself. With an executor,
+    slabs are reduced in parallel (NumPy releases the GIL in the reductions).
+
+    Level shapes are (ceil(z/fz), y//fy, x//fx): an incomplete last z-block is
+    completed by replicating the last plane, y/x edges that do not fill a block
+    are dropped, matching `virtual_stack_dim // subsamp` for full batches.
+
+    Parameters:
+    -----------
+        stack: numpy 3d array (z,y,x)
+        subsamp: array-like of (z,y,x) integer subsampling factors, one row per level
+        executor: concurrent.futures.Executor or None
+
+    Returns:
+    --------
+        list of 3d arrays, one per level, in the stack dtype. Levels with factors (1,1,1) are `stack` itself.
+    """
+    factors = np.asarray(subsamp, dtype=int).reshape(-1, 3)
+    nz, ny, nx = stack.shape
+    levels = [
+        stack if (f == 1).all() else np.empty((-(-nz // f[0]), ny // f[1], nx // f[2]), dtype=stack.dtype)
+        for f in factors
+    ]
+
+    def reduce_slab(y0, y1):
+        src, prev = stack[:, y0:y1], np.ones(3, dtype=int)
+        for level, f in zip(levels, factors):
+            if (f == 1).all():
+                continue
+            if (f % prev).any():  # not nested in the previous level: reduce from full resolution
+                src, prev = stack[:, y0:y1], np.ones(3, dtype=int)
+            src, prev = _block_mean(src, f // prev), f
+            row = y0 // f[1]
+            level[:, row : row + src.shape[1]] = src
+
+    # slab height: a multiple of every y factor, close to PYRAMID_SLAB_BYTES
+    align = int(np.lcm.reduce(factors[:, 1]))
+    row_bytes = max(1, nz * nx * stack.dtype.itemsize)
+    step = max(1, PYRAMID_SLAB_BYTES // row_bytes // align) * align
+    slabs = [(y0, min(y0 + step, ny)) for y0 in range(0, ny, step)]
+    if executor is None or len(slabs) == 1:
+        for y0, y1 in slabs:
+            reduce_slab(y0, y1)
+    else:
+        for future in [executor.submit(reduce_slab, y0, y1) for y0, y1 in slabs]:
+            future.result()
+    return levels
+
+
 class BdvBase:
     __version__ = "2022.08"
 
@@ -58,8 +130,8 @@ class BdvBase:
         ) = self.nsetups = 0
         self.compression = None
         self.compressions_supported = (None, "gzip", "lzf", "b3d")
-        # initialize the downsampling in 3d
-        self.gpu_binning = GPUToolsDownSample3D(binning=2)
+        # thread pool for pyramid building, created by BdvWriter
+        self._binning_pool = None
 
     def _determine_setup_id(self, illumination=0, channel=0, tile=0, angle=0):
         """Takes the view attributes (illumination, channel, tile, angle) and converts them into unique setup_id.
@@ -209,7 +281,7 @@ class BdvBase:
             if level and (not elem.tail or not elem.tail.strip()):
                 elem.tail = i
 
-    # deprecate and do not use -> use GPU binning instead
+    # deprecated, do not use -> use block_mean_pyramid instead
     def _subsample_stack(self, stack: np.array, subsamp_level: tuple):
         """Subsampling of a 3d stack.
 
@@ -292,25 +364,23 @@ class BdvBase:
         self._write_pyramids_header()
         for time in trange(self.ntimes, desc="time points"):
             for isetup in trange(self.nsetups, desc="views"):
+                full_res_group_name = self._fmt.format(time, isetup, 0)
+                if full_res_group_name not in self._file_object_h5:
+                    continue
+                raw_data = self._file_object_h5[full_res_group_name]["cells"][()].view("uint16")
+                levels = block_mean_pyramid(raw_data, self.subsamp, self._binning_pool)
                 for ilevel in range(1, self.nlevels):
-                    full_res_group_name = self._fmt.format(time, isetup, 0)
-                    if full_res_group_name in self._file_object_h5:
-                        raw_data = self._file_object_h5[full_res_group_name]["cells"][
-                            ()
-                        ].astype("uint16")
-                        pyramid_group_name = self._fmt.format(time, isetup, ilevel)
-                        grp = self._file_object_h5.create_group(pyramid_group_name)
-                        if ilevel > 0:
-                            raw_data = self.gpu_binning.run(raw_data).astype("int16")
-                        grp.create_dataset(
-                            "cells",
-                            data=subdata,
-                            chunks=tuple(self.chunks[ilevel]),
-                            maxshape=(None, None, None),
-                            compression=self.compression,
-                            compression_opts=self.compression_opts,
-                            dtype="int16",
-                        )
+                    pyramid_group_name = self._fmt.format(time, isetup, ilevel)
+                    grp = self._file_object_h5.create_group(pyramid_group_name)
+                    grp.create_dataset(
+                        "cells",
+                        data=levels[ilevel].view("int16"),
+                        chunks=tuple(self.chunks[ilevel]),
+                        maxshape=(None, None, None),
+                        compression=self.compression,
+                        compression_opts=self.compression_opts,
+                        dtype="int16",
+                    )
 
 
 class BdvWriter(BdvBase):
@@ -326,6 +396,9 @@ class BdvWriter(BdvBase):
         ntiles=1,
         nangles=1,
         overwrite=False,
+        rdcc_nbytes=None,
+        rdcc_nslots=None,
+        pyramid_workers=1,
     ):
         """Class for writing multiple numpy 3d-arrays into BigDataViewer/BigStitcher HDF5 file.
 
@@ -346,6 +419,12 @@ class BdvWriter(BdvBase):
                 Number of view attributes, >=1.
             overwrite: boolean
                 If True, overwrite existing file. Default False.
+            rdcc_nbytes: int or None
+                HDF5 chunk cache size per dataset, in bytes. Default None (HDF5 default, 1 MB).
+            rdcc_nslots: int or None
+                Number of chunk cache hash slots, ideally a prime ~100x the chunks that fit in the cache.
+            pyramid_workers: int
+                Threads used to bin substacks into the lower resolution levels. Default 1.
 
         .. note::
         ------
@@ -405,7 +484,12 @@ class BdvWriter(BdvBase):
                 self.log.warning("Warning: H5 file already exists, overwriting.")
             else:
                 self.log.warning("Warning: H5 file already exists, appending.")
-        self._file_object_h5 = h5py.File(self.filename_h5, "a")
+        # chunks are written once, so evict fully written chunks first (w0=1)
+        self._file_object_h5 = h5py.File(
+            self.filename_h5, "a", rdcc_nbytes=rdcc_nbytes, rdcc_nslots=rdcc_nslots, rdcc_w0=1.0
+        )
+        if pyramid_workers > 1:
+            self._binning_pool = ThreadPoolExecutor(pyramid_workers, thread_name_prefix="bdv-binning")
         self._write_setups_header()
         self.virtual_stacks = False
         self.setup_id_present = [[False] * self.nsetups]
@@ -517,6 +601,7 @@ class BdvWriter(BdvBase):
         channel=0,
         tile=0,
         angle=0,
+        levels=None,
     ):
         """Append a substack to a virtual stack. Requires stack initialization by calling e.g.
         `append_view(stack=None, virtual_stack_dim=(1000,2048,2048))` beforehand.
@@ -536,6 +621,8 @@ class BdvWriter(BdvBase):
             tile: int
             angle: int
                 Indices of the view attributes, >=0.
+            levels: list of 3d arrays, optional
+                Resolution levels of the substack from `subsample_substack()`, if already computed.
         """
 
         assert self.virtual_stacks, (
@@ -553,20 +640,35 @@ class BdvWriter(BdvBase):
         assert (
             x_start + substack.shape[2] <= self.stack_shapes[isetup][2]
         ), f"Substack offset {x_start} + x-dim {substack.shape[2]} > virtual stack x-dim {self.stack_shapes[isetup][2]}."
-        for ilevel in range(self.nlevels):
+        if levels is None:
+            levels = self.subsample_substack(substack)
+        for ilevel, substack in enumerate(levels):
             group_name = self._fmt.format(time, isetup, ilevel)
             dataset = self._file_object_h5[group_name]["cells"]
-            # change subsampling to ingest the previous pyramid and not _subsample_stack function
-            if ilevel > 0:
-                substack = self.gpu_binning.run(substack).astype("int16")
-            sub_z_start = int(z_start / 2**ilevel)
-            sub_y_start = int(y_start / 2**ilevel)
-            sub_x_start = int(x_start / 2**ilevel)
+            sub_z_start, sub_y_start, sub_x_start = (
+                start // int(f) for start, f in zip((z_start, y_start, x_start), self.subsamp[ilevel])
+            )
             dataset[
                 sub_z_start : sub_z_start + substack.shape[0],
                 sub_y_start : sub_y_start + substack.shape[1],
                 sub_x_start : sub_x_start + substack.shape[2],
-            ] = substack
+            ] = substack.astype("int16", copy=False)
+
+    def subsample_substack(self, substack):
+        """Resolution levels of a substack for every subsampling factor, from one pass over it.
+
+        Offsets passed to `append_substack` must be multiples of every factor.
+
+        Parameters:
+        -----------
+            substack: array_like
+                A 3d numpy array of (z,y,x) pixel values.
+
+        Returns:
+        --------
+            list of self.nlevels 3d arrays, see `block_mean_pyramid`.
+        """
+        return block_mean_pyramid(np.asarray(substack), self.subsamp, self._binning_pool)
 
     def append_view(
         self,
@@ -640,6 +742,8 @@ class BdvWriter(BdvBase):
             self.stack_shapes[isetup] = virtual_stack_dim
             self.virtual_stacks = True
 
+        if stack is not None:
+            levels = block_mean_pyramid(stack, self.subsamp, self._binning_pool)
         for ilevel in range(self.nlevels):
             group_name = self._fmt.format(time, isetup, ilevel)
             if group_name in self._file_object_h5:
@@ -647,10 +751,9 @@ class BdvWriter(BdvBase):
             else:
                 grp = self._file_object_h5.create_group(group_name)
                 if stack is not None:
-                    stack = self.gpu_binning.run(stack).astype("int16")
                     grp.create_dataset(
                         "cells",
-                        data=stack,
+                        data=levels[ilevel].astype("int16"),
                         chunks=self.chunks[ilevel],
                         maxshape=(None, None, None),
                         compression=self.compression,
@@ -858,6 +961,9 @@ class BdvWriter(BdvBase):
         """Save changes and close the H5 file."""
         self._file_object_h5.flush()
         self._file_object_h5.close()
+        if self._binning_pool is not None:
+            self._binning_pool.shutdown()
+            self._binning_pool = None
 
 
 class BdvEditor(BdvBase):
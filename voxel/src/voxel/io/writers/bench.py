@@ -0,0 +1,311 @@
+"""Writer benchmark runner.
+
+Drives any writer from formats.WRITER_FORMATS with synthetic frames from
+ReferenceFrameGenerator and sweeps frame shape, batch size, compression codec
+and thread count. Each case reports sustained GB/s and fps (first frame to
+close() returning, so finalization is included), p99 batch time, peak RSS of
+the parent plus writer subprocesses and the shared memory held by the ring.
+
+Example:
+    ```
+    python -m voxel.io.writers.bench --writers ome-tiff imaris raw \\
+        --shapes 10640x14192 2048x2048 --batch-sizes 32 64 --codecs none zstd lz4shuffle \\
+        --threads 4 8 --output D:/bench --json results.json
+    ```
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import psutil
+
+from .engine import WriterPool
+from .formats import WRITER_FORMATS, open_writer
+from .types import Dtype, FrameShape, WriterConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+VP151MX_SHAPE = FrameShape(10640, 14192)
+"""Full-frame Vieworks VP-151MX (y, x)."""
+
+THREADED_FORMATS = ("imaris", "ome-tiff", "zarr-local", "bdv")
+"""Formats whose writers take a thread count; others run each case once with threads=None."""
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    """One point of a benchmark sweep."""
+
+    writer: str
+    frame_shape: FrameShape
+    batch_size: int
+    compression: str | None
+    threads: int | None
+
+    @property
+    def label(self) -> str:
+        """Filesystem-safe name for the case."""
+        threads = self.threads if self.threads is not None else "default"
+        shape = f"{self.frame_shape.y}x{self.frame_shape.x}"
+        return f"{self.writer}_{shape}_b{self.batch_size}_{self.compression}_t{threads}"
+
+
+@dataclass
+class BenchResult:
+    """Measurements for one BenchCase."""
+
+    writer: str
+    frame_shape: str
+    batch_size: int
+    compression: str | None
+    threads: int | None
+    frames: int
+    seconds: float = 0.0
+    throughput_gbs: float = 0.0
+    fps: float = 0.0
+    batch_ms_p99: float = 0.0
+    peak_rss_mb: float = 0.0
+    shm_mb: float | None = None
+    error: str | None = None
+
+
+class _RssSampler(threading.Thread):
+    """Samples the RSS of this process and all its children, keeping the peak."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        super().__init__(name="bench-rss", daemon=True)
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self.peak_bytes = 0
+
+    def run(self) -> None:
+        proc = psutil.Process()
+        while not self._stop_event.is_set():
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.peak_bytes = max(self.peak_bytes, total)
+            self._stop_event.wait(self._interval)
+
+    def stop(self) -> int:
+        """Stop sampling and return the peak in bytes."""
+        self._stop_event.set()
+        self.join()
+        return self.peak_bytes
+
+
+def make_frames(frame_shape: FrameShape, dtype: Dtype = Dtype.UINT16, variants: int = 2) -> list[np.ndarray]:
+    """Build a few distinct synthetic frames from the bundled reference image.
+
+    Frames are shifted copies of one noisy reference frame, so consecutive
+    frames differ (compressors can't collapse them) without generating a
+    new full-size frame per iteration.
+
+    Args:
+        frame_shape: Frame size (y, x)
+        dtype: Pixel type
+        variants: Number of distinct frames to cycle through
+    """
+    from voxel.drivers.cameras.simulated.frame_gen import ReferenceFrameGenerator
+
+    gen = ReferenceFrameGenerator(frame_shape.y, frame_shape.x, data_type=np.dtype(dtype.value))
+    base = np.ascontiguousarray(gen.generate(1)[0])
+    return [base if i == 0 else np.roll(base, 7 * i, axis=1) for i in range(variants)]
+
+
+def run_case(
+    case: BenchCase,
+    output_dir: Path,
+    *,
+    frames: int | None = None,
+    keep_output: bool = False,
+    frame_cache: dict[FrameShape, list[np.ndarray]] | None = None,
+) -> BenchResult:
+    """Write synthetic frames with one writer configuration and measure it.
+
+    Args:
+        case: Writer and settings to benchmark
+        output_dir: Directory to write into (a subdirectory per case)
+        frames: Frames to write (None = 4 batches)
+        keep_output: Keep the written data instead of deleting it
+        frame_cache: Reuse synthetic frames across cases of the same shape
+
+    Returns:
+        BenchResult; failures are recorded in `error` rather than raised.
+    """
+    frames = frames or case.batch_size * 4
+    result = BenchResult(
+        writer=case.writer,
+        frame_shape=f"{case.frame_shape.y}x{case.frame_shape.x}",
+        batch_size=case.batch_size,
+        compression=case.compression,
+        threads=case.threads,
+        frames=frames,
+    )
+
+    cache = frame_cache if frame_cache is not None else {}
+    if case.frame_shape not in cache:
+        cache[case.frame_shape] = make_frames(case.frame_shape)
+    source = cache[case.frame_shape]
+
+    case_dir = output_dir / case.label
+    cfg = WriterConfig(
+        name=case.label,
+        path=case_dir,
+        frame_count=frames,
+        frame_shape=case.frame_shape,
+        batch_size=case.batch_size,
+        dtype=Dtype.UINT16,
+        compression=case.compression,
+    )
+
+    sampler = _RssSampler()
+    sampler.start()
+    try:
+        with WriterPool(max_workers=1) as pool:
+            writer = open_writer(case.writer, cfg, pool=pool, threads=case.threads)
+            result.shm_mb = pool.shm_bytes / 1024**2 if pool.shm_bytes else None
+            start = time.perf_counter()
+            with writer:
+                for i in range(frames):
+                    writer.add_frame(source[i % len(source)])
+                status = writer.get_status()
+            result.seconds = time.perf_counter() - start
+            pool.wait_all()
+    except Exception as e:  # noqa: BLE001 - a failing case must not abort the sweep
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        result.peak_rss_mb = sampler.stop() / 1024**2
+        if not keep_output:
+            shutil.rmtree(case_dir, ignore_errors=True)
+
+    if result.error is None and result.seconds > 0:
+        result.throughput_gbs = frames * cfg.frame_bytes / 1024**3 / result.seconds
+        result.fps = frames / result.seconds
+        result.batch_ms_p99 = status.batch_ms_p99
+    return result
+
+
+def sweep(
+    writers: Iterable[str],
+    frame_shapes: Iterable[FrameShape],
+    batch_sizes: Iterable[int],
+    compressions: Iterable[str | None],
+    threads: Iterable[int | None] = (None,),
+) -> list[BenchCase]:
+    """Expand sweep axes into cases; thread counts only multiply formats that use them."""
+    threads = list(threads)
+    cases = []
+    for writer, shape, batch_size, codec in itertools.product(writers, frame_shapes, batch_sizes, compressions):
+        for t in threads if writer in THREADED_FORMATS else [None]:
+            case = BenchCase(writer, shape, batch_size, codec, t)
+            if case not in cases:
+                cases.append(case)
+    return cases
+
+
+def run_sweep(
+    cases: Sequence[BenchCase],
+    output_dir: Path | str | None = None,
+    *,
+    frames: int | None = None,
+    keep_output: bool = False,
+) -> list[BenchResult]:
+    """Run benchmark cases one after another, printing each result as it completes.
+
+    Args:
+        cases: Cases to run, e.g. from sweep()
+        output_dir: Directory to write into (None = a temporary directory)
+        frames: Frames per case (None = 4 batches)
+        keep_output: Keep the written data
+
+    Returns:
+        One BenchResult per case, in order.
+    """
+    out = Path(output_dir) if output_dir is not None else Path(tempfile.mkdtemp(prefix="voxel-bench-"))
+    out.mkdir(parents=True, exist_ok=True)
+
+    frame_cache: dict[FrameShape, list[np.ndarray]] = {}
+    results = []
+    for i, case in enumerate(cases, start=1):
+        result = run_case(case, out, frames=frames, keep_output=keep_output, frame_cache=frame_cache)
+        results.append(result)
+        print(f"[{i}/{len(cases)}] {format_table([result], header=False)}")
+    return results
+
+
+def format_table(results: Sequence[BenchResult], *, header: bool = True) -> str:
+    """Render results as a fixed-width text table."""
+    columns = [
+        ("writer", 9, lambda r: r.writer),
+        ("shape", 12, lambda r: r.frame_shape),
+        ("batch", 5, lambda r: r.batch_size),
+        ("codec", 10, lambda r: r.compression),
+        ("threads", 7, lambda r: r.threads if r.threads is not None else "-"),
+        ("GB/s", 6, lambda r: f"{r.throughput_gbs:.2f}"),
+        ("fps", 7, lambda r: f"{r.fps:.1f}"),
+        ("p99 ms", 8, lambda r: f"{r.batch_ms_p99:.0f}"),
+        ("RSS MB", 8, lambda r: f"{r.peak_rss_mb:.0f}"),
+        ("shm MB", 7, lambda r: f"{r.shm_mb:.0f}" if r.shm_mb is not None else "-"),
+    ]
+    lines = []
+    if header:
+        lines.append("  ".join(name.ljust(width) for name, width, _ in columns))
+    for r in results:
+        row = "  ".join(str(get(r)).ljust(width) for _, width, get in columns)
+        lines.append(row + (f"  ERROR {r.error}" if r.error else ""))
+    return "\n".join(lines)
+
+
+def _parse_shape(text: str) -> FrameShape:
+    y, x = text.lower().split("x")
+    return FrameShape(int(y), int(x))
+
+
+def main(argv: Sequence[str] | None = None) -> list[BenchResult]:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark voxel writers with synthetic frames.")
+    parser.add_argument("--writers", nargs="+", default=["ome-tiff", "raw"], choices=WRITER_FORMATS)
+    parser.add_argument(
+        "--shapes",
+        nargs="+",
+        type=_parse_shape,
+        default=[VP151MX_SHAPE],
+        help="Frame shapes as YxX (default: VP-151MX 10640x14192)",
+    )
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[64])
+    parser.add_argument("--codecs", nargs="+", default=["none"], help="Compression names as WriterConfig.compression")
+    parser.add_argument("--threads", nargs="+", type=int, default=[None], help="Thread counts for threaded writers")
+    parser.add_argument("--frames", type=int, default=None, help="Frames per case (default: 4 batches)")
+    parser.add_argument("--output", type=Path, default=None, help="Directory to write to (default: temp dir)")
+    parser.add_argument("--keep-output", action="store_true", help="Keep the written data")
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    cases = sweep(args.writers, args.shapes, args.batch_sizes, args.codecs, args.threads)
+    results = run_sweep(cases, args.output, frames=args.frames, keep_output=args.keep_output)
+
+    print()
+    print(format_table(results))
+    if args.json is not None:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Shared codec registry for voxel writers.
+
+Writers that compress chunks themselves (OME-TIFF strips, local Zarr shards)
+and writers that hand compression to an SDK (TensorStore, Imaris, HDF5) all
+resolve `WriterConfig.compression` here, so one name means the same codec
+everywhere.
+
+Names are registry keys with an optional level, `"<name>[:<level>]"`:
+
+    none                    no compression
+    blosc.lz4               Blosc LZ4, byte shuffle (level 5)
+    blosc.lz4.bitshuffle    Blosc LZ4, bit shuffle
+    blosc.lz4.noshuffle     Blosc LZ4, no shuffle
+    blosc.zstd              Blosc Zstd, byte shuffle (level 5)
+    blosc.zstd.bitshuffle   Blosc Zstd, bit shuffle
+    blosc.zstd.noshuffle    Blosc Zstd, no shuffle
+    zstd                    plain Zstd (level 3)
+    gzip                    gzip/deflate (level 5)
+
+e.g. `"blosc.zstd.bitshuffle:7"` or `"zstd:1"`. Writers report the ratio and
+speed each codec actually achieves in StreamStatus (see CodecMeter), so codecs
+can be compared on real data.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any
+
+import numcodecs
+
+SHUFFLES = {
+    "noshuffle": numcodecs.Blosc.NOSHUFFLE,
+    "shuffle": numcodecs.Blosc.SHUFFLE,
+    "bitshuffle": numcodecs.Blosc.BITSHUFFLE,
+}
+
+ALGORITHMS = ("none", "blosc.lz4", "blosc.zstd", "zstd", "gzip")
+
+LEVEL_RANGES = {"blosc.lz4": (1, 9), "blosc.zstd": (1, 9), "zstd": (1, 22), "gzip": (1, 9), "none": (0, 0)}
+"""Valid levels per algorithm (inclusive)."""
+
+
+@dataclass(frozen=True)
+class CodecSpec:
+    """One lossless codec configuration: algorithm, level and Blosc shuffle."""
+
+    name: str
+    """Registry name (without level)."""
+    algorithm: str
+    """One of ALGORITHMS."""
+    level: int = 0
+    shuffle: str = "noshuffle"
+    """Blosc shuffle filter, one of SHUFFLES (ignored by other algorithms)."""
+
+    @property
+    def label(self) -> str:
+        """Name with level, as accepted by get_codec()."""
+        return self.name if self.algorithm == "none" else f"{self.name}:{self.level}"
+
+    @property
+    def levels(self) -> tuple[int, int]:
+        """Valid (min, max) level of this codec's algorithm."""
+        return LEVEL_RANGES[self.algorithm]
+
+    def with_level(self, level: int) -> CodecSpec:
+        """Copy with a different level, clamped to the algorithm's range."""
+        low, high = self.levels
+        return replace(self, level=min(max(level, low), high))
+
+    def numcodec(self) -> numcodecs.abc.Codec | None:
+        """numcodecs codec for this configuration (None = uncompressed).
+
+        Blosc shuffles in units of the itemsize of the arrays it encodes.
+        """
+        match self.algorithm:
+            case "blosc.lz4" | "blosc.zstd":
+                cname = self.algorithm.removeprefix("blosc.")
+                return numcodecs.Blosc(cname=cname, clevel=self.level, shuffle=SHUFFLES[self.shuffle])
+            case "zstd":
+                return numcodecs.Zstd(level=self.level)
+            case "gzip":
+                return numcodecs.GZip(level=self.level)
+        return None
+
+    def zarr_metadata(self, itemsize: int = 2) -> dict[str, Any] | None:
+        """Zarr v3 codec JSON for this configuration (None = uncompressed).
+
+        Args:
+            itemsize: Bytes per pixel (Blosc typesize)
+        """
+        match self.algorithm:
+            case "blosc.lz4" | "blosc.zstd":
+                meta = {
+                    "cname": self.algorithm.removeprefix("blosc."),
+                    "clevel": self.level,
+                    "shuffle": self.shuffle,
+                    "typesize": itemsize,
+                    "blocksize": 0,
+                }
+                return {"name": "blosc", "configuration": meta}
+            case "zstd":
+                return {"name": "zstd", "configuration": {"level": self.level, "checksum": False}}
+            case "gzip":
+                return {"name": "gzip", "configuration": {"level": self.level}}
+        return None
+
+    @classmethod
+    def from_zarr_metadata(cls, meta: dict[str, Any] | None) -> CodecSpec:
+        """Codec described by Zarr v3 codec JSON (None = uncompressed).
+
+        Raises:
+            ValueError: If the codec is not one this module supports.
+        """
+        if meta is None:
+            return CODECS["none"]
+        cfg = meta["configuration"]
+        match meta["name"]:
+            case "blosc":
+                shuffle = cfg["shuffle"]
+                name = f"blosc.{cfg['cname']}" + ("" if shuffle == "shuffle" else f".{shuffle}")
+                return replace(get_codec(name), level=cfg["clevel"])
+            case "zstd" | "gzip":
+                return get_codec(meta["name"]).with_level(cfg["level"])
+        msg = f"Unsupported codec {meta['name']!r}"
+        raise ValueError(msg)
+
+
+CODECS: dict[str, CodecSpec] = {}
+"""Registered codecs by name, at their default level."""
+
+
+def register_codec(spec: CodecSpec) -> None:
+    """Add (or replace) a named codec configuration in the registry."""
+    if spec.algorithm not in ALGORITHMS or spec.shuffle not in SHUFFLES:
+        msg = f"Unknown algorithm or shuffle in {spec}"
+        raise ValueError(msg)
+    CODECS[spec.name] = spec
+
+
+def get_codec(name: str | None) -> CodecSpec:
+    """Look up a codec by registry name, with an optional `:level` suffix.
+
+    Args:
+        name: e.g. "blosc.zstd", "blosc.lz4.bitshuffle:3", "zstd:9"; None means "none"
+
+    Returns:
+        The CodecSpec, at the given level (clamped to the valid range) or its default.
+
+    Raises:
+        ValueError: If the name is not registered or the level is not an integer.
+    """
+    if name is None:
+        return CODECS["none"]
+    base, _, level = name.lower().partition(":")
+    if base not in CODECS:
+        msg = f"Unknown codec {name!r}, expected one of {sorted(CODECS)} with an optional ':level'"
+        raise ValueError(msg)
+    spec = CODECS[base]
+    if level:
+        try:
+            return spec.with_level(int(level))
+        except ValueError:
+            msg = f"Codec level must be an integer, got {name!r}"
+            raise ValueError(msg) from None
+    return spec
+
+
+for _spec in (
+    CodecSpec("none", "none"),
+    CodecSpec("blosc.lz4", "blosc.lz4", 5, "shuffle"),
+    CodecSpec("blosc.lz4.bitshuffle", "blosc.lz4", 5, "bitshuffle"),
+    CodecSpec("blosc.lz4.noshuffle", "blosc.lz4", 5, "noshuffle"),
+    CodecSpec("blosc.zstd", "blosc.zstd", 5, "shuffle"),
+    CodecSpec("blosc.zstd.bitshuffle", "blosc.zstd", 5, "bitshuffle"),
+    CodecSpec("blosc.zstd.noshuffle", "blosc.zstd", 5, "noshuffle"),
+    CodecSpec("zstd", "zstd", 3),
+    CodecSpec("gzip", "gzip", 5),
+):
+    register_codec(_spec)
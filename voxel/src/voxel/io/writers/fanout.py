@@ -0,0 +1,572 @@
+"""FanOutWriter - One buffered stream feeding several sinks.
+
+This module provides a writer that shares a single shared-memory ring among
+several BatchProcessor sinks, e.g. a full-resolution OME-Zarr store, a
+maximum-intensity projection and a downsampled overview of the same tile.
+Every frame is copied into shared memory once, however many outputs it has.
+
+In the writer subprocess each sink runs on its own thread and sees every
+batch, read-only and in order. A batch's slot is held under a SlotLease with
+one reference per sink and returns to the producer when the last sink is
+done with it, so a fast sink can move on to the next batch while a slow one
+is still busy; the ring only fills up when the slowest sink falls behind.
+
+Components:
+    FanOutWriter: VoxelWriter feeding one ring to several sinks
+    MaxProjectionSink: Maximum-intensity projection along z, saved as a TIFF
+    OverviewSink: Block-mean downsampled stack, saved as a TIFF
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+import numpy as np
+import tifffile as tf
+
+from .engine import (
+    BufferManager,
+    FilteredBatchProcessor,
+    FrameSlot,
+    OverflowHandler,
+    SlotLease,
+    WriterPool,
+    WriterProcess,
+)
+from .types import StreamMetrics, StreamStatus, WriterConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .engine import BatchProcessor
+
+
+class FanOutWriter:
+    """Writer that feeds one shared-memory ring to several BatchProcessor sinks.
+
+    Implements the VoxelWriter Protocol using composition with
+    BufferManager and WriterProcess components. Sinks are BatchProcessors:
+    the built-in MaxProjectionSink and OverviewSink, a
+    `ShardedZarrWriter(cfg, sink=True)`, or any object with
+    initialize/process_batch/finalize. They are pickled into the writer
+    subprocess, initialized there, and must not modify the batches they get.
+    A sink's `prefilter` (e.g. lossy quantization) is applied on its thread.
+
+    Example:
+        ```python
+        from voxel.io.writers import FanOutWriter, MaxProjectionSink, OverviewSink, ShardedZarrWriter
+
+        sinks = [
+            ShardedZarrWriter(cfg, threads=8, sink=True),
+            MaxProjectionSink(cfg.path / f"{cfg.name}_mip.tiff"),
+            OverviewSink(cfg.path / f"{cfg.name}_overview.tiff", factor=8),
+        ]
+        with FanOutWriter(cfg, sinks) as writer:
+            for frame in camera.stream():
+                writer.add_frame(frame)
+        ```
+    """
+
+    def __init__(
+        self,
+        cfg: WriterConfig,
+        sinks: Sequence[BatchProcessor],
+        *,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+    ) -> None:
+        """Initialize the FanOutWriter.
+
+        Args:
+            cfg: Writer configuration specifying dimensions, batch size, etc.
+            sinks: BatchProcessors that each receive every batch
+            slots: Number of shared memory ring buffer slots (minimum 2)
+            pool: Optional WriterPool to lease a persistent subprocess and buffer from
+
+        Raises:
+            ValueError: If there are no sinks, or cfg.pack_12bit is set (the unpacked
+                batch is reused for the next batch while sinks may still read it).
+        """
+        from voxel.utils.log import VoxelLogging
+
+        if not sinks:
+            msg = "FanOutWriter needs at least one sink"
+            raise ValueError(msg)
+        if cfg.pack_12bit:
+            msg = "FanOutWriter does not support pack_12bit"
+            raise ValueError(msg)
+
+        self._cfg = cfg
+        self.log = VoxelLogging.get_logger(obj=self)
+        self._log_queue = VoxelLogging.get_queue()
+        self._sinks = list(sinks)
+
+        # Sink threads (initialized in subprocess)
+        self._queues: list[queue.SimpleQueue] = []
+        self._threads: list[threading.Thread] = []
+        self._errors: list[BaseException | None] = []
+
+        # One failure flag per sink, set in the subprocess and read by get_status/close
+        self._failed: SharedMemory | None = SharedMemory(create=True, size=len(self._sinks))
+        self._failed.buf[:] = bytes(len(self._sinks))
+        self._failed_final: list[str] = []
+
+        # Compose components (leased from the pool when one is given)
+        self._pool = pool
+        if pool is not None:
+            self._buffer, self._process = pool.acquire(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+            )
+        else:
+            self._buffer = BufferManager(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+            )
+
+            self._process = WriterProcess(
+                name=f"FanOutWriter-{cfg.name}",
+                processor=self,  # FanOutWriter implements LeasedBatchProcessor
+                buffer_mgr=self._buffer,
+                frame_count=cfg.frame_count,
+                log_queue=self._log_queue,
+            )
+
+        # Applies cfg.overflow_policy when the slowest sink falls behind
+        self._overflow = OverflowHandler(self._buffer, self._process, cfg.overflow_policy, cfg.spill_dir)
+
+        # Performance tracking
+        self._metrics: StreamMetrics | None = None
+
+        # Start the writer
+        self._start()
+
+    @property
+    def cfg(self) -> WriterConfig:
+        """Writer configuration."""
+        return self._cfg
+
+    @property
+    def sinks(self) -> list[BatchProcessor]:
+        """Sinks fed by this writer (parent-process copies; they run in the subprocess)."""
+        return self._sinks
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer is actively running."""
+        return self._process.is_running
+
+    @property
+    def failed_sinks(self) -> list[str]:
+        """Sinks that failed during the stream or on finalize; they skip every later batch."""
+        if self._failed is None:
+            return self._failed_final
+        return [self._sink_name(i) for i, flag in enumerate(self._failed.buf) if flag]
+
+    @property
+    def frames_added(self) -> int:
+        """Number of frames added to the writer."""
+        return self._process.frames_added
+
+    @property
+    def frames_processed(self) -> int:
+        """Number of frames every sink is done with."""
+        return self._process.frames_processed
+
+    @property
+    def batch_count(self) -> int:
+        """Number of batches every sink is done with."""
+        return self._process.batch_count
+
+    def _start(self) -> None:
+        """Start the writer subprocess."""
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
+        self._process.start(self, trace_path=self._cfg.trace_path)
+        self.log.info(
+            "Started FanOutWriter: %s frames to %s",
+            self._cfg.frame_count,
+            ", ".join(type(sink).__name__ for sink in self._sinks),
+        )
+
+    def add_frame(self, frame: np.ndarray) -> None:
+        """Add a single 2D frame to the writer.
+
+        Args:
+            frame: 2D numpy array with shape matching frame_shape.
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in shared memory for zero-copy writes.
+
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the ring buffer.
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        if not self.is_running:
+            msg = "Cannot add frame: writer is not running"
+            raise RuntimeError(msg)
+
+        return self._overflow.acquire_slot(on_commit=self._commit_frame)
+
+    def _commit_frame(self) -> None:
+        """Track acquisition rate and flush the stream once the last frame is in."""
+        if self._metrics:
+            self._metrics.tick()
+
+        if self._overflow.frames_received == self._cfg.frame_count:
+            self._overflow.flush()
+            self.log.info("Added last frame %d. Waiting for all sinks...", self.frames_added)
+            self._process.wait_all()
+
+    def get_status(self) -> StreamStatus:
+        """Get a snapshot of the current writer status.
+
+        Batch times run until the last sink is done with a batch.
+
+        Returns:
+            StreamStatus with progress and performance metrics.
+        """
+        frames_received = self._overflow.frames_received
+        frames_remaining = self._cfg.frame_count - frames_received
+
+        # Estimate remaining time
+        estimated_remaining = None
+        if self._metrics and self._metrics.fps > 0 and frames_remaining > 0:
+            estimated_remaining = frames_remaining / self._metrics.fps
+
+        # Buffer status and writer metrics (one consistent read)
+        buffers = self._buffer.get_buffer_statuses()
+        stats = self._process.snapshot()
+
+        return StreamStatus(
+            fps=self._metrics.fps if self._metrics else 0.0,
+            fps_inst=self._metrics.fps_inst if self._metrics else 0.0,
+            throughput_gbs=stats.avg_rate_gbs,
+            throughput_gbs_inst=stats.rolling_rate_gbs,
+            frames_acquired=frames_received,
+            total_frames=self._cfg.frame_count,
+            frames_remaining=frames_remaining,
+            current_batch=stats.batch_count,
+            total_batches=self._cfg.num_batches,
+            current_slot=self._buffer.write_slot_idx,
+            buffers=buffers,
+            elapsed_time=self._process.elapsed_time,
+            estimated_remaining=estimated_remaining,
+            handoff_latency_ms=stats.avg_handoff_s * 1000,
+            **stats.latency_fields(),
+            overflow_policy=self._overflow.policy.value,
+            frames_dropped=self._overflow.frames_dropped,
+            spilled_bytes=self._overflow.spilled_bytes,
+            max_queue_depth=self._overflow.max_queue_depth,
+            failed_sinks=self.failed_sinks,
+        )
+
+    def wait_all(self) -> None:
+        """Wait until every sink is done with every batch added so far."""
+        self._process.wait_all()
+
+    def close(self) -> None:
+        """Close the writer, letting every sink finish and finalize.
+
+        A failed sink does not stop the others; it is logged as an error here
+        and listed in `failed_sinks`.
+        """
+        if not self.is_running:
+            return
+
+        self._overflow.flush()
+        self._process.stop()
+        self._overflow.close()
+        if self._pool is None:
+            self._buffer.close()
+
+        # Sinks finalize at the end of the job; a pooled lane does that after stop() returns
+        if self._pool is not None:
+            self._process.wait_idle()
+        self._failed_final = self.failed_sinks
+        self._failed.close()
+        self._failed.unlink()
+        self._failed = None
+
+        if self._overflow.frames_dropped:
+            self.log.warning("%s dropped %d frames on overflow", self._cfg.name, self._overflow.frames_dropped)
+        for name in self._failed_final:
+            self.log.error("%s: sink %s failed, its output is incomplete", self._cfg.name, name)
+
+        self.log.info(
+            "Closed FanOutWriter. Frames: %d/%d to %d sinks, Avg: %.2f GB/s",
+            self.frames_processed,
+            self._cfg.frame_count,
+            len(self._sinks),
+            self._process.avg_rate_gbs,
+        )
+
+    def __enter__(self) -> Self:
+        """Enter context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: object,
+    ) -> None:
+        """Exit context manager, ensuring close() is called."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"FanOutWriter("
+            f"name={self._cfg.name!r}, "
+            f"sinks={len(self._sinks)}, "
+            f"frames={self.frames_added}/{self._cfg.frame_count}, "
+            f"running={self.is_running})"
+        )
+
+    def __getstate__(self) -> dict:
+        """Pickle only processor state; engine components stay in the parent process."""
+        state = self.__dict__.copy()
+        for key in ("_buffer", "_process", "_pool", "_overflow", "_metrics", "_log_queue"):
+            state[key] = None
+        return state
+
+    def _sink_name(self, sink_idx: int) -> str:
+        """Sink class and position, e.g. 'OverviewSink #2'."""
+        return f"{type(self._sinks[sink_idx]).__name__} #{sink_idx}"
+
+    # =========================================================================
+    # LeasedBatchProcessor Protocol implementation (called in subprocess)
+    # =========================================================================
+
+    def initialize(self) -> None:
+        """Initialize every sink and start one thread per sink."""
+        for sink in self._sinks:
+            sink.initialize()
+        self._queues = [queue.SimpleQueue() for _ in self._sinks]
+        self._errors = [None] * len(self._sinks)
+        self._threads = [
+            threading.Thread(target=self._run_sink, args=(i,), name=f"fanout-{type(sink).__name__}", daemon=True)
+            for i, sink in enumerate(self._sinks)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.log.info("Initialized %d sinks", len(self._sinks))
+
+    def process_batch_leased(self, batch_data: np.ndarray, batch_idx: int, lease: SlotLease) -> None:
+        """Queue a batch for every sink, each holding a reference to the slot until it is done."""
+        lease.acquire(len(self._sinks))
+        for jobs in self._queues:
+            jobs.put((batch_data, batch_idx, lease))
+
+    def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:
+        """Feed a batch to every sink and wait for all of them (when not driven with a SlotLease)."""
+        done = threading.Event()
+        lease = SlotLease(done.set, threading.Lock())
+        self.process_batch_leased(batch_data, batch_idx, lease)
+        lease.release()
+        done.wait()
+
+    def finalize(self) -> None:
+        """Let every sink drain its queue, then finalize the sinks."""
+        for jobs in self._queues:
+            jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        for i, (sink, error) in enumerate(zip(self._sinks, self._errors, strict=True)):
+            if error is not None:
+                self.log.error("Sink %s failed during the stream: %s", self._sink_name(i), error)
+            try:
+                sink.finalize()
+            except Exception:
+                self._failed.buf[i] = 1
+                self.log.exception("Failed to finalize sink %s", self._sink_name(i))
+        self.log.info("Finalized %d sinks", len(self._sinks))
+
+    def _run_sink(self, sink_idx: int) -> None:
+        """Sink thread: process queued batches in order, releasing each one's lease when done.
+
+        After a failure the sink skips the remaining batches but keeps
+        releasing them, so the other sinks and the producer are not blocked.
+        The failure is flagged in shared memory for the parent process.
+        """
+        sink = self._sinks[sink_idx]
+        prefilter = sink.prefilter if isinstance(sink, FilteredBatchProcessor) else None
+        jobs = self._queues[sink_idx]
+        while (job := jobs.get()) is not None:
+            batch_data, batch_idx, lease = job
+            try:
+                if self._errors[sink_idx] is None:
+                    data = prefilter(batch_data) if prefilter is not None else batch_data
+                    sink.process_batch(data, batch_idx)
+            except Exception as e:
+                self._errors[sink_idx] = e
+                self._failed.buf[sink_idx] = 1
+                self.log.exception("Sink %s failed on batch %d", self._sink_name(sink_idx), batch_idx)
+            finally:
+                lease.release()
+
+
+class MaxProjectionSink:
+    """BatchProcessor that saves the maximum-intensity projection along z as a 2D TIFF."""
+
+    def __init__(self, path: Path | str) -> None:
+        """Initialize the MaxProjectionSink.
+
+        Args:
+            path: Output TIFF file
+        """
+        self._path = Path(path)
+        self._mip: np.ndarray | None = None
+
+    @property
+    def path(self) -> Path:
+        """Output TIFF file."""
+        return self._path
+
+    def initialize(self) -> None:
+        """Reset the projection."""
+        self._mip = None
+
+    def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:  # noqa: ARG002 - BatchProcessor signature
+        """Fold the batch into the running projection."""
+        mip = batch_data.max(axis=0)
+        if self._mip is None:
+            self._mip = mip
+        else:
+            np.maximum(self._mip, mip, out=self._mip)
+
+    def finalize(self) -> None:
+        """Write the projection."""
+        if self._mip is None:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tf.imwrite(self._path, self._mip, photometric="minisblack")
+        self._mip = None
+
+
+class OverviewSink:
+    """BatchProcessor that saves a `factor`x block-mean downsampled copy of the stack as a TIFF.
+
+    Frames are binned in y and x as they arrive; z planes are averaged in
+    groups of `factor` across batch boundaries, with the last group holding
+    whatever frames remain.
+    """
+
+    def __init__(self, path: Path | str, factor: int = 4) -> None:
+        """Initialize the OverviewSink.
+
+        Args:
+            path: Output TIFF file
+            factor: Downsampling factor along z, y and x
+
+        Raises:
+            ValueError: If factor is less than 1.
+        """
+        if factor < 1:
+            msg = f"factor must be at least 1, got {factor}"
+            raise ValueError(msg)
+        self._path = Path(path)
+        self._factor = factor
+        self._tiff: tf.TiffWriter | None = None
+        self._carry: np.ndarray | None = None
+        self._dtype: np.dtype | None = None
+
+    @property
+    def path(self) -> Path:
+        """Output TIFF file."""
+        return self._path
+
+    def initialize(self) -> None:
+        """Open the output file."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._tiff = tf.TiffWriter(self._path, bigtiff=True)
+        self._carry = None
+
+    def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:  # noqa: ARG002 - BatchProcessor signature
+        """Bin the batch and write every complete group of `factor` planes."""
+        f = self._factor
+        self._dtype = batch_data.dtype
+        y, x = batch_data.shape[1] // f, batch_data.shape[2] // f
+        binned = batch_data[:, : y * f, : x * f].reshape(-1, y, f, x, f).mean(axis=(2, 4), dtype=np.float32)
+        if self._carry is not None:
+            binned = np.concatenate([self._carry, binned])
+
+        full = binned.shape[0] // f * f
+        if full:
+            self._write(binned[:full].reshape(-1, f, y, x).mean(axis=1))
+        self._carry = binned[full:] if full < binned.shape[0] else None
+
+    def finalize(self) -> None:
+        """Write the last partial group of planes and close the file."""
+        if self._tiff is None:
+            return
+        if self._carry is not None:
+            self._write(self._carry.mean(axis=0, keepdims=True))
+            self._carry = None
+        self._tiff.close()
+        self._tiff = None
+
+    def _write(self, planes: np.ndarray) -> None:
+        if np.issubdtype(self._dtype, np.integer):
+            planes = np.rint(planes)
+        self._tiff.write(planes.astype(self._dtype), photometric="minisblack", contiguous=True)
+
+
+def test_fanout_writer() -> None:
+    """Write one stream to a sharded OME-Zarr store, a max projection and an overview."""
+    from datetime import UTC, datetime
+
+    from voxel.utils.log import VoxelLogging
+
+    from .shardzarr import ShardedZarrWriter
+    from .types import Dtype, FrameShape
+
+    VoxelLogging.setup(level="DEBUG")
+
+    cfg = WriterConfig(
+        name=f"test_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}",
+        path="test_output",
+        frame_count=200,
+        frame_shape=FrameShape(512, 700),
+        batch_size=64,
+        dtype=Dtype.UINT16,
+        compression="blosc.zstd",
+    )
+    sinks = [
+        ShardedZarrWriter(cfg, threads=4, sink=True),
+        MaxProjectionSink(cfg.path / f"{cfg.name}_mip.tiff"),
+        OverviewSink(cfg.path / f"{cfg.name}_overview.tiff", factor=4),
+    ]
+
+    with FanOutWriter(cfg, sinks) as writer:
+        for i in range(cfg.frame_count):
+            frame = np.random.randint(0, 4095, (512, 700), dtype=np.uint16)
+            writer.add_frame(frame)
+
+            if i % 50 == 0:
+                print(writer.get_status().summary())
+
+    print(f"Saved to: {cfg.path}")
+
+
+if __name__ == "__main__":
+    test_fanout_writer()
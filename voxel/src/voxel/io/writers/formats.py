@@ -0,0 +1,72 @@
+"""Writer lookup by output format name.
+
+Used wherever a writer is chosen at runtime (offline conversion, benchmarks)
+rather than imported directly. Writers are imported lazily so optional SDKs
+(PyImarisWriter, TensorStore) are only needed for the formats actually used.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .types import BdvWriterConfig, WriterConfig
+
+if TYPE_CHECKING:
+    from .engine import WriterPool
+    from .protocol import VoxelWriter
+
+WRITER_FORMATS = ("ome-tiff", "ome-zarr", "zarr-local", "imaris", "bdv", "raw")
+
+
+def open_writer(
+    fmt: str,
+    cfg: WriterConfig,
+    *,
+    pool: WriterPool | None = None,
+    threads: int | None = None,
+) -> VoxelWriter:
+    """Create a writer for the given output format.
+
+    Args:
+        fmt: One of WRITER_FORMATS
+        cfg: Writer configuration
+        pool: WriterPool to lease engine components from (ignored by OME-Zarr)
+        threads: Writer thread count (Imaris, OME-TIFF and local Zarr compression, BDV pyramid; None = writer default)
+
+    Returns:
+        A started VoxelWriter.
+
+    Raises:
+        ValueError: If fmt is not a known format.
+    """
+    match fmt:
+        case "ome-tiff":
+            from .ometiff import OMETiffWriter
+
+            return OMETiffWriter(cfg, pool=pool, compression_workers=threads)
+        case "imaris":
+            from .imaris import ImarisWriter
+
+            return ImarisWriter(cfg, thread_count=threads, pool=pool)
+        case "zarr-local":
+            from .shardzarr import ShardedZarrWriter
+
+            return ShardedZarrWriter(cfg, threads=threads, pool=pool)
+        case "raw":
+            from .raw import RawStreamWriter
+
+            return RawStreamWriter(cfg, pool=pool)
+        case "bdv":
+            from .bdv import BdvWriter
+
+            if not isinstance(cfg, BdvWriterConfig):
+                cfg = BdvWriterConfig(**{name: getattr(cfg, name) for name in WriterConfig.model_fields})
+            return BdvWriter(cfg, pool=pool, pyramid_workers=threads)
+        case "ome-zarr":
+            from ome_zarr_writer.backends.ts import TensorStoreBackend
+
+            from .omezarr import OMEZarrWriter, create_ozw_config
+
+            return OMEZarrWriter(cfg, TensorStoreBackend(create_ozw_config(cfg), cfg.path))
+    msg = f"Unknown writer format {fmt!r}, expected one of {WRITER_FORMATS}"
+    raise ValueError(msg)
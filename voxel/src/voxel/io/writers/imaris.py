@@ -17,7 +17,9 @@ import numpy as np
 from ome_types.model import PixelType
 from PyImarisWriter import PyImarisWriter as imaris  # noqa: N813
 
-from .engine import BufferManager, WriterProcess
+from .engine import BufferManager, FrameSlot, OverflowHandler, WriterPool, WriterProcess
+from .noise import NoiseQuantizer
+from .stats import PhaseTimer
 from .types import FrameShape, StreamMetrics, StreamStatus, VolumeShape, WriterConfig
 
 
@@ -69,12 +71,21 @@ class ImarisWriter:
     DEFAULT_THREAD_COUNT = mp.cpu_count()
     DEFAULT_XY_BLOCK_SIZE = 256
 
-    def __init__(self, cfg: WriterConfig, *, thread_count: int | None = None) -> None:
+    def __init__(
+        self,
+        cfg: WriterConfig,
+        *,
+        thread_count: int | None = None,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+    ) -> None:
         """Initialize the ImarisWriter.
 
         Args:
             cfg: Writer configuration specifying output path, dimensions, etc.
             thread_count: Number of writer threads (None = auto, uses cpu_count)
+            slots: Number of shared memory ring buffer slots (minimum 2)
+            pool: Optional WriterPool to lease a persistent subprocess and buffer from
         """
         from voxel.utils.log import VoxelLogging
 
@@ -82,9 +93,10 @@ class ImarisWriter:
         self.log = VoxelLogging.get_logger(obj=self)
         self._log_queue = VoxelLogging.get_queue()
 
-        # Map compression string to enum
+        # Map compression string to enum (the SDK's shuffled LZ4 is the registry's "blosc.lz4")
         compression_map = {
             "lz4shuffle": ImarisCompression.LZ4SHUFFLE,
+            "blosc.lz4": ImarisCompression.LZ4SHUFFLE,
             "none": ImarisCompression.NONE,
         }
         self._compression = compression_map.get(
@@ -109,7 +121,7 @@ class ImarisWriter:
         # Imaris SDK objects (initialized in subprocess)
         self._image_converter: imaris.ImageConverter | None = None
         self._blocks_per_batch: imaris.ImageSize | None = None
-        self._callback_class = ImarisProgressChecker(self)
+        self._callback_class: ImarisProgressChecker | None = None
 
         # Setup output directory
         output_dir = Path(cfg.path)
@@ -117,23 +129,40 @@ class ImarisWriter:
             output_dir.mkdir(parents=True, exist_ok=True)
             self.log.warning("Created output directory: %s", output_dir)
 
-        # Compose components
-        self._buffer = BufferManager(
-            batch_size=cfg.batch_size,
-            frame_shape=cfg.frame_shape,
-            dtype="uint16",
-        )
+        # Compose components (leased from the pool when one is given)
+        self._pool = pool
+        if pool is not None:
+            self._buffer, self._process = pool.acquire(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+        else:
+            self._buffer = BufferManager(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
 
-        self._process = WriterProcess(
-            name=f"ImarisWriter-{cfg.name}",
-            processor=self,  # ImarisWriter implements BatchProcessor
-            buffer_mgr=self._buffer,
-            frame_count=cfg.frame_count,
-            log_queue=self._log_queue,
-        )
+            self._process = WriterProcess(
+                name=f"ImarisWriter-{cfg.name}",
+                processor=self,  # ImarisWriter implements BatchProcessor
+                buffer_mgr=self._buffer,
+                frame_count=cfg.frame_count,
+                log_queue=self._log_queue,
+            )
+
+        # Applies cfg.overflow_policy when the writer falls behind
+        self._overflow = OverflowHandler(self._buffer, self._process, cfg.overflow_policy, cfg.spill_dir)
 
         # Performance tracking
         self._metrics: StreamMetrics | None = None
+        self.phases = PhaseTimer()  # per-batch phase times, collected by WriterProcess
+        self.prefilter = NoiseQuantizer.from_config(cfg)  # cfg.lossy, run by WriterProcess
 
         # Start the writer
         self._start()
@@ -151,7 +180,7 @@ class ImarisWriter:
     @property
     def pixel_type(self) -> PixelType:
         """Pixel type for the written data."""
-        return PixelType.UINT16
+        return PixelType(self._cfg.dtype.value)
 
     @property
     def frames_added(self) -> int:
@@ -170,10 +199,9 @@ class ImarisWriter:
 
     def _start(self) -> None:
         """Start the writer subprocess."""
-        frame_bytes = self._cfg.frame_shape.y * self._cfg.frame_shape.x * 2
-        self._metrics = StreamMetrics(frame_bytes)
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
 
-        self._process.start()
+        self._process.start(self, trace_path=self._cfg.trace_path)
 
         self.log.info(
             "Started ImarisWriter: %s frames, batch_size=%d, output=%s",
@@ -188,6 +216,24 @@ class ImarisWriter:
         Args:
             frame: 2D numpy array with shape matching frame_shape.
 
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in shared memory for zero-copy writes.
+
+        Fill `slot.data` in place (e.g. `camera.grab_frame_into(slot.data)`)
+        and call `slot.commit()`, or use the slot as a context manager.
+        If the ring is full, cfg.overflow_policy decides whether this blocks
+        or returns a scratch frame that is dropped or spilled on commit.
+
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the ring buffer.
+
         Raises:
             RuntimeError: If writer is not running or has been closed.
         """
@@ -195,19 +241,15 @@ class ImarisWriter:
             msg = "Cannot add frame: writer is not running"
             raise RuntimeError(msg)
 
-        self._buffer.add_frame(frame)
-        self._process.frames_added += 1
+        return self._overflow.acquire_slot(on_commit=self._commit_frame)
 
+    def _commit_frame(self) -> None:
+        """Track acquisition rate and flush the stream once the last frame is in."""
         if self._metrics:
             self._metrics.tick()
 
-        is_last_frame = self.frames_added == self._cfg.frame_count
-        buffer_full = self._buffer.is_full
-
-        if buffer_full or is_last_frame:
-            self._process.signal_batch_ready()
-
-        if is_last_frame:
+        if self._overflow.frames_received == self._cfg.frame_count:
+            self._overflow.flush()
             self.log.info("Added last frame %d. Waiting for processing...", self.frames_added)
             self._process.wait_all()
 
@@ -217,30 +259,38 @@ class ImarisWriter:
         Returns:
             StreamStatus with progress and performance metrics.
         """
-        frames_remaining = self._cfg.frame_count - self.frames_added
+        frames_received = self._overflow.frames_received
+        frames_remaining = self._cfg.frame_count - frames_received
 
         # Estimate remaining time
         estimated_remaining = None
         if self._metrics and self._metrics.fps > 0 and frames_remaining > 0:
             estimated_remaining = frames_remaining / self._metrics.fps
 
-        # Buffer status
-        buffers = {i: self._buffer.get_buffer_status(i, self.batch_count) for i in range(2)}
+        # Buffer status and writer metrics (one consistent read)
+        buffers = self._buffer.get_buffer_statuses()
+        stats = self._process.snapshot()
 
         return StreamStatus(
             fps=self._metrics.fps if self._metrics else 0.0,
             fps_inst=self._metrics.fps_inst if self._metrics else 0.0,
-            throughput_gbs=self._process.avg_rate_gbs,
-            throughput_gbs_inst=self._process.avg_rate_gbs,
-            frames_acquired=self.frames_added,
+            throughput_gbs=stats.avg_rate_gbs,
+            throughput_gbs_inst=stats.rolling_rate_gbs,
+            frames_acquired=frames_received,
             total_frames=self._cfg.frame_count,
             frames_remaining=frames_remaining,
-            current_batch=self.batch_count,
+            current_batch=stats.batch_count,
             total_batches=self._cfg.num_batches,
-            current_slot=self._buffer.write_buffer_idx,
+            current_slot=self._buffer.write_slot_idx,
             buffers=buffers,
             elapsed_time=self._process.elapsed_time,
             estimated_remaining=estimated_remaining,
+            handoff_latency_ms=stats.avg_handoff_s * 1000,
+            **stats.latency_fields(),
+            overflow_policy=self._overflow.policy.value,
+            frames_dropped=self._overflow.frames_dropped,
+            spilled_bytes=self._overflow.spilled_bytes,
+            max_queue_depth=self._overflow.max_queue_depth,
         )
 
     def wait_all(self) -> None:
@@ -252,8 +302,14 @@ class ImarisWriter:
         if not self.is_running:
             return
 
+        self._overflow.flush()
         self._process.stop()
-        self._buffer.close()
+        self._overflow.close()
+        if self._pool is None:
+            self._buffer.close()
+
+        if self._overflow.frames_dropped:
+            self.log.warning("%s dropped %d frames on overflow", self._cfg.name, self._overflow.frames_dropped)
 
         self.log.info(
             "Closed ImarisWriter. Frames: %d/%d, Avg: %.2f GB/s",
@@ -284,6 +340,14 @@ class ImarisWriter:
             f"running={self.is_running})"
         )
 
+    def __getstate__(self) -> dict:
+        """Pickle only processor state; engine components stay in the parent process."""
+        state = self.__dict__.copy()
+        for key in ("_buffer", "_process", "_pool", "_overflow", "_metrics", "_log_queue"):
+            state[key] = None
+        state["_callback_class"] = None
+        return state
+
     # =========================================================================
     # BatchProcessor Protocol implementation (called in subprocess)
     # =========================================================================
@@ -293,6 +357,8 @@ class ImarisWriter:
         if self._output_file.exists():
             self._output_file.unlink()
 
+        self._callback_class = ImarisProgressChecker(self)
+
         opts = imaris.Options()
         opts.mEnableLogProgress = True
         opts.mNumberOfThreads = self._thread_count
@@ -381,7 +447,8 @@ class ImarisWriter:
                         )
 
                     if self._image_converter.NeedCopyBlock(block_index):
-                        self._image_converter.CopyBlock(block_data, block_index)
+                        with self.phases("write"):
+                            self._image_converter.CopyBlock(block_data, block_index)
 
         self._z_blocks_written += self._blocks_per_batch.z
 
@@ -394,6 +461,8 @@ class ImarisWriter:
 
     def finalize(self) -> None:
         """Finalize Imaris file with metadata."""
+        if self.prefilter is not None:
+            self.prefilter.close()
         try:
             if not self._image_converter:
                 return
@@ -423,11 +492,7 @@ class ImarisWriter:
             self._image_converter.Destroy()
             self._image_converter = None
 
-            self.log.info(
-                "Finalized: %d frames, %.2f GB/s avg",
-                self._process.frames_processed,
-                self._process.avg_rate_gbs,
-            )
+            self.log.info("Finalized: %d z-blocks to %s", self._z_blocks_written, self._output_file)
         except Exception:
             self.log.exception("Failed to finalize ImarisWriter")
 
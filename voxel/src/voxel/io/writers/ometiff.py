@@ -2,22 +2,96 @@
 
 This module provides a writer for voxel data that outputs to OME-TIFF format,
 implementing the VoxelWriter Protocol using composition.
+
+With compression enabled, each batch is split into strips that a thread pool
+in the writer subprocess compresses in parallel (the codecs release the GIL),
+while the TiffWriter appends the pre-compressed strips in order to one BigTIFF.
+Besides the TIFF methods, the codec registry's "zstd" and "gzip" (as deflate)
+names are accepted with a level, e.g. "zstd:9"; strip compression ratio and
+speed are reported in StreamStatus. With `cfg.adaptive_compression`, the zstd
+or deflate level follows the writer's headroom batch by batch (see
+CompressionController).
+
+With `tiled=True`, pages are written as tiles of cfg.chunk_shape (y, x) and
+each page carries downsampled resolution levels in SubIFDs, built per batch,
+so viewers can read just the tiles and level they need.
+
+With `preallocate=True` (uncompressed only), the whole contiguous BigTIFF,
+header, OME-XML and all page offsets, is created up front from frame_count,
+and batches are copied straight into a memory map of the pixel data at their
+computed offset, bypassing tifffile for the rest of the stream.
 """
 
 from __future__ import annotations
 
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
 import numpy as np
 import tifffile as tf
-from ome_types.model import OME, Channel, Image, Pixels, Pixels_DimensionOrder, PixelType, UnitsLength
+from ome_types.model import OME, Channel, Image, Pixels, Pixels_DimensionOrder, PixelType, TiffData, UnitsLength
 
-from .engine import BufferManager, WriterProcess
+from .adaptive import CompressionController
+from .codec import get_codec
+from .engine import BufferManager, FrameSlot, OverflowHandler, WriterPool, WriterProcess
+from .noise import NoiseQuantizer
+from .stats import CodecMeter, PhaseTimer
 from .types import FrameShape, StreamMetrics, StreamStatus, WriterConfig
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
 COMPRESSION_METHODS = {None, "deflate", "lzw", "zstd", "lzma"}
 
+TIFF_COMPRESSION = {
+    "deflate": tf.COMPRESSION.ADOBE_DEFLATE,
+    "lzw": tf.COMPRESSION.LZW,
+    "zstd": tf.COMPRESSION.ZSTD,
+    "lzma": tf.COMPRESSION.LZMA,
+}
+
+STRIP_BYTES = 1024 * 1024
+"""Target uncompressed strip size; one strip is one unit of parallel compression work."""
+
+DEFAULT_TILE = 256
+"""Tile edge (pixels) for tiled output when cfg.chunk_shape is not set."""
+
+
+def tiff_compression(name: str | None) -> tuple[str | None, int | None]:
+    """TIFF compression method and level for a WriterConfig.compression value.
+
+    Args:
+        name: A method from COMPRESSION_METHODS, or a codec registry "zstd" or
+            "gzip" name with optional ":level" (gzip is stored as TIFF deflate)
+
+    Returns:
+        (method, level); level is None for the method's default. Unsupported
+        names give (None, None), i.e. uncompressed.
+    """
+    if name in COMPRESSION_METHODS:
+        return name, None
+    base = name.lower().partition(":")[0]
+    if base not in ("zstd", "gzip"):
+        return None, None
+    return ("zstd" if base == "zstd" else "deflate"), get_codec(name).level
+
+
+def downsample_2x(stack: np.ndarray) -> np.ndarray:
+    """Halve a (z, y, x) stack in y and x by 2x2 mean, dropping odd edge rows/columns.
+
+    Args:
+        stack: Frames to downsample
+
+    Returns:
+        Downsampled stack with the input dtype.
+    """
+    n, h, w = stack.shape[0], stack.shape[1] // 2, stack.shape[2] // 2
+    blocks = stack[:, : h * 2, : w * 2].reshape(n, h, 2, w, 2)
+    return blocks.mean(axis=(2, 4), dtype=np.float32).astype(stack.dtype)
+
 
 class OMETiffWriter:
     """Writer for voxel data that outputs to OME-TIFF format.
@@ -45,12 +119,36 @@ class OMETiffWriter:
         ```
     """
 
-    def __init__(self, cfg: WriterConfig, *, bigtiff: bool = True) -> None:
+    def __init__(
+        self,
+        cfg: WriterConfig,
+        *,
+        bigtiff: bool = True,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+        compression_workers: int | None = None,
+        tiled: bool = False,
+        preallocate: bool = False,
+        ome_xml: str | None = None,
+    ) -> None:
         """Initialize the OMETiffWriter.
 
         Args:
             cfg: Writer configuration specifying output path, dimensions, etc.
             bigtiff: Use BigTIFF format for large files (default True)
+            slots: Number of shared memory ring buffer slots (minimum 2)
+            pool: Optional WriterPool to lease a persistent subprocess and buffer from
+            compression_workers: Threads compressing strips in parallel (None = CPU count, 1 = serial)
+            tiled: Write tiled pages (cfg.chunk_shape y/x, default 256) with SubIFD pyramid levels,
+                up to cfg.max_level and never smaller than one tile
+            preallocate: Create the full uncompressed file up front and write batches through a memory map.
+                Pages for frames never received stay zero-filled
+            ome_xml: OME-XML to embed instead of the generated metadata (e.g. a BinaryOnly
+                reference to a companion file)
+
+        Raises:
+            ValueError: If tiled and the tile shape is not a multiple of 16, or if preallocate
+                is combined with compression or tiling.
         """
         from voxel.utils.log import VoxelLogging
 
@@ -58,18 +156,49 @@ class OMETiffWriter:
         self.log = VoxelLogging.get_logger(obj=self)
         self._log_queue = VoxelLogging.get_queue()
 
-        self._compression = cfg.compression if cfg.compression in COMPRESSION_METHODS else None
+        self._compression, self._compression_level = tiff_compression(cfg.compression)
+
+        # Adaptive level (zstd/deflate only; the other TIFF methods have no level)
+        self.codec_controller: CompressionController | None = None
+        if cfg.adaptive_compression and self._compression in ("zstd", "deflate"):
+            spec = get_codec("zstd" if self._compression == "zstd" else "gzip")
+            if self._compression_level is not None:
+                spec = spec.with_level(self._compression_level)
+            self.codec_controller = CompressionController(spec)
+            self._compression_level = self.codec_controller.level
+        elif cfg.adaptive_compression:
+            self.log.warning("adaptive_compression needs zstd or deflate, ignored for %s", cfg.compression)
+
         self._bigtiff = bigtiff
+        self._compression_workers = compression_workers or os.cpu_count() or 1
+        row_bytes = cfg.frame_shape.x * np.dtype(cfg.dtype.value).itemsize
+        self._rows_per_strip = max(1, min(cfg.frame_shape.y, STRIP_BYTES // row_bytes))
+
+        # Tiled pyramid layout
+        self._tiled = tiled
+        self._tile = (cfg.chunk_shape.y, cfg.chunk_shape.x) if cfg.chunk_shape else (DEFAULT_TILE, DEFAULT_TILE)
+        if tiled and (self._tile[0] % 16 or self._tile[1] % 16):
+            msg = f"TIFF tile shape must be a multiple of 16, got {self._tile}"
+            raise ValueError(msg)
+        self._num_levels = self._pyramid_levels() if tiled else 1
+
+        # Memory-mapped fast path
+        self._preallocate = preallocate
+        if preallocate and (self._compression is not None or tiled):
+            msg = "preallocate requires uncompressed, untiled output"
+            raise ValueError(msg)
+        self._mmap: np.memmap | None = None
 
         # Output path
         self._output_file = Path(cfg.path) / f"{cfg.name}.ome.tiff"
         self._pages_written = 0
 
-        # TIFF writer (initialized in subprocess)
+        # TIFF writer and compression pool (initialized in subprocess)
         self._tiff_writer: tf.TiffWriter | None = None
+        self._compressor: ThreadPoolExecutor | None = None
 
-        # OME metadata (generated before subprocess starts)
-        self._ome_xml: str = ""
+        # OME metadata (generated before subprocess starts unless given)
+        self._ome_xml: str = ome_xml or ""
 
         # Setup output directory
         output_dir = Path(cfg.path)
@@ -77,23 +206,41 @@ class OMETiffWriter:
             output_dir.mkdir(parents=True, exist_ok=True)
             self.log.warning("Created output directory: %s", output_dir)
 
-        # Compose components
-        self._buffer = BufferManager(
-            batch_size=cfg.batch_size,
-            frame_shape=cfg.frame_shape,
-            dtype="uint16",
-        )
+        # Compose components (leased from the pool when one is given)
+        self._pool = pool
+        if pool is not None:
+            self._buffer, self._process = pool.acquire(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+        else:
+            self._buffer = BufferManager(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
 
-        self._process = WriterProcess(
-            name=f"OMETiffWriter-{cfg.name}",
-            processor=self,  # OMETiffWriter implements BatchProcessor
-            buffer_mgr=self._buffer,
-            frame_count=cfg.frame_count,
-            log_queue=self._log_queue,
-        )
+            self._process = WriterProcess(
+                name=f"OMETiffWriter-{cfg.name}",
+                processor=self,  # OMETiffWriter implements BatchProcessor
+                buffer_mgr=self._buffer,
+                frame_count=cfg.frame_count,
+                log_queue=self._log_queue,
+            )
+
+        # Applies cfg.overflow_policy when the writer falls behind
+        self._overflow = OverflowHandler(self._buffer, self._process, cfg.overflow_policy, cfg.spill_dir)
 
         # Performance tracking
         self._metrics: StreamMetrics | None = None
+        self.phases = PhaseTimer()  # per-batch phase times, collected by WriterProcess
+        self.codec_meter = CodecMeter()  # per-batch strip compression, collected by WriterProcess
+        self.prefilter = NoiseQuantizer.from_config(cfg, self._compression_workers)  # cfg.lossy, run by WriterProcess
 
         # Start the writer
         self._start()
@@ -111,13 +258,22 @@ class OMETiffWriter:
     @property
     def pixel_type(self) -> PixelType:
         """Pixel type for the written data."""
-        return PixelType.UINT16
+        return PixelType(self._cfg.dtype.value)
 
     @property
     def compression(self) -> str | None:
         """Compression method."""
         return self._compression
 
+    @property
+    def codec_label(self) -> str:
+        """Compression method with level, as reported in StreamStatus."""
+        if self._compression is None:
+            return "none"
+        if self._compression_level is None:
+            return self._compression
+        return f"{self._compression}:{self._compression_level}"
+
     @property
     def axes(self) -> str:
         """Dimension axes string."""
@@ -140,13 +296,12 @@ class OMETiffWriter:
 
     def _start(self) -> None:
         """Start the writer subprocess."""
-        frame_bytes = self._cfg.frame_shape.y * self._cfg.frame_shape.x * 2
-        self._metrics = StreamMetrics(frame_bytes)
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
 
         # Generate OME metadata before starting subprocess
-        self._ome_xml = self._generate_ome_xml()
+        self._ome_xml = self._ome_xml or self._generate_ome_xml()
 
-        self._process.start()
+        self._process.start(self, trace_path=self._cfg.trace_path)
 
         self.log.info(
             "Started OMETiffWriter: %s frames, batch_size=%d, output=%s",
@@ -161,6 +316,24 @@ class OMETiffWriter:
         Args:
             frame: 2D numpy array with shape matching frame_shape.
 
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in shared memory for zero-copy writes.
+
+        Fill `slot.data` in place (e.g. `camera.grab_frame_into(slot.data)`)
+        and call `slot.commit()`, or use the slot as a context manager.
+        If the ring is full, cfg.overflow_policy decides whether this blocks
+        or returns a scratch frame that is dropped or spilled on commit.
+
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the ring buffer.
+
         Raises:
             RuntimeError: If writer is not running or has been closed.
         """
@@ -168,19 +341,15 @@ class OMETiffWriter:
             msg = "Cannot add frame: writer is not running"
             raise RuntimeError(msg)
 
-        self._buffer.add_frame(frame)
-        self._process.frames_added += 1
+        return self._overflow.acquire_slot(on_commit=self._commit_frame)
 
+    def _commit_frame(self) -> None:
+        """Track acquisition rate and flush the stream once the last frame is in."""
         if self._metrics:
             self._metrics.tick()
 
-        is_last_frame = self.frames_added == self._cfg.frame_count
-        buffer_full = self._buffer.is_full
-
-        if buffer_full or is_last_frame:
-            self._process.signal_batch_ready()
-
-        if is_last_frame:
+        if self._overflow.frames_received == self._cfg.frame_count:
+            self._overflow.flush()
             self.log.info("Added last frame %d. Waiting for processing...", self.frames_added)
             self._process.wait_all()
 
@@ -190,30 +359,43 @@ class OMETiffWriter:
         Returns:
             StreamStatus with progress and performance metrics.
         """
-        frames_remaining = self._cfg.frame_count - self.frames_added
+        frames_received = self._overflow.frames_received
+        frames_remaining = self._cfg.frame_count - frames_received
 
         # Estimate remaining time
         estimated_remaining = None
         if self._metrics and self._metrics.fps > 0 and frames_remaining > 0:
             estimated_remaining = frames_remaining / self._metrics.fps
 
-        # Buffer status
-        buffers = {i: self._buffer.get_buffer_status(i, self.batch_count) for i in range(2)}
+        # Buffer status and writer metrics (one consistent read)
+        buffers = self._buffer.get_buffer_statuses()
+        stats = self._process.snapshot()
+        codec = self.codec_label
+        if self.codec_controller is not None and stats.batch_count:
+            codec = f"{self._compression}:{stats.codec_level}"
 
         return StreamStatus(
             fps=self._metrics.fps if self._metrics else 0.0,
             fps_inst=self._metrics.fps_inst if self._metrics else 0.0,
-            throughput_gbs=self._process.avg_rate_gbs,
-            throughput_gbs_inst=self._process.avg_rate_gbs,
-            frames_acquired=self.frames_added,
+            throughput_gbs=stats.avg_rate_gbs,
+            throughput_gbs_inst=stats.rolling_rate_gbs,
+            frames_acquired=frames_received,
             total_frames=self._cfg.frame_count,
             frames_remaining=frames_remaining,
-            current_batch=self.batch_count,
+            current_batch=stats.batch_count,
             total_batches=self._cfg.num_batches,
-            current_slot=self._buffer.write_buffer_idx,
+            current_slot=self._buffer.write_slot_idx,
             buffers=buffers,
             elapsed_time=self._process.elapsed_time,
             estimated_remaining=estimated_remaining,
+            handoff_latency_ms=stats.avg_handoff_s * 1000,
+            **stats.latency_fields(),
+            codec=codec,
+            **stats.codec_fields(),
+            overflow_policy=self._overflow.policy.value,
+            frames_dropped=self._overflow.frames_dropped,
+            spilled_bytes=self._overflow.spilled_bytes,
+            max_queue_depth=self._overflow.max_queue_depth,
         )
 
     def wait_all(self) -> None:
@@ -225,8 +407,14 @@ class OMETiffWriter:
         if not self.is_running:
             return
 
+        self._overflow.flush()
         self._process.stop()
-        self._buffer.close()
+        self._overflow.close()
+        if self._pool is None:
+            self._buffer.close()
+
+        if self._overflow.frames_dropped:
+            self.log.warning("%s dropped %d frames on overflow", self._cfg.name, self._overflow.frames_dropped)
 
         self.log.info(
             "Closed OMETiffWriter. Frames: %d/%d, Avg: %.2f GB/s",
@@ -257,6 +445,13 @@ class OMETiffWriter:
             f"running={self.is_running})"
         )
 
+    def __getstate__(self) -> dict:
+        """Pickle only processor state; engine components stay in the parent process."""
+        state = self.__dict__.copy()
+        for key in ("_buffer", "_process", "_pool", "_overflow", "_metrics", "_log_queue"):
+            state[key] = None
+        return state
+
     # =========================================================================
     # BatchProcessor Protocol implementation (called in subprocess)
     # =========================================================================
@@ -266,27 +461,45 @@ class OMETiffWriter:
         if self._output_file.exists():
             self._output_file.unlink()
 
-        self._tiff_writer = tf.TiffWriter(self._output_file, bigtiff=self._bigtiff)
         self._pages_written = 0
+        if self._preallocate:
+            self._mmap = self._preallocate_file()
+            self.log.info("Preallocated %d pages. Output: %s", self._cfg.frame_count, self._output_file)
+            return
+
+        self._tiff_writer = tf.TiffWriter(self._output_file, bigtiff=self._bigtiff)
+        if self._compression is not None and self._compression_workers > 1 and not self._tiled:
+            self._compressor = ThreadPoolExecutor(self._compression_workers, thread_name_prefix="tiff-compress")
         self.log.info("Initialized TiffWriter. Output: %s", self._output_file)
 
     def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:
         """Process a batch by writing to TIFF file."""
+        if self._mmap is not None:
+            self._write_mapped(batch_data, batch_idx)
+            return
+
         if not self._tiff_writer:
             msg = "TiffWriter not initialized"
             raise RuntimeError(msg)
 
         # Include OME-XML in first batch only
         description = self._ome_xml if batch_idx == 1 else None
-
-        self._tiff_writer.write(
-            batch_data,
-            photometric="minisblack",
-            metadata={"axes": self.axes},
-            description=description,
-            contiguous=self._compression is None,
-            compression=self._compression,
-        )
+        if self.codec_controller is not None:
+            self._compression_level = self.codec_controller.level
+
+        if self._tiled:
+            self._write_pyramid(batch_data, description)
+        elif self._compression is not None:
+            self._write_compressed(batch_data, description)
+        else:
+            with self.phases("write"):
+                self._tiff_writer.write(
+                    batch_data,
+                    photometric="minisblack",
+                    metadata={"axes": self.axes},
+                    description=description,
+                    contiguous=True,
+                )
         self._pages_written += batch_data.shape[0]
 
         # Get current file size
@@ -303,58 +516,197 @@ class OMETiffWriter:
     def finalize(self) -> None:
         """Finalize TIFF file."""
         try:
+            if self._mmap is not None:
+                with self.phases("fsync"):
+                    self._mmap.flush()
+                self._mmap = None
+            if self._compressor:
+                self._compressor.shutdown()
+                self._compressor = None
+            if self.prefilter is not None:
+                self.prefilter.close()
             if self._tiff_writer:
                 self._tiff_writer.close()
                 self._tiff_writer = None
 
-            self.log.info(
-                "Finalized: %d frames, %.2f GB/s avg",
-                self._process.frames_processed,
-                self._process.avg_rate_gbs,
-            )
+            self.log.info("Finalized: %d frames to %s", self._pages_written, self._output_file)
         except Exception:
             self.log.exception("Failed to finalize OMETiffWriter")
 
+    def _write_compressed(self, batch_data: np.ndarray, description: str | None) -> None:
+        """Compress the batch's strips on the thread pool and append them in order.
+
+        All strips are submitted up front; tifffile consumes the results in
+        page/strip order, so writing early strips overlaps with compressing
+        later ones. Time spent waiting on the pool is reported as "compress",
+        the remainder of the call as "write". With one worker, strips are
+        compressed inline as tifffile consumes them.
+        """
+        compress = tf.TIFF.COMPRESSORS[TIFF_COMPRESSION[self._compression]]
+        level = self._compression_level
+        meter = self.codec_meter
+
+        def encode(strip: np.ndarray) -> bytes:
+            start = time.perf_counter()
+            segment = compress(strip) if level is None else compress(strip, level=level)
+            meter.add(strip.nbytes, len(segment), time.perf_counter() - start)
+            return segment
+
+        rows = self._rows_per_strip
+        height = batch_data.shape[1]
+        strips = (batch_data[page, y : y + rows] for page in range(batch_data.shape[0]) for y in range(0, height, rows))
+        segments = self._compressor.map(encode, strips) if self._compressor is not None else map(encode, strips)
+
+        waited = 0.0
+
+        def ordered() -> Iterator[bytes]:
+            nonlocal waited
+            while True:
+                start = time.perf_counter()
+                segment = next(segments, None)
+                waited += time.perf_counter() - start
+                if segment is None:
+                    return
+                yield segment
+
+        start = time.perf_counter()
+        self._tiff_writer.write(
+            ordered(),
+            shape=batch_data.shape,
+            dtype=batch_data.dtype,
+            photometric="minisblack",
+            metadata={"axes": self.axes},
+            description=description,
+            compression=TIFF_COMPRESSION[self._compression],
+            rowsperstrip=rows,
+        )
+        self.phases.add("compress", waited)
+        self.phases.add("write", time.perf_counter() - start - waited)
+
+    def _preallocate_file(self) -> np.memmap:
+        """Write the complete, empty BigTIFF and map its contiguous pixel data."""
+        shape = (self._cfg.frame_count, self._cfg.frame_shape.y, self._cfg.frame_shape.x)
+        dtype = np.dtype(self._cfg.dtype.value)
+        offset, _ = tf.imwrite(
+            self._output_file,
+            shape=shape,
+            dtype=dtype,
+            bigtiff=self._bigtiff,
+            photometric="minisblack",
+            description=self._ome_xml,
+            metadata=None,
+            returnoffset=True,
+        )
+        return np.memmap(self._output_file, dtype=dtype, mode="r+", offset=offset, shape=shape)
+
+    def _write_mapped(self, batch_data: np.ndarray, batch_idx: int) -> None:
+        """Copy a batch into the preallocated file at the offset of its first frame."""
+        start = self._pages_written
+        end = min(start + batch_data.shape[0], self._cfg.frame_count)
+        with self.phases("write"):
+            self._mmap[start:end] = batch_data[: end - start]
+        self._pages_written = end
+
+        self.log.info("Batch %d/%d: frames %d-%d", batch_idx, self._cfg.num_batches, start, end - 1)
+
+    def _write_pyramid(self, batch_data: np.ndarray, description: str | None) -> None:
+        """Write each frame as a tiled page followed by its downsampled levels as SubIFDs.
+
+        Levels are built for the whole batch at once, each from the previous
+        one. tifffile compresses the tiles of each page on
+        compression_workers threads.
+        """
+        levels = [batch_data]
+        for _ in range(1, self._num_levels):
+            levels.append(downsample_2x(levels[-1]))
+
+        options = {
+            "photometric": "minisblack",
+            "tile": self._tile,
+            "compression": self._compression,
+            "compressionargs": {"level": self._compression_level} if self._compression_level is not None else None,
+            "maxworkers": self._compression_workers,
+            "metadata": None,
+        }
+        with self.phases("write"):
+            for page in range(batch_data.shape[0]):
+                self._tiff_writer.write(
+                    levels[0][page],
+                    subifds=self._num_levels - 1,
+                    description=description if page == 0 else None,
+                    **options,
+                )
+                for level in levels[1:]:
+                    self._tiff_writer.write(level[page], subfiletype=1, **options)
+
     # =========================================================================
     # Helper methods
     # =========================================================================
 
+    def _pyramid_levels(self) -> int:
+        """Number of resolution levels (including full resolution) for tiled output."""
+        levels = 1
+        y, x = self._cfg.frame_shape.y, self._cfg.frame_shape.x
+        while levels <= self._cfg.max_level and y // 2 >= self._tile[0] and x // 2 >= self._tile[1]:
+            y, x = y // 2, x // 2
+            levels += 1
+        return levels
+
     def _generate_ome_xml(self) -> str:
         """Generate OME-XML metadata."""
-        channels = [
-            Channel(
-                id=f"Channel:0:{self._cfg.channel_idx}",
-                name=self._cfg.channel_name,
-                samples_per_pixel=1,
-            ),
-        ]
-
-        pixels = Pixels(
-            id="Pixels:0",
-            dimension_order=Pixels_DimensionOrder.XYZCT,
-            type=self.pixel_type,
-            size_x=self._cfg.frame_shape.x,
-            size_y=self._cfg.frame_shape.y,
-            size_z=self._cfg.frame_count,
-            size_c=1,
-            size_t=1,
-            physical_size_x=self._cfg.voxel_size.x,
-            physical_size_y=self._cfg.voxel_size.y,
-            physical_size_z=self._cfg.voxel_size.z,
-            physical_size_x_unit=UnitsLength.MICROMETER,
-            physical_size_y_unit=UnitsLength.MICROMETER,
-            physical_size_z_unit=UnitsLength.MICROMETER,
-            channels=channels,
-        )
+        return ome_to_xml(build_ome(self._cfg))
+
+
+def build_ome(cfg: WriterConfig, tiff_data: list[TiffData] | None = None, uuid: str | None = None) -> OME:
+    """Build the OME metadata model for a single-channel ZYX stack.
+
+    Args:
+        cfg: Writer configuration describing the stack
+        tiff_data: TiffData blocks mapping planes to files (multi-file series)
+        uuid: OME document UUID (urn:uuid:...)
+
+    Returns:
+        OME model with one Image.
+    """
+    channels = [
+        Channel(
+            id=f"Channel:0:{cfg.channel_idx}",
+            name=cfg.channel_name,
+            samples_per_pixel=1,
+        ),
+    ]
+
+    pixels = Pixels(
+        id="Pixels:0",
+        dimension_order=Pixels_DimensionOrder.XYZCT,
+        type=PixelType(cfg.dtype.value),
+        size_x=cfg.frame_shape.x,
+        size_y=cfg.frame_shape.y,
+        size_z=cfg.frame_count,
+        size_c=1,
+        size_t=1,
+        physical_size_x=cfg.voxel_size.x,
+        physical_size_y=cfg.voxel_size.y,
+        physical_size_z=cfg.voxel_size.z,
+        physical_size_x_unit=UnitsLength.MICROMETER,
+        physical_size_y_unit=UnitsLength.MICROMETER,
+        physical_size_z_unit=UnitsLength.MICROMETER,
+        channels=channels,
+        tiff_data_blocks=tiff_data or [],
+    )
+
+    image = Image(
+        id="Image:0",
+        name=cfg.name,
+        pixels=pixels,
+    )
+
+    return OME(images=[image], uuid=uuid)
 
-        image = Image(
-            id="Image:0",
-            name=self._cfg.name,
-            pixels=pixels,
-        )
 
-        ome = OME(images=[image])
-        return ome.to_xml().encode("ascii", "xmlcharrefreplace").decode("ascii")
+def ome_to_xml(ome: OME) -> str:
+    """Serialize OME metadata as ASCII XML suitable for a TIFF ImageDescription."""
+    return ome.to_xml().encode("ascii", "xmlcharrefreplace").decode("ascii")
 
 
 # =============================================================================
@@ -15,6 +15,7 @@ from ome_zarr_writer import VolumeShape as OZWVolumeShape
 from ome_zarr_writer import VoxelSize as OZWVoxelSize
 from ome_zarr_writer import WriterConfig as OZWWriterConfig
 
+from .codec import get_codec
 from .types import BufferStage, BufferStatus, StreamStatus, WriterConfig
 
 if TYPE_CHECKING:
@@ -38,6 +39,10 @@ class OMEZarrWriter:
     - Multiple storage backends (TensorStore, Zarrs, etc.)
     - S3/cloud storage support
 
+    `cfg.lossy` is not supported: the ring buffer lives inside
+    ome-zarr-writer, so quantization could only run on the acquisition
+    thread. Use ShardedZarrWriter ("zarr-local") for lossy OME-Zarr.
+
     Example:
         ```python
         from voxel.io.writers import OMEZarrWriter, WriterConfig, FrameShape, create_ozw_config
@@ -79,8 +84,13 @@ class OMEZarrWriter:
             slots: Number of ring buffer slots (minimum 2)
             status_callback: Optional callback invoked periodically with status
             status_interval: Status callback interval in seconds
+
+        Raises:
+            ValueError: If cfg.lossy is set.
         """
-        # Import ome-zarr-writer
+        if cfg.lossy is not None:
+            msg = "OMEZarrWriter does not support cfg.lossy; use ShardedZarrWriter ('zarr-local') for lossy OME-Zarr"
+            raise ValueError(msg)
 
         self._cfg = cfg
         self._backend = backend
@@ -244,16 +254,19 @@ def create_ozw_config(cfg: WriterConfig) -> OZWWriterConfig:
     }
     ozw_dtype = dtype_map.get(cfg.dtype.value, Dtype.UINT16)
 
-    # Map compression
+    # Map compression: ome-zarr-writer has one configuration per codec registry algorithm
     compression_map = {
         "blosc.lz4": Compression.BLOSC_LZ4,
         "blosc.zstd": Compression.BLOSC_ZSTD,
         "gzip": Compression.GZIP,
         "zstd": Compression.ZSTD,
         "none": Compression.NONE,
-        None: Compression.BLOSC_LZ4,
     }
-    ozw_compression = compression_map.get(cfg.compression, Compression.BLOSC_LZ4)
+    try:
+        algorithm = get_codec(cfg.compression).algorithm if cfg.compression is not None else "blosc.lz4"
+    except ValueError:
+        algorithm = "blosc.lz4"
+    ozw_compression = compression_map[algorithm]
 
     # Compute volume shape
     volume_shape = OZWVolumeShape(
@@ -1,7 +1,8 @@
 """VoxelWriter Protocol definition.
 
 This module defines the VoxelWriter Protocol - the contract that all
-voxel writer implementations must satisfy. This uses Python's Protocol
+voxel writer implementations must satisfy - and the optional
+FrameSlotWriter extension for writers that support zero-copy acquisition. This uses Python's Protocol
 (structural subtyping) rather than ABC (nominal subtyping), allowing
 any class with the right methods to be used as a VoxelWriter.
 """
@@ -13,6 +14,7 @@ from typing import TYPE_CHECKING, Protocol, Self, runtime_checkable
 if TYPE_CHECKING:
     import numpy as np
 
+    from .engine import FrameSlot
     from .types import StreamStatus, WriterConfig
 
 
@@ -133,3 +135,34 @@ class VoxelWriter(Protocol):
             exc_tb: Exception traceback if an exception occurred.
         """
         ...
+
+
+@runtime_checkable
+class FrameSlotWriter(VoxelWriter, Protocol):
+    """VoxelWriter that can lease frame positions in its shared memory.
+
+    Producers fill the leased view in place, so each frame is copied once
+    (camera buffer -> writer shared memory) instead of being handed over as
+    a separate array and copied again by add_frame().
+
+    Example:
+        ```python
+        if isinstance(writer, FrameSlotWriter):
+            with writer.acquire_frame_slot() as slot:
+                camera.grab_frame_into(slot.data)
+        else:
+            writer.add_frame(camera.grab_frame())
+        ```
+    """
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in the writer's buffer.
+
+        Returns:
+            FrameSlot whose `data` is a writable (y, x) view. The frame is
+            added once `commit()` is called (or the context manager exits).
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        ...
@@ -0,0 +1,286 @@
+"""Deferred multiscale pyramid generation for sharded OME-Zarr stores.
+
+Builds levels 1..max_level of a store written by ShardedZarrWriter from the
+level-0 shards already on disk, outside the acquisition hot path. Each level
+is built from the previous one by 2x mean downsampling in z, y and x.
+
+Building is resumable: shards are written to a temporary file and renamed
+into place, existing shards are skipped, and a level is only added to the
+multiscales metadata once all of its shards exist. Re-running on an
+interrupted store picks up where it stopped.
+
+Components:
+    build_pyramid: Build (or resume) the pyramid in the calling process
+    PyramidBuilder: Run build_pyramid in a low-priority background process with shared progress
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import multiprocessing as mp
+import sys
+from dataclasses import dataclass
+from math import ceil, prod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import psutil
+
+from .codec import CodecSpec
+from .shardzarr import array_metadata, encode_shard, group_metadata, read_region, shard_path
+from .zarrstore import ZarrStore, replace_json
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from multiprocessing.sharedctypes import Synchronized
+
+    import numcodecs
+
+
+@dataclass(frozen=True)
+class _ShardedArray:
+    """Layout of a sharded array, read back from its zarr.json."""
+
+    shape: tuple[int, int, int]
+    dtype: np.dtype
+    shard_shape: tuple[int, int, int]
+    chunk_shape: tuple[int, int, int]
+    codec_meta: dict[str, Any] | None
+
+    @classmethod
+    def open(cls, array_path: Path) -> _ShardedArray:
+        meta = json.loads((array_path / "zarr.json").read_text())
+        sharding = meta["codecs"][0]["configuration"]
+        inner = sharding["codecs"]
+        return cls(
+            shape=tuple(meta["shape"]),
+            dtype=np.dtype(meta["data_type"]).newbyteorder("<"),
+            shard_shape=tuple(meta["chunk_grid"]["configuration"]["chunk_shape"]),
+            chunk_shape=tuple(sharding["chunk_shape"]),
+            codec_meta=inner[1] if len(inner) > 1 else None,
+        )
+
+    @property
+    def codec(self) -> numcodecs.abc.Codec | None:
+        """numcodecs codec matching codec_meta."""
+        return CodecSpec.from_zarr_metadata(self.codec_meta).numcodec()
+
+    @property
+    def shard_grid(self) -> tuple[int, int, int]:
+        """Number of shards along (z, y, x)."""
+        return tuple(ceil(n / s) for n, s in zip(self.shape, self.shard_shape, strict=True))
+
+
+def pyramid_shapes(shape: tuple[int, int, int], max_level: int) -> list[tuple[int, int, int]]:
+    """Array shapes of levels 0..max_level, each half the previous (rounded up)."""
+    shapes = [tuple(shape)]
+    for _ in range(max_level):
+        shapes.append(tuple(ceil(n / 2) for n in shapes[-1]))
+    return shapes
+
+
+def downsample_3d(region: np.ndarray) -> np.ndarray:
+    """Halve a (z, y, x) block in every dimension by 2x2x2 mean, replicating the last plane of odd edges."""
+    pad = [(0, n % 2) for n in region.shape]
+    if any(p for _, p in pad):
+        region = np.pad(region, pad, mode="edge")
+    z, y, x = (n // 2 for n in region.shape)
+    blocks = region.reshape(z, 2, y, 2, x, 2)
+    return blocks.mean(axis=(1, 3, 5), dtype=np.float32).astype(region.dtype)
+
+
+def count_pyramid_shards(store_path: Path | str, max_level: int) -> int:
+    """Total number of shards in levels 1..max_level of a store."""
+    base = _ShardedArray.open(Path(store_path) / "0")
+    return sum(
+        prod(ceil(n / s) for n, s in zip(shape, base.shard_shape, strict=True))
+        for shape in pyramid_shapes(base.shape, max_level)[1:]
+    )
+
+
+def build_pyramid(
+    store_path: Path | str,
+    max_level: int,
+    *,
+    on_shard: Callable[[], None] | None = None,
+    on_level: Callable[[int], None] | None = None,
+) -> None:
+    """Build levels 1..max_level of a sharded OME-Zarr store from level 0, resuming if partly built.
+
+    Levels use level 0's shard shape, chunk shape and codec.
+
+    Args:
+        store_path: Store root (holding zarr.json and 0/)
+        max_level: Coarsest level to build
+        on_shard: Called after each shard is built or found already built
+        on_level: Called with the level number once a level is complete
+    """
+    store = Path(store_path)
+    group = json.loads((store / "zarr.json").read_text())
+    multiscale = group["attributes"]["ome"]["multiscales"][0]
+    transforms = multiscale["datasets"][0]["coordinateTransformations"]
+    voxel_size = tuple(transforms[0]["scale"])
+    translation = tuple(transforms[1]["translation"]) if len(transforms) > 1 else None
+
+    # Images inside a shared multi-tile store keep its consolidated metadata current
+    shared = ZarrStore.find_root(store)
+    image_key = store.resolve().relative_to(shared.root.resolve()).as_posix() if shared else ""
+
+    def write_meta(nodes: dict[str, dict[str, Any]]) -> None:
+        if shared is not None:
+            shared.write_nodes({f"{image_key}/{key}" if key else image_key: meta for key, meta in nodes.items()})
+        else:
+            for key, meta in nodes.items():
+                replace_json(store / key / "zarr.json", meta)
+
+    base = _ShardedArray.open(store / "0")
+    codec = base.codec
+    shapes = pyramid_shapes(base.shape, max_level)
+
+    for level in range(1, len(shapes)):
+        src_path, dst_path = store / str(level - 1), store / str(level)
+        src = _ShardedArray.open(src_path)
+        dst = _ShardedArray(shapes[level], base.dtype, base.shard_shape, base.chunk_shape, base.codec_meta)
+
+        # The array's zarr.json goes in place now; the consolidated copy follows with the level
+        dst_meta = array_metadata(dst.shape, dst.dtype, dst.shard_shape, dst.chunk_shape, dst.codec_meta)
+        dst_path.mkdir(parents=True, exist_ok=True)
+        replace_json(dst_path / "zarr.json", dst_meta)
+
+        for z, y, x in itertools.product(*(range(n) for n in dst.shard_grid)):
+            path = shard_path(dst_path, z, y, x)
+            if not path.exists():
+                start = tuple(i * s for i, s in zip((z, y, x), dst.shard_shape, strict=True))
+                stop = tuple(min(a + s, n) for a, s, n in zip(start, dst.shard_shape, dst.shape, strict=True))
+                region = read_region(
+                    src_path,
+                    tuple(2 * a for a in start),
+                    tuple(min(2 * b, n) for b, n in zip(stop, src.shape, strict=True)),
+                    shard_shape=src.shard_shape,
+                    chunk_shape=src.chunk_shape,
+                    dtype=src.dtype,
+                    codec=codec,
+                )
+                data = encode_shard(downsample_3d(region), dst.shard_shape, dst.chunk_shape, codec)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.tmp")
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            if on_shard is not None:
+                on_shard()
+
+        # Advertise the level only once it is complete
+        write_meta({str(level): dst_meta, "": group_metadata(multiscale["name"], voxel_size, level + 1, translation)})
+        if on_level is not None:
+            on_level(level)
+
+
+def _run_builder(
+    store_path: Path,
+    max_level: int,
+    shards_done: Synchronized,
+    levels_done: Synchronized,
+    failed: Synchronized,
+) -> None:
+    """Background process entry point: lower priority, then build the pyramid."""
+    proc = psutil.Process()
+    proc.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if sys.platform == "win32" else 10)
+
+    def shard_built() -> None:
+        with shards_done.get_lock():
+            shards_done.value += 1
+
+    def level_built(level: int) -> None:
+        levels_done.value = level
+
+    try:
+        build_pyramid(store_path, max_level, on_shard=shard_built, on_level=level_built)
+    except Exception:
+        failed.value = True
+        raise
+
+
+class PyramidBuilder:
+    """Builds a store's pyramid levels in a low-priority background process.
+
+    Example:
+        ```python
+        builder = PyramidBuilder("/data/output/experiment_001.ome.zarr", max_level=5)
+        builder.start()
+        while builder.is_running:
+            print(f"pyramid {builder.progress:.0%}")
+            time.sleep(1)
+        ```
+    """
+
+    def __init__(self, store_path: Path | str, max_level: int) -> None:
+        """Initialize the PyramidBuilder.
+
+        Args:
+            store_path: Store root written by ShardedZarrWriter
+            max_level: Coarsest level to build
+        """
+        self._store_path = Path(store_path)
+        self._max_level = max_level
+        self._shards_total = count_pyramid_shards(self._store_path, max_level)
+        self._shards_done = mp.Value("q", 0)
+        self._levels_done = mp.Value("i", 0, lock=False)
+        self._failed = mp.Value("b", False, lock=False)
+        self._proc: mp.Process | None = None
+
+    @property
+    def shards_total(self) -> int:
+        """Number of shards in levels 1..max_level."""
+        return self._shards_total
+
+    @property
+    def shards_done(self) -> int:
+        """Shards built (or found already built) so far."""
+        return self._shards_done.value
+
+    @property
+    def levels_done(self) -> int:
+        """Highest level that is complete and listed in the store metadata."""
+        return self._levels_done.value
+
+    @property
+    def progress(self) -> float:
+        """Fraction of pyramid shards built (0-1)."""
+        return self.shards_done / self._shards_total if self._shards_total else 1.0
+
+    @property
+    def failed(self) -> bool:
+        """Whether the background build raised an error."""
+        return bool(self._failed.value)
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background build is in progress."""
+        return self._proc is not None and self._proc.is_alive()
+
+    def start(self) -> None:
+        """Start (or resume) building in the background."""
+        if self.is_running:
+            return
+        self._shards_done.value = 0
+        self._proc = mp.Process(
+            target=_run_builder,
+            args=(self._store_path, self._max_level, self._shards_done, self._levels_done, self._failed),
+            name=f"PyramidBuilder-{self._store_path.name}",
+        )
+        self._proc.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the build to finish.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None = wait indefinitely)
+
+        Returns:
+            True if the build has finished, False on timeout.
+        """
+        if self._proc is not None:
+            self._proc.join(timeout)
+        return not self.is_running
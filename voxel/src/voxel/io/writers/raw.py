@@ -0,0 +1,762 @@
+"""RawStreamWriter - Uncompressed capture into preallocated files with a binary index.
+
+This module provides the fastest capture path: frames are appended as raw
+bytes into large preallocated data files, with a small fixed-size index
+record per frame. There is no compression or container format in the hot
+path. RawStack reads the result back and convert_raw_stacks turns stacks into
+OME-TIFF, OME-Zarr, Imaris or BDV offline using a process pool.
+
+Stack layout (`<path>/<name>.raw/`):
+    meta.json: WriterConfig plus file layout, frames written and frames received
+    index.bin: INDEX_MAGIC followed by one INDEX_DTYPE record per frame
+    data_0000.bin, data_0001.bin, ...: frames in acquisition order
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Self
+
+import numpy as np
+
+from .engine import BufferManager, FrameSlot, OverflowHandler, WriterPool, WriterProcess
+from .formats import WRITER_FORMATS, open_writer
+from .stats import PhaseTimer
+from .types import FrameShape, OverflowPolicy, StreamMetrics, StreamStatus, WriterConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+INDEX_MAGIC = b"VXRAWIX1"
+INDEX_DTYPE = np.dtype([("idx", "<u8"), ("offset", "<u8"), ("timestamp", "<f8"), ("checksum", "<u4")])
+"""Index record: acquisition frame number, byte offset in the stack, acquisition time (time.time()), CRC-32.
+
+Frame numbers count every frame handed to the writer, so frames dropped on
+overflow show up as gaps (see RawStack.dropped_frames). The CRC-32 is 0 if
+checksums are disabled.
+"""
+
+RAW_TARGETS = tuple(fmt for fmt in WRITER_FORMATS if fmt != "raw")
+
+
+class RawStreamWriter:
+    """Writer for voxel data that outputs uncompressed frames with a binary index.
+
+    Data files are preallocated up front so the writer subprocess only ever
+    issues sequential writes into existing extents. Byte offsets in the index
+    are global across data files; file `n` holds frames
+    `[n * frames_per_file, (n + 1) * frames_per_file)`.
+
+    Implements the VoxelWriter Protocol using composition with
+    BufferManager and WriterProcess components.
+
+    Example:
+        ```python
+        from voxel.io.writers import RawStreamWriter, WriterConfig, FrameShape
+
+        cfg = WriterConfig(
+            name="experiment_001",
+            path="/data/output",
+            frame_count=1000,
+            frame_shape=FrameShape(2048, 2048),
+            batch_size=64,
+        )
+
+        with RawStreamWriter(cfg) as writer:
+            for frame in camera.stream():
+                writer.add_frame(frame)
+                print(writer.get_status().summary())
+
+        convert_raw_stacks(["/data/output/experiment_001.raw"], "ome-zarr")
+        ```
+    """
+
+    def __init__(
+        self,
+        cfg: WriterConfig,
+        *,
+        file_size_gb: float = 64.0,
+        checksum: bool = True,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+    ) -> None:
+        """Initialize the RawStreamWriter.
+
+        Args:
+            cfg: Writer configuration specifying output path, dimensions, etc.
+            file_size_gb: Target size of each preallocated data file (rounded to whole batches)
+            checksum: Store a CRC-32 of every frame in the index
+            slots: Number of shared memory ring buffer slots (minimum 2)
+            pool: Optional WriterPool to lease a persistent subprocess and buffer from
+        """
+        from voxel.utils.log import VoxelLogging
+
+        self._cfg = cfg
+        self.log = VoxelLogging.get_logger(obj=self)
+        self._log_queue = VoxelLogging.get_queue()
+
+        self._checksum = checksum
+
+        # Whole batches per data file so a batch never straddles two files
+        batch_bytes = cfg.frame_bytes * cfg.batch_size
+        self._frames_per_file = max(1, int(file_size_gb * 1024**3) // batch_bytes) * cfg.batch_size
+
+        # Output stack directory
+        self._stack_dir = Path(cfg.path) / f"{cfg.name}.raw"
+        self._frames_written = 0
+
+        # File handles (opened in subprocess)
+        self._index: BinaryIO | None = None
+        self._data: BinaryIO | None = None
+        self._data_file_idx = -1
+
+        # Compose components (leased from the pool when one is given)
+        self._pool = pool
+        if pool is not None:
+            self._buffer, self._process = pool.acquire(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+        else:
+            self._buffer = BufferManager(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+
+            self._process = WriterProcess(
+                name=f"RawStreamWriter-{cfg.name}",
+                processor=self,  # RawStreamWriter implements BatchProcessor
+                buffer_mgr=self._buffer,
+                frame_count=cfg.frame_count,
+                log_queue=self._log_queue,
+            )
+
+        # Applies cfg.overflow_policy when the writer falls behind
+        self._overflow = OverflowHandler(self._buffer, self._process, cfg.overflow_policy, cfg.spill_dir)
+
+        # Performance tracking
+        self._metrics: StreamMetrics | None = None
+        self.phases = PhaseTimer()  # per-batch phase times, collected by WriterProcess
+
+        # Start the writer
+        self._start()
+
+    @property
+    def cfg(self) -> WriterConfig:
+        """Writer configuration."""
+        return self._cfg
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer is actively running."""
+        return self._process.is_running
+
+    @property
+    def stack_dir(self) -> Path:
+        """Directory holding the data files, index and metadata."""
+        return self._stack_dir
+
+    @property
+    def frames_per_file(self) -> int:
+        """Number of frames in each preallocated data file."""
+        return self._frames_per_file
+
+    @property
+    def frames_added(self) -> int:
+        """Number of frames added to the writer."""
+        return self._process.frames_added
+
+    @property
+    def frames_processed(self) -> int:
+        """Number of frames processed (written)."""
+        return self._process.frames_processed
+
+    @property
+    def batch_count(self) -> int:
+        """Number of batches processed."""
+        return self._process.batch_count
+
+    def _start(self) -> None:
+        """Start the writer subprocess."""
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
+
+        self._process.start(self, trace_path=self._cfg.trace_path)
+
+        self.log.info(
+            "Started RawStreamWriter: %s frames, batch_size=%d, %d frames/file, output=%s",
+            self._cfg.frame_count,
+            self._cfg.batch_size,
+            self._frames_per_file,
+            self._stack_dir,
+        )
+
+    def add_frame(self, frame: np.ndarray) -> None:
+        """Add a single 2D frame to the writer.
+
+        Args:
+            frame: 2D numpy array with shape matching frame_shape.
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in shared memory for zero-copy writes.
+
+        Fill `slot.data` in place (e.g. `camera.grab_frame_into(slot.data)`)
+        and call `slot.commit()`, or use the slot as a context manager.
+        If the ring is full, cfg.overflow_policy decides whether this blocks
+        or returns a scratch frame that is dropped or spilled on commit.
+
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the ring buffer.
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        if not self.is_running:
+            msg = "Cannot add frame: writer is not running"
+            raise RuntimeError(msg)
+
+        return self._overflow.acquire_slot(on_commit=self._commit_frame)
+
+    def _commit_frame(self) -> None:
+        """Track acquisition rate and flush the stream once the last frame is in."""
+        if self._metrics:
+            self._metrics.tick()
+
+        if self._overflow.frames_received == self._cfg.frame_count:
+            self._overflow.flush()
+            self.log.info("Added last frame %d. Waiting for processing...", self.frames_added)
+            self._process.wait_all()
+
+    def get_status(self) -> StreamStatus:
+        """Get a snapshot of the current writer status.
+
+        Returns:
+            StreamStatus with progress and performance metrics.
+        """
+        frames_received = self._overflow.frames_received
+        frames_remaining = self._cfg.frame_count - frames_received
+
+        # Estimate remaining time
+        estimated_remaining = None
+        if self._metrics and self._metrics.fps > 0 and frames_remaining > 0:
+            estimated_remaining = frames_remaining / self._metrics.fps
+
+        # Buffer status and writer metrics (one consistent read)
+        buffers = self._buffer.get_buffer_statuses()
+        stats = self._process.snapshot()
+
+        return StreamStatus(
+            fps=self._metrics.fps if self._metrics else 0.0,
+            fps_inst=self._metrics.fps_inst if self._metrics else 0.0,
+            throughput_gbs=stats.avg_rate_gbs,
+            throughput_gbs_inst=stats.rolling_rate_gbs,
+            frames_acquired=frames_received,
+            total_frames=self._cfg.frame_count,
+            frames_remaining=frames_remaining,
+            current_batch=stats.batch_count,
+            total_batches=self._cfg.num_batches,
+            current_slot=self._buffer.write_slot_idx,
+            buffers=buffers,
+            elapsed_time=self._process.elapsed_time,
+            estimated_remaining=estimated_remaining,
+            handoff_latency_ms=stats.avg_handoff_s * 1000,
+            **stats.latency_fields(),
+            overflow_policy=self._overflow.policy.value,
+            frames_dropped=self._overflow.frames_dropped,
+            spilled_bytes=self._overflow.spilled_bytes,
+            max_queue_depth=self._overflow.max_queue_depth,
+        )
+
+    def wait_all(self) -> None:
+        """Wait for all pending write operations to complete."""
+        self._process.wait_all()
+
+    def close(self) -> None:
+        """Close the writer and clean up resources."""
+        if not self.is_running:
+            return
+
+        self._overflow.flush()
+        self._process.stop()
+        self._overflow.close()
+        if self._pool is None:
+            self._buffer.close()
+
+        # Only the parent sees frames dropped after the last written one
+        self._record_frames_received()
+
+        if self._overflow.frames_dropped:
+            self.log.warning("%s dropped %d frames on overflow", self._cfg.name, self._overflow.frames_dropped)
+
+        self.log.info(
+            "Closed RawStreamWriter. Frames: %d/%d, Avg: %.2f GB/s",
+            self.frames_processed,
+            self._cfg.frame_count,
+            self._process.avg_rate_gbs,
+        )
+
+    def __enter__(self) -> Self:
+        """Enter context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: object,
+    ) -> None:
+        """Exit context manager, ensuring close() is called."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"RawStreamWriter("
+            f"name={self._cfg.name!r}, "
+            f"frames={self.frames_added}/{self._cfg.frame_count}, "
+            f"running={self.is_running})"
+        )
+
+    def __getstate__(self) -> dict:
+        """Pickle only processor state; engine components stay in the parent process."""
+        state = self.__dict__.copy()
+        for key in ("_buffer", "_process", "_pool", "_overflow", "_metrics", "_log_queue"):
+            state[key] = None
+        return state
+
+    # =========================================================================
+    # BatchProcessor Protocol implementation (called in subprocess)
+    # =========================================================================
+
+    def initialize(self) -> None:
+        """Create the stack directory, metadata and index."""
+        self._stack_dir.mkdir(parents=True, exist_ok=True)
+        self._frames_written = 0
+        self._data_file_idx = -1
+        self._write_meta()
+
+        self._index = (self._stack_dir / "index.bin").open("wb", buffering=0)
+        self._index.write(INDEX_MAGIC)
+        self.log.info("Initialized raw stack: %s", self._stack_dir)
+
+    def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:
+        """Write a batch without acquisition timestamps, numbering frames by position."""
+        n = batch_data.shape[0]
+        numbers = np.arange(self._frames_written, self._frames_written + n)
+        self.process_batch_timestamped(batch_data, batch_idx, np.full(n, np.nan), numbers)
+
+    def process_batch_timestamped(
+        self,
+        batch_data: np.ndarray,
+        batch_idx: int,
+        frame_times: np.ndarray,
+        frame_numbers: np.ndarray,
+    ) -> None:
+        """Append a batch to the current data file and its records to the index."""
+        if not self._index:
+            msg = "Raw stack not initialized"
+            raise RuntimeError(msg)
+
+        n = batch_data.shape[0]
+        records = np.zeros(n, dtype=INDEX_DTYPE)
+        records["idx"] = frame_numbers
+        records["offset"] = np.arange(self._frames_written, self._frames_written + n) * self._cfg.frame_bytes
+        records["timestamp"] = frame_times
+
+        written = 0
+        while written < n:
+            data = self._data_for(self._frames_written + written)
+            room = self._frames_per_file - (self._frames_written + written) % self._frames_per_file
+            chunk = np.ascontiguousarray(batch_data[written : written + room])
+            with self.phases("write"):
+                data.write(chunk.data)
+            if self._checksum:
+                with self.phases("checksum"):
+                    for i, frame in enumerate(chunk, start=written):
+                        records["checksum"][i] = zlib.crc32(frame.data)
+            written += chunk.shape[0]
+
+        self._index.write(records.tobytes())
+        self._frames_written += n
+
+        self.log.debug("Batch %d/%d: %d frames", batch_idx, self._cfg.num_batches, n)
+
+    def finalize(self) -> None:
+        """Trim unused preallocation, close files and record the final frame count."""
+        try:
+            if self._data:
+                used = self._frames_written - self._data_file_idx * self._frames_per_file
+                self._data.truncate(used * self._cfg.frame_bytes)
+                with self.phases("fsync"):
+                    os.fsync(self._data.fileno())
+                self._data.close()
+                self._data = None
+            if self._index:
+                with self.phases("fsync"):
+                    os.fsync(self._index.fileno())
+                self._index.close()
+                self._index = None
+            self._write_meta()
+
+            self.log.info("Finalized: %d frames to %s", self._frames_written, self._stack_dir)
+        except Exception:
+            self.log.exception("Failed to finalize RawStreamWriter")
+
+    # =========================================================================
+    # Helper methods
+    # =========================================================================
+
+    def _data_for(self, frame_idx: int) -> BinaryIO:
+        """Return the data file holding frame_idx, preallocating the next file when needed."""
+        file_idx = frame_idx // self._frames_per_file
+        if file_idx == self._data_file_idx and self._data is not None:
+            return self._data
+
+        # Make the completed file durable before moving on
+        if self._data is not None:
+            with self.phases("fsync"):
+                os.fsync(self._data.fileno())
+            self._data.close()
+
+        frames_in_file = min(self._frames_per_file, self._cfg.frame_count - file_idx * self._frames_per_file)
+        size = frames_in_file * self._cfg.frame_bytes
+        self._data = (self._stack_dir / f"data_{file_idx:04d}.bin").open("wb", buffering=0)
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(self._data.fileno(), 0, size)
+        else:
+            self._data.truncate(size)
+        self._data_file_idx = file_idx
+        return self._data
+
+    def _record_frames_received(self) -> None:
+        """Add the number of frames handed to the writer (written or dropped) to meta.json."""
+        meta_path = self._stack_dir / "meta.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            self.log.exception("Could not record frames received in %s", meta_path)
+            return
+        meta["frames_received"] = self._overflow.frames_received
+        meta_path.write_text(json.dumps(meta, indent=2))
+
+    def _write_meta(self) -> None:
+        """Write the stack metadata sidecar."""
+        meta = {
+            "config": self._cfg.model_dump(mode="json"),
+            "frames_per_file": self._frames_per_file,
+            "frames_written": self._frames_written,
+            "checksum": "crc32" if self._checksum else None,
+            "index_dtype": INDEX_DTYPE.descr,
+        }
+        (self._stack_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+
+
+class RawStack:
+    """Read-only access to a stack written by RawStreamWriter.
+
+    The index is the source of truth for how many frames were written, so
+    stacks from an interrupted acquisition can still be read.
+
+    Example:
+        ```python
+        stack = RawStack("/data/output/experiment_001.raw")
+        bad = stack.verify()
+        for batch in stack.iter_batches():
+            ...
+        ```
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Open a raw stack.
+
+        Args:
+            path: Stack directory (`<name>.raw`)
+
+        Raises:
+            ValueError: If the index file is not a raw stack index.
+        """
+        self._path = Path(path)
+        meta = json.loads((self._path / "meta.json").read_text())
+        self._cfg = WriterConfig.model_validate(meta["config"])
+        self._frames_per_file: int = meta["frames_per_file"]
+        self._has_checksums = meta["checksum"] is not None
+        self._frames_received: int | None = meta.get("frames_received")
+
+        index_path = self._path / "index.bin"
+        with index_path.open("rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                msg = f"Not a raw stack index: {index_path}"
+                raise ValueError(msg)
+        self._index = np.fromfile(index_path, dtype=INDEX_DTYPE, offset=len(INDEX_MAGIC))
+
+        self._files: dict[int, np.memmap] = {}
+
+    @property
+    def cfg(self) -> WriterConfig:
+        """Configuration the stack was written with."""
+        return self._cfg
+
+    @property
+    def path(self) -> Path:
+        """Stack directory."""
+        return self._path
+
+    @property
+    def frame_count(self) -> int:
+        """Number of frames recorded in the index."""
+        return len(self._index)
+
+    @property
+    def index(self) -> np.ndarray:
+        """Index records (INDEX_DTYPE)."""
+        return self._index
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Acquisition time of every frame (time.time())."""
+        return self._index["timestamp"]
+
+    @property
+    def frames_received(self) -> int:
+        """Number of frames handed to the writer, written or dropped.
+
+        Stacks from an interrupted acquisition have no recorded count, so
+        this is one past the last written frame number and drops after it
+        are not seen.
+        """
+        if self._frames_received is not None:
+            return self._frames_received
+        return int(self._index["idx"].max()) + 1 if self.frame_count else 0
+
+    @property
+    def dropped_frames(self) -> np.ndarray:
+        """Acquisition numbers of frames missing from the stack (dropped on overflow)."""
+        numbers = self._index["idx"].astype(np.int64)
+        return np.setdiff1d(np.arange(self.frames_received), numbers, assume_unique=True)
+
+    def read_frames(self, start: int, stop: int) -> np.ndarray:
+        """Read frames [start, stop) into a new array.
+
+        Args:
+            start: First frame index
+            stop: One past the last frame index
+
+        Returns:
+            Array of shape (stop - start, y, x)
+        """
+        stop = min(stop, self.frame_count)
+        shape = self._cfg.frame_shape
+        out = np.empty((max(0, stop - start), shape.y, shape.x), dtype=self._cfg.dtype.value)
+        pos = start
+        while pos < stop:
+            file_idx, first = divmod(pos, self._frames_per_file)
+            n = min(stop - pos, self._frames_per_file - first)
+            out[pos - start : pos - start + n] = self._data_file(file_idx)[first : first + n]
+            pos += n
+        return out
+
+    def iter_batches(self, batch_size: int | None = None) -> Iterator[np.ndarray]:
+        """Yield the stack in consecutive batches of frames.
+
+        Args:
+            batch_size: Frames per batch (None = the batch size it was written with)
+        """
+        batch_size = batch_size or self._cfg.batch_size
+        for start in range(0, self.frame_count, batch_size):
+            yield self.read_frames(start, start + batch_size)
+
+    def verify(self) -> list[int]:
+        """Check every frame against its CRC-32.
+
+        Returns:
+            Indices of frames whose checksum does not match (empty if checksums were disabled).
+        """
+        if not self._has_checksums:
+            return []
+        bad = []
+        for start in range(0, self.frame_count, self._cfg.batch_size):
+            for i, frame in enumerate(self.read_frames(start, start + self._cfg.batch_size), start=start):
+                if zlib.crc32(frame.data) != self._index["checksum"][i]:
+                    bad.append(i)
+        return bad
+
+    def _data_file(self, file_idx: int) -> np.memmap:
+        """Memory-map a data file as (frames, y, x)."""
+        if file_idx not in self._files:
+            shape = self._cfg.frame_shape
+            self._files[file_idx] = np.memmap(
+                self._path / f"data_{file_idx:04d}.bin",
+                dtype=self._cfg.dtype.value,
+                mode="r",
+            ).reshape(-1, shape.y, shape.x)
+        return self._files[file_idx]
+
+
+# =============================================================================
+# Offline conversion
+# =============================================================================
+
+
+def convert_raw_stack(
+    source: Path | str,
+    fmt: str,
+    output_dir: Path | str | None = None,
+    *,
+    verify: bool = False,
+    fill_dropped: bool = True,
+) -> Path:
+    """Convert one raw stack to another format.
+
+    Each frame is placed at its acquisition number, so frames dropped on
+    overflow become zero planes and later planes keep their z position.
+
+    Args:
+        source: Stack directory written by RawStreamWriter
+        fmt: Target format, one of RAW_TARGETS
+        output_dir: Output directory (None = the path the stack was acquired with)
+        verify: Check frame checksums before converting
+        fill_dropped: Write a zero frame for every dropped frame; with False
+            the written frames are packed back to back (z positions shift)
+
+    Returns:
+        Output directory.
+
+    Raises:
+        ValueError: If the stack is empty, fails verification or fmt is unknown.
+    """
+    from voxel.utils.log import VoxelLogging
+
+    log = VoxelLogging.get_logger(__name__)
+    stack = RawStack(source)
+    if fmt not in RAW_TARGETS:
+        msg = f"Unknown raw conversion target {fmt!r}, expected one of {RAW_TARGETS}"
+        raise ValueError(msg)
+    if stack.frame_count == 0:
+        msg = f"Raw stack {stack.path} has no frames"
+        raise ValueError(msg)
+    if verify and (bad := stack.verify()):
+        msg = f"Raw stack {stack.path} has {len(bad)} corrupt frames (first: {bad[0]})"
+        raise ValueError(msg)
+    if len(dropped := stack.dropped_frames):
+        log.warning(
+            "Raw stack %s is missing %d dropped frames (first: %d); %s",
+            stack.path,
+            len(dropped),
+            dropped[0],
+            "filling them with zeros" if fill_dropped else "compacting the stack",
+        )
+
+    cfg = stack.cfg.model_copy(
+        update={
+            "path": Path(output_dir) if output_dir is not None else stack.cfg.path,
+            "frame_count": stack.frames_received if fill_dropped else stack.frame_count,
+            "overflow_policy": OverflowPolicy.BLOCK,
+        },
+    )
+    blank = np.zeros((cfg.frame_shape.y, cfg.frame_shape.x), dtype=cfg.dtype.value)
+    numbers = iter(stack.index["idx"])
+    next_number = 0
+    with open_writer(fmt, cfg) as writer:
+        for batch in stack.iter_batches():
+            for frame in batch:
+                if fill_dropped:
+                    number = int(next(numbers))
+                    for _ in range(next_number, number):
+                        writer.add_frame(blank)
+                    next_number = number + 1
+                writer.add_frame(frame)
+        if fill_dropped:
+            for _ in range(next_number, cfg.frame_count):
+                writer.add_frame(blank)
+    return cfg.path
+
+
+def convert_raw_stacks(
+    sources: Iterable[Path | str],
+    fmt: str,
+    output_dir: Path | str | None = None,
+    *,
+    max_workers: int | None = None,
+    verify: bool = False,
+    fill_dropped: bool = True,
+) -> list[Path]:
+    """Convert raw stacks in parallel, one stack per worker process.
+
+    Args:
+        sources: Stack directories written by RawStreamWriter
+        fmt: Target format, one of RAW_TARGETS
+        output_dir: Output directory (None = the path each stack was acquired with)
+        max_workers: Worker processes (None = ProcessPoolExecutor default)
+        verify: Check frame checksums before converting
+        fill_dropped: Write a zero frame for every dropped frame (see convert_raw_stack)
+
+    Returns:
+        Output directory of each stack, in input order.
+    """
+    if fmt not in RAW_TARGETS:
+        msg = f"Unknown raw conversion target {fmt!r}, expected one of {RAW_TARGETS}"
+        raise ValueError(msg)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(convert_raw_stack, src, fmt, output_dir, verify=verify, fill_dropped=fill_dropped)
+            for src in sources
+        ]
+        return [f.result() for f in futures]
+
+
+# =============================================================================
+# Test function
+# =============================================================================
+
+
+def test_raw_writer() -> None:
+    """Test the RawStreamWriter and convert the result to OME-TIFF."""
+    from datetime import UTC, datetime
+
+    from voxel.utils.log import VoxelLogging
+
+    from .types import Dtype
+
+    VoxelLogging.setup(level="DEBUG")
+
+    cfg = WriterConfig(
+        name=f"test_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}",
+        path="test_output",
+        frame_count=256,
+        frame_shape=FrameShape(512, 512),
+        batch_size=64,
+        dtype=Dtype.UINT16,
+    )
+
+    with RawStreamWriter(cfg, file_size_gb=0.05) as writer:
+        for i in range(cfg.frame_count):
+            frame = np.random.randint(0, 65535, (512, 512), dtype=np.uint16)
+            writer.add_frame(frame)
+
+            if i % 50 == 0:
+                print(writer.get_status().summary())
+
+    stack = RawStack(writer.stack_dir)
+    print(f"Raw stack: {stack.frame_count} frames, corrupt: {stack.verify()}")
+    print(f"Converted to: {convert_raw_stacks([writer.stack_dir], 'ome-tiff')}")
+
+
+if __name__ == "__main__":
+    test_raw_writer()
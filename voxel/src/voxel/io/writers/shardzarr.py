@@ -0,0 +1,813 @@
+"""ShardedZarrWriter - Local Zarr v3 sharded OME-Zarr writer without TensorStore.
+
+This module provides a dependency-light OME-Zarr writer built on NumPy and
+numcodecs, implementing the VoxelWriter Protocol using composition. Layout
+comes from `create_ozw_config`, so the same WriterConfig produces the same
+chunk/shard geometry as the ome-zarr-writer backends, and the codec from the
+shared codec registry (any `blosc.*`, `zstd`, `gzip` name with optional level).
+
+Frames are gathered into z-slabs one shard deep; each slab is cut into shards
+on a thread pool that compresses the inner chunks, assembles the shard with
+its index and writes it to `<name>.ome.zarr/0/c/<z>/<y>/<x>`. With `store=`,
+the image is instead added to a shared multi-tile ZarrStore as
+`<store>/<name>/<channel_name>`, positioned at cfg.position.
+
+Only level 0 is written in the hot path. With `deferred_pyramid=True`, levels
+1..cfg.max_level are built from the written shards by a low-priority
+PyramidBuilder process started on close(). With `sink=True`, the writer is
+only the processing side of one output of a FanOutWriter.
+
+With `cfg.adaptive_compression`, the codec level is picked per batch by a
+CompressionController so compression never holds back acquisition.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+import numpy as np
+
+from .adaptive import CompressionController
+from .codec import get_codec
+from .engine import BufferManager, FrameSlot, OverflowHandler, WriterPool, WriterProcess
+from .noise import NoiseQuantizer
+from .omezarr import create_ozw_config
+from .stats import CodecMeter, PhaseTimer
+from .types import FrameShape, StreamMetrics, StreamStatus, WriterConfig
+from .zarrstore import ZarrStore
+
+if TYPE_CHECKING:
+    import numcodecs
+    from ome_zarr_writer import WriterConfig as OZWWriterConfig
+
+    from .pyramid import PyramidBuilder
+
+EMPTY_CHUNK = 2**64 - 1
+"""Shard index offset/nbytes marking a chunk that was never written (reads as fill value)."""
+
+DEFAULT_CODEC = "blosc.lz4"
+"""Codec used when cfg.compression is not set (matches create_ozw_config)."""
+
+
+def encode_shard(
+    region: np.ndarray,
+    shard_shape: tuple[int, int, int],
+    chunk_shape: tuple[int, int, int],
+    codec: numcodecs.abc.Codec | None,
+    meter: CodecMeter | None = None,
+) -> bytes:
+    """Encode the data of one shard as compressed chunks followed by the shard index.
+
+    Edge chunks are padded to the full chunk shape; chunks entirely outside
+    `region` (past the edge of the array) are left out and marked empty.
+
+    Args:
+        region: Shard data, clipped to the array bounds (at most shard_shape)
+        shard_shape: Shard shape (z, y, x)
+        chunk_shape: Inner chunk shape (z, y, x)
+        codec: Chunk compressor (None = uncompressed)
+        meter: Records the bytes in and out and encode time of every chunk
+
+    Returns:
+        Shard bytes in sharding_indexed layout with the index at the end.
+    """
+    grid = tuple(s // c for s, c in zip(shard_shape, chunk_shape, strict=True))
+    index = np.full((*grid, 2), EMPTY_CHUNK, dtype="<u8")
+    parts: list[bytes] = []
+    offset = 0
+    for iz, iy, ix in np.ndindex(grid):
+        zs, ys, xs = iz * chunk_shape[0], iy * chunk_shape[1], ix * chunk_shape[2]
+        if zs >= region.shape[0] or ys >= region.shape[1] or xs >= region.shape[2]:
+            continue
+        block = region[zs : zs + chunk_shape[0], ys : ys + chunk_shape[1], xs : xs + chunk_shape[2]]
+        if block.shape != chunk_shape:
+            padded = np.zeros(chunk_shape, dtype=region.dtype)
+            padded[: block.shape[0], : block.shape[1], : block.shape[2]] = block
+            block = padded
+        block = np.ascontiguousarray(block)
+        start = time.perf_counter()
+        encoded = bytes(codec.encode(block)) if codec else block.tobytes()
+        if meter is not None and codec:
+            meter.add(block.nbytes, len(encoded), time.perf_counter() - start)
+        index[iz, iy, ix] = (offset, len(encoded))
+        parts.append(encoded)
+        offset += len(encoded)
+    parts.append(index.tobytes())
+    return b"".join(parts)
+
+
+def decode_shard(
+    data: bytes,
+    shard_shape: tuple[int, int, int],
+    chunk_shape: tuple[int, int, int],
+    dtype: np.dtype,
+    codec: numcodecs.abc.Codec | None,
+) -> np.ndarray:
+    """Decode a shard written by encode_shard into a full shard_shape array (empty chunks are zero)."""
+    grid = tuple(s // c for s, c in zip(shard_shape, chunk_shape, strict=True))
+    n_chunks = grid[0] * grid[1] * grid[2]
+    index = np.frombuffer(data, dtype="<u8", count=n_chunks * 2, offset=len(data) - n_chunks * 16).reshape(*grid, 2)
+
+    shard = np.zeros(shard_shape, dtype=dtype)
+    for iz, iy, ix in np.ndindex(grid):
+        offset, nbytes = index[iz, iy, ix]
+        if offset == EMPTY_CHUNK:
+            continue
+        raw = data[int(offset) : int(offset + nbytes)]
+        decoded = codec.decode(raw) if codec else raw
+        zs, ys, xs = iz * chunk_shape[0], iy * chunk_shape[1], ix * chunk_shape[2]
+        shard[zs : zs + chunk_shape[0], ys : ys + chunk_shape[1], xs : xs + chunk_shape[2]] = np.frombuffer(
+            decoded,
+            dtype=dtype,
+        ).reshape(chunk_shape)
+    return shard
+
+
+def shard_path(array_path: Path, z: int, y: int, x: int) -> Path:
+    """Location of a shard under the default "/" chunk key encoding."""
+    return array_path / "c" / str(z) / str(y) / str(x)
+
+
+def read_region(
+    array_path: Path,
+    start: tuple[int, int, int],
+    stop: tuple[int, int, int],
+    *,
+    shard_shape: tuple[int, int, int],
+    chunk_shape: tuple[int, int, int],
+    dtype: np.dtype,
+    codec: numcodecs.abc.Codec | None,
+) -> np.ndarray:
+    """Read a (z, y, x) box from a sharded array; missing shards read as zero.
+
+    Args:
+        array_path: Array directory (holding zarr.json and c/)
+        start: Inclusive box start (z, y, x)
+        stop: Exclusive box end (z, y, x), already clipped to the array shape
+        shard_shape: Shard shape (z, y, x)
+        chunk_shape: Inner chunk shape (z, y, x)
+        dtype: Array data type
+        codec: Chunk compressor (None = uncompressed)
+    """
+    out = np.zeros(tuple(b - a for a, b in zip(start, stop, strict=True)), dtype=dtype)
+    ranges = [range(a // s, ceil(b / s)) for a, b, s in zip(start, stop, shard_shape, strict=True)]
+    for z, y, x in itertools.product(*ranges):
+        path = shard_path(array_path, z, y, x)
+        if not path.exists():
+            continue
+        shard = decode_shard(path.read_bytes(), shard_shape, chunk_shape, dtype, codec)
+        origin = (z * shard_shape[0], y * shard_shape[1], x * shard_shape[2])
+        lo = [max(a, o) for a, o in zip(start, origin, strict=True)]
+        hi = [min(b, o + s) for b, o, s in zip(stop, origin, shard_shape, strict=True)]
+        dst = tuple(slice(b0 - a, b1 - a) for b0, b1, a in zip(lo, hi, start, strict=True))
+        src = tuple(slice(b0 - o, b1 - o) for b0, b1, o in zip(lo, hi, origin, strict=True))
+        out[dst] = shard[src]
+    return out
+
+
+def array_metadata(
+    shape: tuple[int, int, int],
+    dtype: np.dtype,
+    shard_shape: tuple[int, int, int],
+    chunk_shape: tuple[int, int, int],
+    codec_meta: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """Zarr v3 array metadata (zarr.json) for a sharded (z, y, x) array."""
+    inner_codecs: list[dict[str, Any]] = [{"name": "bytes", "configuration": {"endian": "little"}}]
+    if codec_meta is not None:
+        inner_codecs.append(codec_meta)
+    return {
+        "zarr_format": 3,
+        "node_type": "array",
+        "shape": list(shape),
+        "data_type": dtype.name,
+        "chunk_grid": {"name": "regular", "configuration": {"chunk_shape": list(shard_shape)}},
+        "chunk_key_encoding": {"name": "default", "configuration": {"separator": "/"}},
+        "fill_value": 0,
+        "codecs": [
+            {
+                "name": "sharding_indexed",
+                "configuration": {
+                    "chunk_shape": list(chunk_shape),
+                    "codecs": inner_codecs,
+                    "index_codecs": [{"name": "bytes", "configuration": {"endian": "little"}}],
+                    "index_location": "end",
+                },
+            },
+        ],
+        "dimension_names": ["z", "y", "x"],
+    }
+
+
+def group_metadata(
+    name: str,
+    voxel_size: tuple[float, float, float],
+    levels: int,
+    translation: tuple[float, float, float] | None = None,
+) -> dict[str, Any]:
+    """OME-Zarr 0.5 group metadata (zarr.json) listing levels 0..levels-1, each 2x coarser.
+
+    Args:
+        name: Multiscales name
+        voxel_size: Level-0 voxel size (z, y, x) in micrometers
+        levels: Number of levels present
+        translation: Image origin (z, y, x) in micrometers, e.g. the tile position
+    """
+    datasets = []
+    for level in range(levels):
+        transforms: list[dict[str, Any]] = [{"type": "scale", "scale": [v * 2**level for v in voxel_size]}]
+        if translation is not None:
+            transforms.append({"type": "translation", "translation": list(translation)})
+        datasets.append({"path": str(level), "coordinateTransformations": transforms})
+    return {
+        "zarr_format": 3,
+        "node_type": "group",
+        "attributes": {
+            "ome": {
+                "version": "0.5",
+                "multiscales": [
+                    {
+                        "name": name,
+                        "axes": [{"name": axis, "type": "space", "unit": "micrometer"} for axis in "zyx"],
+                        "datasets": datasets,
+                    },
+                ],
+            },
+        },
+    }
+
+
+class ShardedZarrWriter:
+    """Writer for OME-Zarr (Zarr v3, sharding_indexed) using NumPy and numcodecs.
+
+    Implements the VoxelWriter Protocol using composition with
+    BufferManager and WriterProcess components. Writes the full-resolution
+    level; downsampled levels up to cfg.max_level are only built when
+    `deferred_pyramid` is set.
+
+    Example:
+        ```python
+        from voxel.io.writers import ShardedZarrWriter, WriterConfig, FrameShape
+
+        cfg = WriterConfig(
+            name="experiment_001",
+            path="/data/output",
+            frame_count=1000,
+            frame_shape=FrameShape(2048, 2048),
+            batch_size=128,
+            compression="blosc.lz4",
+        )
+
+        with ShardedZarrWriter(cfg, threads=8) as writer:
+            for frame in camera.stream():
+                writer.add_frame(frame)
+                print(writer.get_status().summary())
+        ```
+    """
+
+    def __init__(
+        self,
+        cfg: WriterConfig,
+        *,
+        ozw_cfg: OZWWriterConfig | None = None,
+        threads: int | None = None,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+        deferred_pyramid: bool = False,
+        store: ZarrStore | Path | str | None = None,
+        sink: bool = False,
+    ) -> None:
+        """Initialize the ShardedZarrWriter.
+
+        Args:
+            cfg: Writer configuration specifying output path, dimensions, etc.
+            ozw_cfg: Layout (None = create_ozw_config(cfg)); the codec always comes from cfg.compression
+            threads: Shard compression/assembly threads (None = executor default)
+            slots: Number of shared memory ring buffer slots (minimum 2)
+            pool: Optional WriterPool to lease a persistent subprocess and buffer from
+            deferred_pyramid: Build levels 1..cfg.max_level in a background process after close()
+            store: Shared multi-tile store to add this tile/channel to (None = own `<name>.ome.zarr`)
+            sink: Only write the metadata and act as a BatchProcessor fed by a FanOutWriter;
+                no ring buffer or subprocess is created and frames can't be added directly
+
+        Raises:
+            ValueError: If the shard shape is not a multiple of the chunk shape, or sink is
+                combined with pool or deferred_pyramid.
+        """
+        from voxel.utils.log import VoxelLogging
+
+        # A sink's level 0 is only complete once its FanOutWriter closes, which the sink never sees
+        if sink and (pool is not None or deferred_pyramid):
+            msg = "A ShardedZarrWriter sink can't use pool or deferred_pyramid; run build_pyramid after the fan-out"
+            raise ValueError(msg)
+
+        self._cfg = cfg
+        self.log = VoxelLogging.get_logger(obj=self)
+        self._log_queue = VoxelLogging.get_queue()
+
+        # Layout
+        self._ozw_cfg = ozw_cfg if ozw_cfg is not None else create_ozw_config(cfg)
+        shard, chunk = self._ozw_cfg.shard_shape, self._ozw_cfg.chunk_shape
+        self._shard_shape = (shard.z, shard.y, shard.x)
+        self._chunk_shape = (chunk.z, chunk.y, chunk.x)
+        if any(s % c for s, c in zip(self._shard_shape, self._chunk_shape, strict=True)):
+            msg = f"Shard shape {self._shard_shape} must be a multiple of chunk shape {self._chunk_shape}"
+            raise ValueError(msg)
+        self._dtype = np.dtype(cfg.dtype.value).newbyteorder("<")
+        self._threads = threads
+
+        # Codec from the shared registry
+        try:
+            self._codec_spec = get_codec(cfg.compression or DEFAULT_CODEC)
+        except ValueError:
+            self.log.warning("Invalid compression %s, using %s", cfg.compression, DEFAULT_CODEC)
+            self._codec_spec = get_codec(DEFAULT_CODEC)
+
+        # Adaptive level; shards of one store may mix levels, decoding doesn't need them
+        self.codec_controller: CompressionController | None = None
+        if cfg.adaptive_compression and self._codec_spec.algorithm != "none":
+            self.codec_controller = CompressionController(self._codec_spec)
+
+        # Output paths
+        self._store = ZarrStore(store) if store is not None and not isinstance(store, ZarrStore) else store
+        if self._store is not None:
+            self._image_key = f"{cfg.name}/{cfg.channel_name}"
+            self._store_path = self._store.root / self._image_key
+        else:
+            self._image_key = ""
+            self._store_path = Path(cfg.path) / f"{cfg.name}.ome.zarr"
+        self._array_path = self._store_path / "0"
+
+        # Background pyramid (started on close)
+        self._deferred_pyramid = deferred_pyramid and cfg.max_level > 0
+        self._pyramid: PyramidBuilder | None = None
+
+        # Subprocess state (initialized in subprocess)
+        self._executor: ThreadPoolExecutor | None = None
+        self._codec: numcodecs.abc.Codec | None = None
+        self._slab: np.ndarray | None = None
+        self._slab_fill = 0
+        self._slab_idx = 0
+
+        # Performance tracking
+        self._metrics: StreamMetrics | None = None
+        self.phases = PhaseTimer()  # per-batch phase times, collected by WriterProcess
+        self.codec_meter = CodecMeter()  # per-batch codec bytes and speed, collected by WriterProcess
+        self.prefilter = NoiseQuantizer.from_config(cfg, threads)  # cfg.lossy, run by WriterProcess
+
+        # Compose components (leased from the pool when one is given); a sink is driven by its FanOutWriter
+        self._pool = pool
+        self._sink = sink
+        if sink:
+            self._buffer = self._process = self._overflow = None
+            self._write_metadata()
+            return
+        if pool is not None:
+            self._buffer, self._process = pool.acquire(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+        else:
+            self._buffer = BufferManager(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+
+            self._process = WriterProcess(
+                name=f"ShardedZarrWriter-{cfg.name}",
+                processor=self,  # ShardedZarrWriter implements BatchProcessor
+                buffer_mgr=self._buffer,
+                frame_count=cfg.frame_count,
+                log_queue=self._log_queue,
+            )
+
+        # Applies cfg.overflow_policy when the writer falls behind
+        self._overflow = OverflowHandler(self._buffer, self._process, cfg.overflow_policy, cfg.spill_dir)
+
+        # Start the writer
+        self._start()
+
+    @property
+    def cfg(self) -> WriterConfig:
+        """Writer configuration."""
+        return self._cfg
+
+    @property
+    def store_path(self) -> Path:
+        """OME-Zarr image group (the store root unless writing into a shared store)."""
+        return self._store_path
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer is actively running (never for a fan-out sink)."""
+        return self._process is not None and self._process.is_running
+
+    @property
+    def pyramid(self) -> PyramidBuilder | None:
+        """Background pyramid builder, once started by close()."""
+        return self._pyramid
+
+    @property
+    def is_sink(self) -> bool:
+        """Whether this writer is a fan-out sink without a stream of its own."""
+        return self._sink
+
+    @property
+    def frames_added(self) -> int:
+        """Number of frames added to the writer."""
+        self._require_stream("frames_added")
+        return self._process.frames_added
+
+    @property
+    def frames_processed(self) -> int:
+        """Number of frames processed (written)."""
+        self._require_stream("frames_processed")
+        return self._process.frames_processed
+
+    @property
+    def batch_count(self) -> int:
+        """Number of batches processed."""
+        self._require_stream("batch_count")
+        return self._process.batch_count
+
+    def _require_stream(self, name: str) -> None:
+        """Raise for stream-level API used on a fan-out sink.
+
+        Raises:
+            RuntimeError: If this writer is a fan-out sink.
+        """
+        if self._sink:
+            msg = f"{name} is not available on a ShardedZarrWriter sink; use its FanOutWriter"
+            raise RuntimeError(msg)
+
+    def _start(self) -> None:
+        """Write the store metadata and start the writer subprocess."""
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
+
+        # Shape is known up front, so metadata is complete before any data lands
+        self._write_metadata()
+
+        self._process.start(self, trace_path=self._cfg.trace_path)
+
+        self.log.info(
+            "Started ShardedZarrWriter: %s frames, shard=%s, chunk=%s, output=%s",
+            self._cfg.frame_count,
+            self._shard_shape,
+            self._chunk_shape,
+            self._store_path,
+        )
+
+    def add_frame(self, frame: np.ndarray) -> None:
+        """Add a single 2D frame to the writer.
+
+        Args:
+            frame: 2D numpy array with shape matching frame_shape.
+
+        Raises:
+            RuntimeError: If writer is not running, has been closed, or is a fan-out sink.
+        """
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in shared memory for zero-copy writes.
+
+        Fill `slot.data` in place (e.g. `camera.grab_frame_into(slot.data)`)
+        and call `slot.commit()`, or use the slot as a context manager.
+        If the ring is full, cfg.overflow_policy decides whether this blocks
+        or returns a scratch frame that is dropped or spilled on commit.
+
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the ring buffer.
+
+        Raises:
+            RuntimeError: If writer is not running, has been closed, or is a fan-out sink.
+        """
+        self._require_stream("acquire_frame_slot()")
+        if not self.is_running:
+            msg = "Cannot add frame: writer is not running"
+            raise RuntimeError(msg)
+
+        return self._overflow.acquire_slot(on_commit=self._commit_frame)
+
+    def _commit_frame(self) -> None:
+        """Track acquisition rate and flush the stream once the last frame is in."""
+        if self._metrics:
+            self._metrics.tick()
+
+        if self._overflow.frames_received == self._cfg.frame_count:
+            self._overflow.flush()
+            self.log.info("Added last frame %d. Waiting for processing...", self.frames_added)
+            self._process.wait_all()
+
+    def get_status(self) -> StreamStatus:
+        """Get a snapshot of the current writer status.
+
+        Returns:
+            StreamStatus with progress and performance metrics.
+
+        Raises:
+            RuntimeError: If this writer is a fan-out sink.
+        """
+        self._require_stream("get_status()")
+        frames_received = self._overflow.frames_received
+        frames_remaining = self._cfg.frame_count - frames_received
+
+        # Estimate remaining time
+        estimated_remaining = None
+        if self._metrics and self._metrics.fps > 0 and frames_remaining > 0:
+            estimated_remaining = frames_remaining / self._metrics.fps
+
+        # Buffer status and writer metrics (one consistent read)
+        buffers = self._buffer.get_buffer_statuses()
+        stats = self._process.snapshot()
+        codec = self._codec_spec.label
+        if self.codec_controller is not None and stats.batch_count:
+            codec = self._codec_spec.with_level(stats.codec_level).label
+
+        return StreamStatus(
+            fps=self._metrics.fps if self._metrics else 0.0,
+            fps_inst=self._metrics.fps_inst if self._metrics else 0.0,
+            throughput_gbs=stats.avg_rate_gbs,
+            throughput_gbs_inst=stats.rolling_rate_gbs,
+            frames_acquired=frames_received,
+            total_frames=self._cfg.frame_count,
+            frames_remaining=frames_remaining,
+            current_batch=stats.batch_count,
+            total_batches=self._cfg.num_batches,
+            current_slot=self._buffer.write_slot_idx,
+            buffers=buffers,
+            elapsed_time=self._process.elapsed_time,
+            estimated_remaining=estimated_remaining,
+            handoff_latency_ms=stats.avg_handoff_s * 1000,
+            **stats.latency_fields(),
+            codec=codec,
+            **stats.codec_fields(),
+            overflow_policy=self._overflow.policy.value,
+            frames_dropped=self._overflow.frames_dropped,
+            spilled_bytes=self._overflow.spilled_bytes,
+            max_queue_depth=self._overflow.max_queue_depth,
+            pyramid_levels_done=self._pyramid.levels_done if self._pyramid else 0,
+            pyramid_progress=self._pyramid.progress if self._pyramid else 0.0,
+        )
+
+    def wait_all(self) -> None:
+        """Wait for all pending write operations to complete.
+
+        Raises:
+            RuntimeError: If this writer is a fan-out sink.
+        """
+        self._require_stream("wait_all()")
+        self._process.wait_all()
+
+    def wait_pyramid(self, timeout: float | None = None) -> bool:
+        """Wait for the deferred pyramid to be built.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None = wait indefinitely)
+
+        Returns:
+            True if no pyramid build is pending, False on timeout.
+        """
+        return self._pyramid.wait(timeout) if self._pyramid else True
+
+    def close(self) -> None:
+        """Close the writer and clean up resources.
+
+        With `deferred_pyramid`, level 0 is complete when this returns and the
+        pyramid keeps building in the background (see wait_pyramid()).
+        """
+        if not self.is_running:
+            return
+
+        self._overflow.flush()
+        self._process.stop()
+        self._overflow.close()
+        if self._pool is None:
+            self._buffer.close()
+
+        if self._overflow.frames_dropped:
+            self.log.warning("%s dropped %d frames on overflow", self._cfg.name, self._overflow.frames_dropped)
+
+        self.log.info(
+            "Closed ShardedZarrWriter. Frames: %d/%d, Avg: %.2f GB/s",
+            self.frames_processed,
+            self._cfg.frame_count,
+            self._process.avg_rate_gbs,
+        )
+
+        if self._deferred_pyramid:
+            from .pyramid import PyramidBuilder  # imports this module
+
+            self._pyramid = PyramidBuilder(self._store_path, self._cfg.max_level)
+            self._pyramid.start()
+            self.log.info("Building levels 1-%d in the background", self._cfg.max_level)
+
+    def __enter__(self) -> Self:
+        """Enter context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: object,
+    ) -> None:
+        """Exit context manager, ensuring close() is called."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """String representation."""
+        if self._sink:
+            return f"ShardedZarrWriter(name={self._cfg.name!r}, sink=True)"
+        return (
+            f"ShardedZarrWriter("
+            f"name={self._cfg.name!r}, "
+            f"frames={self.frames_added}/{self._cfg.frame_count}, "
+            f"running={self.is_running})"
+        )
+
+    def __getstate__(self) -> dict:
+        """Pickle only processor state; engine components stay in the parent process."""
+        state = self.__dict__.copy()
+        for key in ("_buffer", "_process", "_pool", "_overflow", "_metrics", "_log_queue", "_pyramid"):
+            state[key] = None
+        return state
+
+    # =========================================================================
+    # BatchProcessor Protocol implementation (called in subprocess)
+    # =========================================================================
+
+    def initialize(self) -> None:
+        """Create the codec, shard thread pool and slab buffer in the subprocess."""
+        self._codec = self._codec_spec.numcodec()
+        self._executor = ThreadPoolExecutor(self._threads, thread_name_prefix="zarr-shard")
+        self._slab = np.empty((self._shard_shape[0], *self._cfg.frame_shape), dtype=self._dtype)
+        self._slab_fill = 0
+        self._slab_idx = 0
+        self.log.info("Initialized shard writer. Output: %s", self._array_path)
+
+    def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:
+        """Gather frames into shard-deep slabs and write each slab once full."""
+        if self._executor is None:
+            msg = "Shard writer not initialized"
+            raise RuntimeError(msg)
+        if self.codec_controller is not None:
+            self._codec = self.codec_controller.spec.numcodec()
+
+        depth = self._shard_shape[0]
+        pos, count = 0, batch_data.shape[0]
+        while pos < count:
+            # Whole slab available in the batch: write straight from shared memory
+            if self._slab_fill == 0 and count - pos >= depth:
+                self._write_slab(batch_data[pos : pos + depth])
+                pos += depth
+                continue
+
+            take = min(depth - self._slab_fill, count - pos)
+            self._slab[self._slab_fill : self._slab_fill + take] = batch_data[pos : pos + take]
+            self._slab_fill += take
+            pos += take
+            if self._slab_fill == depth:
+                self._write_slab(self._slab)
+                self._slab_fill = 0
+
+        self.log.debug("Batch %d/%d: %d frames, %d shard rows", batch_idx, self._cfg.num_batches, count, self._slab_idx)
+
+    def finalize(self) -> None:
+        """Write the last partial slab and stop the thread pool."""
+        try:
+            if self._slab_fill:
+                self._write_slab(self._slab[: self._slab_fill])
+                self._slab_fill = 0
+            if self._executor:
+                self._executor.shutdown()
+                self._executor = None
+            if self.prefilter is not None:
+                self.prefilter.close()
+            self._slab = None
+
+            self.log.info("Finalized: %d shard rows to %s", self._slab_idx, self._array_path)
+        except Exception:
+            self.log.exception("Failed to finalize ShardedZarrWriter")
+
+    def _write_slab(self, slab: np.ndarray) -> None:
+        """Encode and write every shard of one shard-deep z-slab on the thread pool.
+
+        The slab's wall time is split between the "compress" and "write"
+        phases in proportion to the time the workers spent in each.
+        """
+        _, shard_y, shard_x = self._shard_shape
+        z = self._slab_idx
+        start = time.perf_counter()
+        futures = [
+            self._executor.submit(self._write_shard, slab, z, y, x)
+            for y in range(ceil(self._cfg.frame_shape.y / shard_y))
+            for x in range(ceil(self._cfg.frame_shape.x / shard_x))
+        ]
+        timings = [future.result() for future in futures]
+        wall = time.perf_counter() - start
+
+        encode_s = sum(t[0] for t in timings)
+        write_s = sum(t[1] for t in timings)
+        if encode_s + write_s > 0:
+            self.phases.add("compress", wall * encode_s / (encode_s + write_s))
+            self.phases.add("write", wall * write_s / (encode_s + write_s))
+        self._slab_idx += 1
+
+    def _write_shard(self, slab: np.ndarray, z: int, y: int, x: int) -> tuple[float, float]:
+        """Compress the chunks of one shard, append the index and write the shard file.
+
+        Returns:
+            Seconds spent encoding and writing.
+        """
+        start = time.perf_counter()
+        _, shard_y, shard_x = self._shard_shape
+        region = slab[:, y * shard_y : (y + 1) * shard_y, x * shard_x : (x + 1) * shard_x]
+        data = encode_shard(region, self._shard_shape, self._chunk_shape, self._codec, self.codec_meter)
+        encoded_at = time.perf_counter()
+
+        path = shard_path(self._array_path, z, y, x)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return encoded_at - start, time.perf_counter() - encoded_at
+
+    # =========================================================================
+    # Helper methods
+    # =========================================================================
+
+    def _write_metadata(self) -> None:
+        """Write the OME-Zarr 0.5 group and the Zarr v3 sharded array metadata."""
+        codec_meta = self._codec_spec.zarr_metadata(self._dtype.itemsize)
+        shape = (self._cfg.frame_count, self._cfg.frame_shape.y, self._cfg.frame_shape.x)
+        voxel = self._cfg.voxel_size
+
+        array = array_metadata(shape, self._dtype, self._shard_shape, self._chunk_shape, codec_meta)
+
+        if self._store is not None:
+            pos = self._cfg.position
+            position = (pos.z, pos.y, pos.x)
+            group = group_metadata(self._image_key, (voxel.z, voxel.y, voxel.x), levels=1, translation=position)
+            nodes = {self._image_key: group, f"{self._image_key}/0": array}
+            if self._cfg.name not in self._store.consolidated():
+                nodes = {self._cfg.name: ZarrStore.group_meta({"position": list(position)}), **nodes}
+            self._store.write_nodes(nodes)
+            return
+
+        self._array_path.mkdir(parents=True, exist_ok=True)
+        group = group_metadata(self._cfg.name, (voxel.z, voxel.y, voxel.x), levels=1)
+        (self._store_path / "zarr.json").write_text(json.dumps(group, indent=2))
+        (self._array_path / "zarr.json").write_text(json.dumps(array, indent=2))
+
+
+# =============================================================================
+# Test function
+# =============================================================================
+
+
+def test_sharded_zarr_writer() -> None:
+    """Test the ShardedZarrWriter with sample data."""
+    from datetime import UTC, datetime
+
+    from voxel.utils.log import VoxelLogging
+
+    from .types import Dtype
+
+    VoxelLogging.setup(level="DEBUG")
+
+    cfg = WriterConfig(
+        name=f"test_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}",
+        path="test_output",
+        frame_count=200,
+        frame_shape=FrameShape(512, 700),
+        batch_size=64,
+        dtype=Dtype.UINT16,
+        compression="blosc.zstd",
+    )
+
+    with ShardedZarrWriter(cfg, threads=4) as writer:
+        for i in range(cfg.frame_count):
+            frame = np.random.randint(0, 4095, (512, 700), dtype=np.uint16)
+            writer.add_frame(frame)
+
+            if i % 50 == 0:
+                print(writer.get_status().summary())
+
+    print(f"Saved to: {writer.store_path}")
+
+
+if __name__ == "__main__":
+    test_sharded_zarr_writer()
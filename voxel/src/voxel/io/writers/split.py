@@ -0,0 +1,407 @@
+"""SplitOMETiffWriter - Multi-file OME-TIFF series with a companion metadata file.
+
+This module provides a writer that splits a stack into OME-TIFF files of at
+most `frames_per_file` frames, described by one `<name>.companion.ome` file.
+Each part is written by an OMETiffWriter on its own WriterPool lane, so a
+finished part keeps flushing in its subprocess while the next part fills.
+"""
+
+from __future__ import annotations
+
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from math import ceil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from ome_types.model import OME, TiffData
+
+from .engine import FrameSlot, WriterPool
+from .ometiff import OMETiffWriter, build_ome, ome_to_xml
+from .types import FrameShape, StreamMetrics, StreamStatus, WriterConfig
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class SplitOMETiffWriter:
+    """Writer that splits a stack into bounded OME-TIFF files plus an OME companion file.
+
+    Part files are named `<name>_NNNN.ome.tiff` and embed a BinaryOnly
+    OME-XML block pointing at `<name>.companion.ome`, which holds the full
+    metadata and maps every plane to its file. Parts are written concurrently
+    by up to `workers` writer subprocesses; when the last frame of a part is
+    committed, that part is closed on a background thread and the producer
+    moves straight on to the next part.
+
+    Implements the VoxelWriter Protocol by composing OMETiffWriter instances.
+
+    Example:
+        ```python
+        from voxel.io.writers import SplitOMETiffWriter, WriterConfig, FrameShape
+
+        cfg = WriterConfig(
+            name="experiment_001",
+            path="/data/output",
+            frame_count=10000,
+            frame_shape=FrameShape(10640, 14192),
+            batch_size=32,
+        )
+
+        with SplitOMETiffWriter(cfg, frames_per_file=512, workers=3) as writer:
+            for frame in camera.stream():
+                writer.add_frame(frame)
+        ```
+    """
+
+    def __init__(
+        self,
+        cfg: WriterConfig,
+        *,
+        frames_per_file: int,
+        workers: int = 2,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+        **tiff_options: Any,
+    ) -> None:
+        """Initialize the SplitOMETiffWriter.
+
+        Args:
+            cfg: Writer configuration for the whole stack
+            frames_per_file: Maximum frames per part file
+            workers: Parts written concurrently (pool lanes and closer threads)
+            slots: Number of shared memory ring buffer slots per part
+            pool: Optional WriterPool to lease lanes from (None = own pool of `workers` lanes)
+            **tiff_options: Extra OMETiffWriter options (bigtiff, compression_workers, tiled, preallocate)
+
+        Raises:
+            ValueError: If frames_per_file or workers is less than 1.
+        """
+        from voxel.utils.log import VoxelLogging
+
+        if frames_per_file < 1 or workers < 1:
+            msg = f"frames_per_file and workers must be at least 1, got {frames_per_file} and {workers}"
+            raise ValueError(msg)
+
+        self._cfg = cfg
+        self.log = VoxelLogging.get_logger(obj=self)
+
+        self._frames_per_file = frames_per_file
+        self._slots = slots
+        self._tiff_options = tiff_options
+
+        # Pool lanes do the writing; closer threads wait for finished parts
+        self._owns_pool = pool is None
+        self._pool = pool if pool is not None else WriterPool(max_workers=workers)
+        self._closer = ThreadPoolExecutor(workers, thread_name_prefix=f"SplitOMETiff-{cfg.name}")
+        self._closing: list[Future[None]] = []
+
+        # Part layout, fixed up front so the companion file is complete from the start
+        self._companion_uuid = f"urn:uuid:{uuid.uuid4()}"
+        self._companion_file = Path(cfg.path) / f"{cfg.name}.companion.ome"
+        self._parts: list[tuple[WriterConfig, str]] = []
+        for k in range(ceil(cfg.frame_count / frames_per_file)):
+            count = min(frames_per_file, cfg.frame_count - k * frames_per_file)
+            part_cfg = cfg.model_copy(update={"name": f"{cfg.name}_{k:04d}", "frame_count": count})
+            self._parts.append((part_cfg, f"urn:uuid:{uuid.uuid4()}"))
+
+        # Current part
+        self._part_idx = -1
+        self._writer: OMETiffWriter | None = None
+        self._frames_in_part = 0
+        self._handed_off = False  # current part's last frame was handed to a closer thread
+
+        self._frames_added = 0
+        self._is_running = False
+        self._metrics: StreamMetrics | None = None
+
+        # Start the writer
+        self._start()
+
+    @property
+    def cfg(self) -> WriterConfig:
+        """Writer configuration."""
+        return self._cfg
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer is actively running."""
+        return self._is_running
+
+    @property
+    def companion_file(self) -> Path:
+        """Path of the OME companion metadata file."""
+        return self._companion_file
+
+    @property
+    def part_files(self) -> list[Path]:
+        """Paths of all part files, in frame order."""
+        return [Path(part_cfg.path) / f"{part_cfg.name}.ome.tiff" for part_cfg, _ in self._parts]
+
+    @property
+    def frames_added(self) -> int:
+        """Number of frames added to the writer."""
+        return self._frames_added
+
+    def _start(self) -> None:
+        """Write the companion file and mark the writer as running."""
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
+
+        Path(self._cfg.path).mkdir(parents=True, exist_ok=True)
+        self._companion_file.write_text(ome_to_xml(self._companion_ome()), encoding="ascii")
+        self._is_running = True
+
+        self.log.info(
+            "Started SplitOMETiffWriter: %s frames in %d files of <= %d frames, companion=%s",
+            self._cfg.frame_count,
+            len(self._parts),
+            self._frames_per_file,
+            self._companion_file,
+        )
+
+    def add_frame(self, frame: np.ndarray) -> None:
+        """Add a single 2D frame to the writer.
+
+        Args:
+            frame: 2D numpy array with shape matching frame_shape.
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position of the current part for zero-copy writes.
+
+        Opens the next part when the current one is full, which may wait for
+        a pool lane if `workers` parts are still being written.
+
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the part's ring buffer.
+
+        Raises:
+            RuntimeError: If writer is not running, has been closed, or all frames were added.
+            Exception: Whatever a finished part raised while closing in the background.
+        """
+        if not self.is_running:
+            msg = "Cannot add frame: writer is not running"
+            raise RuntimeError(msg)
+
+        self._check_closing()
+        if self._writer is None or self._frames_in_part == self._writer.cfg.frame_count:
+            self._open_next_part()
+
+        # Only committed frames count towards the part, so abandoned slots don't move the rollover
+        writer = self._writer
+        slot = writer.acquire_frame_slot()
+        if self._frames_in_part + 1 == writer.cfg.frame_count:
+            return FrameSlot(slot.data, on_commit=lambda: self._finish_part(writer, slot))
+        return FrameSlot(slot.data, on_commit=lambda: self._commit_frame(slot))
+
+    def _open_next_part(self) -> None:
+        """Start the writer for the next part file."""
+        if self._part_idx + 1 >= len(self._parts):
+            msg = f"All {self._cfg.frame_count} frames have already been added"
+            raise RuntimeError(msg)
+
+        self._part_idx += 1
+        part_cfg, part_uuid = self._parts[self._part_idx]
+        binary_only = OME(
+            uuid=part_uuid,
+            binary_only=OME.BinaryOnly(metadata_file=self._companion_file.name, uuid=self._companion_uuid),
+        )
+        self._writer = OMETiffWriter(
+            part_cfg,
+            slots=self._slots,
+            pool=self._pool,
+            ome_xml=ome_to_xml(binary_only),
+            **self._tiff_options,
+        )
+        self._frames_in_part = 0
+        self._handed_off = False
+
+    def _commit_frame(self, slot: FrameSlot) -> None:
+        """Hand a frame to the current part and track the overall rate."""
+        slot.commit()
+        self._frames_in_part += 1
+        self._frames_added += 1
+        if self._metrics:
+            self._metrics.tick()
+
+    def _finish_part(self, writer: OMETiffWriter, slot: FrameSlot) -> None:
+        """Commit a part's last frame and close the part on a background thread."""
+        self._frames_in_part += 1
+        self._frames_added += 1
+        self._handed_off = True
+        if self._metrics:
+            self._metrics.tick()
+
+        def finish() -> None:
+            slot.commit()
+            writer.close()
+
+        self._closing.append(self._closer.submit(finish))
+
+    def _check_closing(self) -> None:
+        """Re-raise the error of any part whose background close already failed."""
+        for future in self._closing:
+            if future.done():
+                future.result()
+
+    def get_status(self) -> StreamStatus:
+        """Get a snapshot of the current writer status.
+
+        Buffer and latency fields describe the part currently being written;
+        progress fields describe the whole stack.
+
+        Returns:
+            StreamStatus with progress and performance metrics.
+        """
+        frames_remaining = self._cfg.frame_count - self._frames_added
+        fps = self._metrics.fps if self._metrics else 0.0
+
+        estimated_remaining = None
+        if fps > 0 and frames_remaining > 0:
+            estimated_remaining = frames_remaining / fps
+
+        progress = {
+            "fps": fps,
+            "fps_inst": self._metrics.fps_inst if self._metrics else 0.0,
+            "frames_acquired": self._frames_added,
+            "total_frames": self._cfg.frame_count,
+            "frames_remaining": frames_remaining,
+            "current_batch": self._frames_added // self._cfg.batch_size,
+            "total_batches": self._cfg.num_batches,
+            "estimated_remaining": estimated_remaining,
+        }
+        if self._writer is None:
+            return StreamStatus(
+                **progress,
+                throughput_gbs=0.0,
+                throughput_gbs_inst=0.0,
+                current_slot=0,
+                buffers={},
+                elapsed_time=0.0,
+            )
+        return self._writer.get_status().model_copy(update=progress)
+
+    def wait_all(self) -> None:
+        """Wait for every finished part to be closed and the current part's batches to be written."""
+        for future in list(self._closing):
+            future.result()
+        if self._writer is not None and not self._handed_off:
+            self._writer.wait_all()
+
+    def close(self) -> None:
+        """Close the current part, wait for all parts to be written and release the pool."""
+        if not self.is_running:
+            return
+
+        self._is_running = False
+        try:
+            for future in self._closing:
+                future.result()
+        finally:
+            # A part handed to a closer thread is committed and closed there; never touch its ring here
+            if self._writer is not None and not self._handed_off:
+                self._writer.close()
+            self._closer.shutdown()
+            if self._owns_pool:
+                self._pool.close()
+
+        if self._frames_added < self._cfg.frame_count:
+            self.log.warning(
+                "%s closed early: companion file describes %d frames, %d were written",
+                self._cfg.name,
+                self._cfg.frame_count,
+                self._frames_added,
+            )
+
+        self.log.info(
+            "Closed SplitOMETiffWriter. Frames: %d/%d in %d files",
+            self._frames_added,
+            self._cfg.frame_count,
+            self._part_idx + 1,
+        )
+
+    def __enter__(self) -> Self:
+        """Enter context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: object,
+    ) -> None:
+        """Exit context manager, ensuring close() is called."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"SplitOMETiffWriter("
+            f"name={self._cfg.name!r}, "
+            f"frames={self.frames_added}/{self._cfg.frame_count}, "
+            f"files={len(self._parts)}, "
+            f"running={self.is_running})"
+        )
+
+    # =========================================================================
+    # Helper methods
+    # =========================================================================
+
+    def _companion_ome(self) -> OME:
+        """Full OME metadata mapping each plane range to its part file."""
+        tiff_data = [
+            TiffData(
+                first_z=k * self._frames_per_file,
+                ifd=0,
+                plane_count=part_cfg.frame_count,
+                uuid=TiffData.UUID(value=part_uuid, file_name=f"{part_cfg.name}.ome.tiff"),
+            )
+            for k, (part_cfg, part_uuid) in enumerate(self._parts)
+        ]
+        return build_ome(self._cfg, tiff_data=tiff_data, uuid=self._companion_uuid)
+
+
+# =============================================================================
+# Test function
+# =============================================================================
+
+
+def test_split_ometiff_writer() -> None:
+    """Test the SplitOMETiffWriter with sample data."""
+    from datetime import UTC, datetime
+
+    import numpy as np
+    from voxel.utils.log import VoxelLogging
+
+    from .types import Dtype
+
+    VoxelLogging.setup(level="DEBUG")
+
+    cfg = WriterConfig(
+        name=f"test_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}",
+        path="test_output",
+        frame_count=300,
+        frame_shape=FrameShape(512, 512),
+        batch_size=32,
+        dtype=Dtype.UINT16,
+    )
+
+    with SplitOMETiffWriter(cfg, frames_per_file=128, workers=2) as writer:
+        for i in range(cfg.frame_count):
+            frame = np.random.randint(0, 65535, (512, 512), dtype=np.uint16)
+            writer.add_frame(frame)
+
+            if i % 50 == 0:
+                print(writer.get_status().summary())
+
+    print(f"Saved {len(writer.part_files)} files, companion: {writer.companion_file}")
+
+
+if __name__ == "__main__":
+    test_split_ometiff_writer()
@@ -0,0 +1,573 @@
+"""StagedWriter - Capture to local scratch, drain to the final format in the background.
+
+This module provides a writer for destinations that can't keep up with the
+camera (e.g. network shares). Batches are appended to a raw journal on fast
+local storage; a background drainer replays the journal into any other
+VoxelWriter targeting `WriterConfig.path`. A journal left behind by a failed
+drain can be replayed later with `StagedWriter.drain_journal()`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Self
+
+import numpy as np
+
+from .engine import BufferManager, FrameSlot, OverflowHandler, WriterPool, WriterProcess
+from .stats import PhaseTimer
+from .types import FrameShape, OverflowPolicy, StreamMetrics, StreamStatus, WriterConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .protocol import VoxelWriter
+
+
+class StagedWriter:
+    """Writer that lands frames on local scratch and drains them to a target writer.
+
+    Acquisition only touches the scratch journal, so it runs at local disk
+    speed. A drainer thread follows the journal as batches are committed and
+    feeds the frames to the target writer, which writes to `cfg.path` in its
+    own format. The journal is deleted once fully drained.
+
+    Implements the VoxelWriter Protocol using composition with
+    BufferManager and WriterProcess components.
+
+    Example:
+        ```python
+        from voxel.io.writers import OMETiffWriter, StagedWriter, WriterConfig, FrameShape
+
+        cfg = WriterConfig(
+            name="experiment_001",
+            path="//nas/data/output",
+            frame_count=1000,
+            frame_shape=FrameShape(2048, 2048),
+            batch_size=64,
+            compression="zstd",
+        )
+
+        with StagedWriter(cfg, target=OMETiffWriter, scratch_dir="D:/scratch") as writer:
+            for frame in camera.stream():
+                writer.add_frame(frame)
+                print(writer.get_status().summary())
+        ```
+    """
+
+    def __init__(
+        self,
+        cfg: WriterConfig,
+        *,
+        target: Callable[[WriterConfig], VoxelWriter],
+        scratch_dir: Path | str,
+        keep_journal: bool = False,
+        slots: int = 3,
+        pool: WriterPool | None = None,
+    ) -> None:
+        """Initialize the StagedWriter.
+
+        Args:
+            cfg: Writer configuration; the target writer writes to cfg.path
+            target: Factory for the final writer, e.g. `OMETiffWriter` or
+                `functools.partial(ImarisWriter, thread_count=8)`
+            scratch_dir: Fast local directory for the journal
+            keep_journal: Keep the journal after a successful drain
+            slots: Number of shared memory ring buffer slots (minimum 2)
+            pool: Optional WriterPool to lease a persistent subprocess and buffer from
+
+        Raises:
+            FileExistsError: If a non-empty journal for cfg.name is already in
+                scratch_dir; replay it with drain_journal() or delete it first.
+        """
+        from voxel.utils.log import VoxelLogging
+
+        self._cfg = cfg
+        self.log = VoxelLogging.get_logger(obj=self)
+        self._log_queue = VoxelLogging.get_queue()
+
+        self._target_factory = target
+        self._keep_journal = keep_journal
+
+        # Scratch journal (appended to in subprocess, read by the drainer)
+        scratch = Path(scratch_dir)
+        scratch.mkdir(parents=True, exist_ok=True)
+        self._journal_path = scratch / f"{cfg.name}.journal"
+        if self._journal_path.exists() and self._journal_path.stat().st_size:
+            msg = (
+                f"Journal {self._journal_path} holds frames that were not drained; "
+                "replay it with StagedWriter.drain_journal() or delete it"
+            )
+            raise FileExistsError(msg)
+        self._journal_path.write_bytes(b"")
+        self._journal: BinaryIO | None = None
+
+        # Compose components (leased from the pool when one is given)
+        self._pool = pool
+        if pool is not None:
+            self._buffer, self._process = pool.acquire(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+        else:
+            self._buffer = BufferManager(
+                batch_size=cfg.batch_size,
+                frame_shape=cfg.frame_shape,
+                dtype=cfg.dtype.value,
+                num_slots=slots,
+                packed_12bit=cfg.pack_12bit,
+            )
+
+            self._process = WriterProcess(
+                name=f"StagedWriter-{cfg.name}",
+                processor=self,  # StagedWriter implements BatchProcessor
+                buffer_mgr=self._buffer,
+                frame_count=cfg.frame_count,
+                log_queue=self._log_queue,
+            )
+
+        # Applies cfg.overflow_policy when the writer falls behind
+        self._overflow = OverflowHandler(self._buffer, self._process, cfg.overflow_policy, cfg.spill_dir)
+
+        # Drain state (parent process only)
+        self._capture_done = threading.Event()
+        self._journal_frames = 0
+        self._frames_drained = 0
+        self._drain_start = 0.0
+        self._drain_error: BaseException | None = None
+        self._drainer: threading.Thread | None = None
+
+        # Performance tracking
+        self._metrics: StreamMetrics | None = None
+        self.phases = PhaseTimer()  # per-batch phase times, collected by WriterProcess
+
+        # Start the writer
+        self._start()
+
+    @property
+    def cfg(self) -> WriterConfig:
+        """Writer configuration."""
+        return self._cfg
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer is accepting frames."""
+        return self._process.is_running
+
+    @property
+    def is_draining(self) -> bool:
+        """Whether the drainer is still writing to the target."""
+        return self._drainer is not None and self._drainer.is_alive()
+
+    @property
+    def journal_path(self) -> Path:
+        """Path of the scratch journal."""
+        return self._journal_path
+
+    @property
+    def frames_added(self) -> int:
+        """Number of frames added to the writer."""
+        return self._process.frames_added
+
+    @property
+    def frames_journaled(self) -> int:
+        """Number of frames committed to the scratch journal."""
+        return self._journal_frames if self._capture_done.is_set() else self._process.frames_processed
+
+    @property
+    def frames_drained(self) -> int:
+        """Number of frames handed to the target writer."""
+        return self._frames_drained
+
+    @property
+    def batch_count(self) -> int:
+        """Number of batches journaled."""
+        return self._process.batch_count
+
+    def _start(self) -> None:
+        """Start the capture subprocess and the drainer thread."""
+        self._metrics = StreamMetrics(self._cfg.frame_bytes)
+
+        self._process.start(self, trace_path=self._cfg.trace_path)
+
+        self._drainer = threading.Thread(target=self._drain, name=f"StagedWriter-drain-{self._cfg.name}")
+        self._drainer.start()
+
+        self.log.info(
+            "Started StagedWriter: %s frames, batch_size=%d, journal=%s, target=%s",
+            self._cfg.frame_count,
+            self._cfg.batch_size,
+            self._journal_path,
+            self._cfg.path,
+        )
+
+    def add_frame(self, frame: np.ndarray) -> None:
+        """Add a single 2D frame to the writer.
+
+        Args:
+            frame: 2D numpy array with shape matching frame_shape.
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        slot = self.acquire_frame_slot()
+        slot.data[...] = frame
+        slot.commit()
+
+    def acquire_frame_slot(self) -> FrameSlot:
+        """Lease the next frame position in shared memory for zero-copy writes.
+
+        Fill `slot.data` in place (e.g. `camera.grab_frame_into(slot.data)`)
+        and call `slot.commit()`, or use the slot as a context manager.
+        If the ring is full, cfg.overflow_policy decides whether this blocks
+        or returns a scratch frame that is dropped or spilled on commit.
+
+        Returns:
+            FrameSlot wrapping a writable (y, x) view into the ring buffer.
+
+        Raises:
+            RuntimeError: If writer is not running or has been closed.
+        """
+        if not self.is_running:
+            msg = "Cannot add frame: writer is not running"
+            raise RuntimeError(msg)
+
+        return self._overflow.acquire_slot(on_commit=self._commit_frame)
+
+    def _commit_frame(self) -> None:
+        """Track acquisition rate and flush the stream once the last frame is in."""
+        if self._metrics:
+            self._metrics.tick()
+
+        if self._overflow.frames_received == self._cfg.frame_count:
+            self._overflow.flush()
+            self.log.info("Added last frame %d. Waiting for journal...", self.frames_added)
+            self._process.wait_all()
+
+    def get_status(self) -> StreamStatus:
+        """Get a snapshot of the current writer status.
+
+        Throughput and buffer fields describe capture to scratch; the drain
+        fields describe progress towards the target.
+
+        Returns:
+            StreamStatus with progress and performance metrics.
+        """
+        frames_received = self._overflow.frames_received
+        frames_remaining = self._cfg.frame_count - frames_received
+
+        # Estimate remaining time
+        estimated_remaining = None
+        if self._metrics and self._metrics.fps > 0 and frames_remaining > 0:
+            estimated_remaining = frames_remaining / self._metrics.fps
+
+        # Buffer status and writer metrics (one consistent read)
+        buffers = self._buffer.get_buffer_statuses()
+        stats = self._process.snapshot()
+
+        # Drain rate
+        drain_rate_gbs = 0.0
+        drain_elapsed = time.perf_counter() - self._drain_start if self._drain_start else 0.0
+        if drain_elapsed > 0:
+            drain_rate_gbs = self._frames_drained * self._cfg.frame_bytes / (1024**3) / drain_elapsed
+
+        return StreamStatus(
+            fps=self._metrics.fps if self._metrics else 0.0,
+            fps_inst=self._metrics.fps_inst if self._metrics else 0.0,
+            throughput_gbs=stats.avg_rate_gbs,
+            throughput_gbs_inst=stats.rolling_rate_gbs,
+            frames_acquired=frames_received,
+            total_frames=self._cfg.frame_count,
+            frames_remaining=frames_remaining,
+            current_batch=stats.batch_count,
+            total_batches=self._cfg.num_batches,
+            current_slot=self._buffer.write_slot_idx,
+            buffers=buffers,
+            elapsed_time=self._process.elapsed_time,
+            estimated_remaining=estimated_remaining,
+            handoff_latency_ms=stats.avg_handoff_s * 1000,
+            **stats.latency_fields(),
+            overflow_policy=self._overflow.policy.value,
+            frames_dropped=self._overflow.frames_dropped,
+            spilled_bytes=self._overflow.spilled_bytes,
+            max_queue_depth=self._overflow.max_queue_depth,
+            frames_drained=self._frames_drained,
+            drain_backlog=self.frames_journaled - self._frames_drained,
+            drain_rate_gbs=drain_rate_gbs,
+            drain_error=repr(self._drain_error) if self._drain_error else "",
+        )
+
+    def wait_all(self) -> None:
+        """Wait for all pending batches to reach the scratch journal."""
+        self._process.wait_all()
+
+    def wait_drained(self, timeout: float | None = None) -> bool:
+        """Wait for the drainer to finish writing the target.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None = wait indefinitely)
+
+        Returns:
+            True if draining has finished, False on timeout.
+
+        Raises:
+            Exception: The error that stopped the drainer; the journal is kept
+                and can be replayed with drain_journal().
+        """
+        if self._drainer is not None:
+            self._drainer.join(timeout)
+        if self._drain_error is not None:
+            raise self._drain_error
+        return not self.is_draining
+
+    def close(self, *, wait_drain: bool = True) -> None:
+        """Stop capture and, by default, wait for the journal to be drained.
+
+        Args:
+            wait_drain: Block until the target is written. With False, capture
+                resources are released immediately and the drainer finishes in
+                the background (see wait_drained()).
+
+        Raises:
+            Exception: With wait_drain, the error that stopped the drainer.
+        """
+        if not self.is_running:
+            return
+
+        self._overflow.flush()
+        self._process.stop()
+        self._overflow.close()
+        self._journal_frames = self._process.frames_processed
+        self._capture_done.set()
+        if self._pool is None:
+            self._buffer.close()
+
+        if self._overflow.frames_dropped:
+            self.log.warning("%s dropped %d frames on overflow", self._cfg.name, self._overflow.frames_dropped)
+
+        self.log.info(
+            "Closed StagedWriter capture. Frames: %d/%d, Avg: %.2f GB/s to scratch",
+            self._journal_frames,
+            self._cfg.frame_count,
+            self._process.avg_rate_gbs,
+        )
+
+        if wait_drain:
+            self.wait_drained()
+
+    @classmethod
+    def drain_journal(
+        cls,
+        cfg: WriterConfig,
+        *,
+        target: Callable[[WriterConfig], VoxelWriter],
+        scratch_dir: Path | str,
+        keep_journal: bool = False,
+    ) -> int:
+        """Replay a journal left in scratch by an earlier run into a target writer.
+
+        Use this to retry after a drain failed (or the process died): it
+        rewrites the target at cfg.path from the journal, without capturing.
+
+        Args:
+            cfg: Configuration the journal was captured with
+            target: Factory for the final writer
+            scratch_dir: Directory holding `<cfg.name>.journal`
+            keep_journal: Keep the journal after a successful drain
+
+        Returns:
+            Number of frames written to the target.
+
+        Raises:
+            FileNotFoundError: If there is no journal for cfg.name in scratch_dir.
+        """
+        from voxel.utils.log import VoxelLogging
+
+        log = VoxelLogging.get_logger(__name__)
+        journal_path = Path(scratch_dir) / f"{cfg.name}.journal"
+        if not journal_path.exists():
+            msg = f"No journal to drain at {journal_path}"
+            raise FileNotFoundError(msg)
+
+        # A trailing partial frame (capture killed mid-write) is not replayed
+        frame_count = journal_path.stat().st_size // cfg.frame_bytes
+        target_cfg = cfg.model_copy(update={"overflow_policy": OverflowPolicy.BLOCK})
+        chunk = np.empty((cfg.batch_size, cfg.frame_shape.y, cfg.frame_shape.x), dtype=cfg.dtype.value)
+
+        start = time.perf_counter()
+        frames_drained = 0
+        with target(target_cfg) as writer, journal_path.open("rb") as journal:
+            while frames_drained < frame_count:
+                n = min(frame_count - frames_drained, cfg.batch_size)
+                journal.readinto(chunk[:n])
+                for frame in chunk[:n]:
+                    writer.add_frame(frame)
+                frames_drained += n
+
+        log.info(
+            "Replayed %d/%d journaled frames to %s in %.1f s",
+            frames_drained,
+            cfg.frame_count,
+            cfg.path,
+            time.perf_counter() - start,
+        )
+        if not keep_journal:
+            journal_path.unlink(missing_ok=True)
+        return frames_drained
+
+    def __enter__(self) -> Self:
+        """Enter context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: object,
+    ) -> None:
+        """Exit context manager, ensuring close() is called."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"StagedWriter("
+            f"name={self._cfg.name!r}, "
+            f"frames={self.frames_added}/{self._cfg.frame_count}, "
+            f"drained={self._frames_drained}, "
+            f"running={self.is_running})"
+        )
+
+    def __getstate__(self) -> dict:
+        """Pickle only processor state; engine components and the drainer stay in the parent process."""
+        state = self.__dict__.copy()
+        for key in (
+            "_buffer",
+            "_process",
+            "_pool",
+            "_overflow",
+            "_metrics",
+            "_log_queue",
+            "_target_factory",
+            "_capture_done",
+            "_drainer",
+            "_drain_error",
+        ):
+            state[key] = None
+        return state
+
+    # =========================================================================
+    # BatchProcessor Protocol implementation (called in subprocess)
+    # =========================================================================
+
+    def initialize(self) -> None:
+        """Open the scratch journal for appending."""
+        self._journal = self._journal_path.open("ab", buffering=0)
+        self.log.info("Initialized journal: %s", self._journal_path)
+
+    def process_batch(self, batch_data: np.ndarray, batch_idx: int) -> None:
+        """Append a batch to the scratch journal."""
+        if not self._journal:
+            msg = "Journal not initialized"
+            raise RuntimeError(msg)
+
+        with self.phases("write"):
+            self._journal.write(np.ascontiguousarray(batch_data).data)
+        self.log.debug("Batch %d/%d journaled: %d frames", batch_idx, self._cfg.num_batches, batch_data.shape[0])
+
+    def finalize(self) -> None:
+        """Close the scratch journal."""
+        try:
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+        except Exception:
+            self.log.exception("Failed to finalize StagedWriter journal")
+
+    # =========================================================================
+    # Drainer (thread in parent process)
+    # =========================================================================
+
+    def _drain(self) -> None:
+        """Follow the journal and replay committed frames into the target writer."""
+        # The drainer can always wait for the target, so never drop or spill there
+        target_cfg = self._cfg.model_copy(update={"overflow_policy": OverflowPolicy.BLOCK})
+        frame_shape = self._cfg.frame_shape
+        chunk = np.empty((self._cfg.batch_size, frame_shape.y, frame_shape.x), dtype=self._cfg.dtype.value)
+
+        try:
+            with self._target_factory(target_cfg) as target, self._journal_path.open("rb") as journal:
+                self._drain_start = time.perf_counter()
+                while True:
+                    done = self._capture_done.is_set()
+                    available = self.frames_journaled - self._frames_drained
+                    if available > 0:
+                        n = min(available, self._cfg.batch_size)
+                        journal.seek(self._frames_drained * self._cfg.frame_bytes)
+                        journal.readinto(chunk[:n])
+                        for frame in chunk[:n]:
+                            target.add_frame(frame)
+                        self._frames_drained += n
+                    elif done:
+                        break
+                    else:
+                        self._process.wait_processed(self._frames_drained + 1, timeout=0.5)
+        except Exception as e:
+            self._drain_error = e
+            self.log.exception("Drain failed; journal kept at %s", self._journal_path)
+            return
+
+        self.log.info(
+            "Drained %d frames to %s in %.1f s",
+            self._frames_drained,
+            self._cfg.path,
+            time.perf_counter() - self._drain_start,
+        )
+        if not self._keep_journal:
+            self._journal_path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# Test function
+# =============================================================================
+
+
+def test_staged_writer() -> None:
+    """Test the StagedWriter draining into an OMETiffWriter."""
+    import tempfile
+    from datetime import UTC, datetime
+
+    from voxel.utils.log import VoxelLogging
+
+    from .ometiff import OMETiffWriter
+    from .types import Dtype
+
+    VoxelLogging.setup(level="DEBUG")
+
+    cfg = WriterConfig(
+        name=f"test_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}",
+        path="test_output",
+        frame_count=256,
+        frame_shape=FrameShape(512, 512),
+        batch_size=64,
+        dtype=Dtype.UINT16,
+    )
+
+    with StagedWriter(cfg, target=OMETiffWriter, scratch_dir=tempfile.gettempdir()) as writer:
+        for i in range(cfg.frame_count):
+            frame = np.random.randint(0, 65535, (512, 512), dtype=np.uint16)
+            writer.add_frame(frame)
+
+            if i % 50 == 0:
+                print(writer.get_status().summary())
+
+    print(f"Saved to: {cfg.path}/{cfg.name}.ome.tiff")
+
+
+if __name__ == "__main__":
+    test_staged_writer()
@@ -0,0 +1,471 @@
+"""Lock-free shared-memory statistics for the writer engine.
+
+WriterProcess publishes its metrics through a single fixed-layout block of
+shared memory guarded by a sequence lock (seqlock), instead of one locked
+multiprocessing.Value per metric. The writer subprocess is the only writer
+of the protected fields; any process can take a consistent snapshot with a
+single copy and never blocks the writer.
+
+Components:
+    SharedStats: The shared block, written by the subprocess and read anywhere
+    StatsSnapshot: Immutable, consistent copy of the block
+    PhaseTimer: Per-batch phase timing (quantize, compress, checksum, downsample, write, fsync) for BatchProcessors
+    CodecMeter: Per-batch codec input/output bytes and encode time for BatchProcessors
+    BatchTrace: Optional per-batch JSONL trace file
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+BATCH_WINDOW = 256
+"""Number of most recent batches kept for rolling metrics and percentiles."""
+
+PHASES = ("quantize", "compress", "checksum", "downsample", "write", "fsync")
+"""Processing phases a BatchProcessor can report through a PhaseTimer."""
+
+STATS_DTYPE = np.dtype(
+    [
+        ("seq", "<u8"),
+        # Written by the producer only, outside the seqlock (single aligned store)
+        ("frames_added", "<i8"),
+        # Written by the writer subprocess under the seqlock
+        ("frames_processed", "<i8"),
+        ("batch_count", "<i8"),
+        ("avg_rate_gbs", "<f8"),
+        ("avg_fps", "<f8"),
+        ("avg_handoff_s", "<f8"),
+        ("batch_seconds", "<f8", (BATCH_WINDOW,)),
+        ("batch_bytes", "<i8", (BATCH_WINDOW,)),
+        ("batch_slot_wait", "<f8", (BATCH_WINDOW,)),
+        ("phase_seconds", "<f8", (len(PHASES),)),
+        # Codec totals for the job and for the last batch: raw bytes, compressed bytes, encode seconds
+        ("codec_totals", "<f8", (3,)),
+        ("codec_last", "<f8", (3,)),
+        # Level the codec is set to, for adaptive compression (see CompressionController)
+        ("codec_level", "<i8"),
+    ],
+)
+
+
+class CodecCounts(NamedTuple):
+    """Bytes into and out of a codec and the time spent encoding them."""
+
+    raw_bytes: int
+    compressed_bytes: int
+    seconds: float
+    """Encode time summed over threads (CPU-seconds, not wall time)."""
+
+    @property
+    def ratio(self) -> float:
+        """Raw over compressed size (higher is better; 0 if nothing was compressed)."""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    @property
+    def mbs(self) -> float:
+        """Encode speed of one thread in MB/s of raw data."""
+        return self.raw_bytes / (1024**2) / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    """Consistent copy of a SharedStats block."""
+
+    frames_added: int
+    frames_processed: int
+    batch_count: int
+    avg_rate_gbs: float
+    avg_fps: float
+    avg_handoff_s: float
+    batch_seconds: np.ndarray
+    """Durations of the most recent batches (oldest first, at most BATCH_WINDOW)."""
+    batch_bytes: np.ndarray
+    """Sizes of the most recent batches, aligned with batch_seconds."""
+    batch_slot_wait: np.ndarray
+    """Time the producer waited for a free slot before each recent batch, aligned with batch_seconds."""
+    phase_seconds: dict[str, float]
+    """Total time spent in each of PHASES during the job."""
+    codec_totals: CodecCounts
+    """Codec bytes and encode time over the job."""
+    codec_last: CodecCounts
+    """Codec bytes and encode time of the last batch."""
+    codec_level: int
+    """Codec level chosen for the next batch by adaptive compression (0 when not adapting)."""
+
+    def batch_ms(self, q: float) -> float:
+        """Percentile of recent batch processing times in milliseconds.
+
+        Args:
+            q: Percentile in [0, 100]
+        """
+        if not self.batch_seconds.size:
+            return 0.0
+        return float(np.percentile(self.batch_seconds, q)) * 1000
+
+    def latency_fields(self) -> dict[str, float | dict[str, float]]:
+        """Tail-latency and phase metrics as keyword arguments for StreamStatus."""
+        waits = self.batch_slot_wait
+        return {
+            "batch_ms_p50": self.batch_ms(50),
+            "batch_ms_p95": self.batch_ms(95),
+            "batch_ms_p99": self.batch_ms(99),
+            "slot_wait_ms_mean": float(waits.mean()) * 1000 if waits.size else 0.0,
+            "slot_wait_ms_max": float(waits.max()) * 1000 if waits.size else 0.0,
+            "phase_ms": {name: seconds * 1000 for name, seconds in self.phase_seconds.items()},
+        }
+
+    def codec_fields(self) -> dict[str, float]:
+        """Compression ratio and speed as keyword arguments for StreamStatus."""
+        return {
+            "compression_ratio": self.codec_totals.ratio,
+            "compress_mbs": self.codec_totals.mbs,
+            "batch_compression_ratio": self.codec_last.ratio,
+            "batch_compress_mbs": self.codec_last.mbs,
+        }
+
+    @property
+    def rolling_rate_gbs(self) -> float:
+        """Write rate over the most recent batches in GB/s."""
+        seconds = float(self.batch_seconds.sum())
+        if seconds <= 0:
+            return 0.0
+        return float(self.batch_bytes.sum()) / (1024**3) / seconds
+
+
+class SharedStats:
+    """Fixed-layout writer metrics in shared memory, published with a seqlock.
+
+    The writer bumps `seq` to an odd value, updates the fields and bumps it
+    back to even. Readers copy the whole block and retry if `seq` was odd or
+    changed during the copy, so they see either the old or the new values,
+    never a mix. Writes are a handful of stores per batch and reads a few-KB
+    memcpy, with no lock shared between the GUI and the writer subprocess.
+
+    Example:
+        ```python
+        stats = SharedStats()
+
+        # writer subprocess
+        stats.record_batch(frames=64, nbytes=batch.nbytes, seconds=0.12, handoff_s=0.001)
+
+        # any process
+        snap = stats.snapshot()
+        print(snap.frames_processed, snap.rolling_rate_gbs)
+
+        stats.close()
+        ```
+    """
+
+    def __init__(self) -> None:
+        """Allocate and zero the shared block."""
+        self._mem: SharedMemory | None = SharedMemory(create=True, size=STATS_DTYPE.itemsize)
+        self._owner = True
+        self._attach()
+        self._block[...] = 0
+
+    def _attach(self) -> None:
+        """Attach a structured numpy view to the shared block."""
+        self._block = np.ndarray((), dtype=STATS_DTYPE, buffer=self._mem.buf)
+
+    def __getstate__(self) -> dict:
+        """Drop the numpy view when pickling; it is re-attached by name in the subprocess."""
+        state = self.__dict__.copy()
+        state["_block"] = None
+        state["_owner"] = False
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore state and re-attach the numpy view."""
+        self.__dict__.update(state)
+        if self._mem is not None:
+            self._attach()
+
+    @property
+    def frames_added(self) -> int:
+        """Frames handed to the ring by the producer."""
+        return int(self._block["frames_added"])
+
+    @frames_added.setter
+    def frames_added(self, value: int) -> None:
+        self._block["frames_added"] = value
+
+    @contextmanager
+    def write(self) -> Iterator[np.ndarray]:
+        """Seqlock write section for the writer subprocess.
+
+        Yields:
+            The structured block to update in place
+        """
+        self._block["seq"] += 1
+        try:
+            yield self._block
+        finally:
+            self._block["seq"] += 1
+
+    def record_batch(
+        self,
+        frames: int,
+        nbytes: int,
+        seconds: float,
+        handoff_s: float,
+        *,
+        slot_wait_s: float = 0.0,
+        phases: dict[str, float] | None = None,
+        codec: CodecCounts | None = None,
+        codec_level: int | None = None,
+    ) -> None:
+        """Publish the metrics of one processed batch.
+
+        Args:
+            frames: Frames in the batch
+            nbytes: Bytes in the batch
+            seconds: Time spent processing the batch
+            handoff_s: Time between the batch being submitted and picked up
+            slot_wait_s: Time the producer waited for a free slot before filling the batch
+            phases: Seconds spent per phase (keys from PHASES)
+            codec: Codec bytes and encode time of the batch
+            codec_level: Codec level chosen for the next batch
+        """
+        with self.write() as b:
+            n = int(b["batch_count"]) + 1
+            b["batch_count"] = n
+            b["frames_processed"] += frames
+            b["avg_handoff_s"] = (b["avg_handoff_s"] * (n - 1) + handoff_s) / n
+            if seconds > 0:
+                b["avg_rate_gbs"] = (b["avg_rate_gbs"] * (n - 1) + nbytes / (1024**3) / seconds) / n
+                b["avg_fps"] = (b["avg_fps"] * (n - 1) + frames / seconds) / n
+            b["batch_seconds"][(n - 1) % BATCH_WINDOW] = seconds
+            b["batch_bytes"][(n - 1) % BATCH_WINDOW] = nbytes
+            b["batch_slot_wait"][(n - 1) % BATCH_WINDOW] = slot_wait_s
+            for name, phase_s in (phases or {}).items():
+                b["phase_seconds"][PHASES.index(name)] += phase_s
+            if codec is not None:
+                b["codec_totals"] += codec
+                b["codec_last"] = codec
+            if codec_level is not None:
+                b["codec_level"] = codec_level
+
+    def reset(self) -> None:
+        """Zero every metric ahead of a new job (producer side, while the subprocess is idle)."""
+        with self.write() as b:
+            seq = int(b["seq"])
+            b[...] = 0
+            b["seq"] = seq
+
+    def snapshot(self) -> StatsSnapshot:
+        """Take a consistent copy of the block without blocking the writer."""
+        while True:
+            seq = int(self._block["seq"])
+            if seq % 2:
+                time.sleep(0)
+                continue
+            copy = self._block.copy()
+            if int(self._block["seq"]) == seq:
+                break
+
+        n = int(copy["batch_count"])
+        kept = min(n, BATCH_WINDOW)
+        order = (np.arange(n - kept, n)) % BATCH_WINDOW
+        return StatsSnapshot(
+            frames_added=int(copy["frames_added"]),
+            frames_processed=int(copy["frames_processed"]),
+            batch_count=n,
+            avg_rate_gbs=float(copy["avg_rate_gbs"]),
+            avg_fps=float(copy["avg_fps"]),
+            avg_handoff_s=float(copy["avg_handoff_s"]),
+            batch_seconds=copy["batch_seconds"][order],
+            batch_bytes=copy["batch_bytes"][order],
+            batch_slot_wait=copy["batch_slot_wait"][order],
+            phase_seconds=dict(zip(PHASES, copy["phase_seconds"].tolist(), strict=True)),
+            codec_totals=_codec_counts(copy["codec_totals"]),
+            codec_last=_codec_counts(copy["codec_last"]),
+            codec_level=int(copy["codec_level"]),
+        )
+
+    def close(self) -> None:
+        """Detach from shared memory, keeping the last values readable; the creator also unlinks."""
+        if self._mem is None:
+            return
+        self._block = self._block.copy()
+        self._mem.close()
+        if self._owner:
+            self._mem.unlink()
+        self._mem = None
+
+
+class PhaseTimer:
+    """Accumulates time per processing phase while a BatchProcessor handles one batch.
+
+    WriterProcess collects and resets the totals after every batch for
+    processors that expose one as `phases` (see PhasedBatchProcessor).
+
+    Example:
+        ```python
+        with self.phases("compress"):
+            payload = codec.encode(batch_data)
+        with self.phases("write"):
+            f.write(payload)
+        ```
+    """
+
+    def __init__(self) -> None:
+        """Initialize all phases to zero."""
+        self._seconds = dict.fromkeys(PHASES, 0.0)
+
+    @contextmanager
+    def __call__(self, name: str) -> Iterator[None]:
+        """Time a block of work under the given phase.
+
+        Args:
+            name: One of PHASES
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._seconds[name] += time.perf_counter() - start
+
+    def add(self, name: str, seconds: float) -> None:
+        """Credit time measured elsewhere to a phase.
+
+        Args:
+            name: One of PHASES
+            seconds: Time to add
+        """
+        self._seconds[name] += seconds
+
+    def pop(self) -> dict[str, float]:
+        """Return the totals since the last pop and reset them."""
+        seconds = self._seconds
+        self._seconds = dict.fromkeys(PHASES, 0.0)
+        return seconds
+
+
+def _codec_counts(values: np.ndarray) -> CodecCounts:
+    raw, compressed, seconds = values.tolist()
+    return CodecCounts(int(raw), int(compressed), seconds)
+
+
+class CodecMeter:
+    """Accumulates codec input/output bytes and encode time while a BatchProcessor handles one batch.
+
+    Safe to call from compression threads. WriterProcess collects and resets
+    the totals after every batch for processors that expose one as
+    `codec_meter` (see MeteredBatchProcessor), and publishes them as the
+    compression ratio and speed fields of StreamStatus.
+
+    Example:
+        ```python
+        start = time.perf_counter()
+        payload = codec.encode(chunk)
+        self.codec_meter.add(chunk.nbytes, len(payload), time.perf_counter() - start)
+        ```
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counts to zero."""
+        self._lock = threading.Lock()
+        self._counts = [0, 0, 0.0]
+
+    def __getstate__(self) -> dict:
+        """Drop the lock when pickling; a fresh one is created in the subprocess."""
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore state with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, raw_bytes: int, compressed_bytes: int, seconds: float) -> None:
+        """Record one encoded buffer.
+
+        Args:
+            raw_bytes: Uncompressed size
+            compressed_bytes: Encoded size
+            seconds: Time spent encoding it
+        """
+        with self._lock:
+            self._counts[0] += raw_bytes
+            self._counts[1] += compressed_bytes
+            self._counts[2] += seconds
+
+    def pop(self) -> CodecCounts | None:
+        """Return the counts since the last pop and reset them (None if nothing was encoded)."""
+        with self._lock:
+            raw, compressed, seconds = self._counts
+            self._counts = [0, 0, 0.0]
+        return CodecCounts(raw, compressed, seconds) if raw else None
+
+
+class BatchTrace:
+    """Append-only JSONL trace with one record per processed batch.
+
+    Each line holds the batch index, wall-clock start time, frame and byte
+    counts, handoff, slot wait and batch time in milliseconds, plus the
+    per-phase breakdown, codec counts and adaptive codec level when the
+    processor reports them.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open the trace file for appending.
+
+        Args:
+            path: JSONL file to append to
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", buffering=1)
+
+    def record(
+        self,
+        batch_idx: int,
+        started_at: float,
+        *,
+        frames: int,
+        nbytes: int,
+        seconds: float,
+        handoff_s: float,
+        slot_wait_s: float,
+        phases: dict[str, float] | None,
+        codec: CodecCounts | None = None,
+        codec_level: int | None = None,
+    ) -> None:
+        """Write one batch record."""
+        record = {
+            "batch": batch_idx,
+            "t": started_at,
+            "frames": frames,
+            "bytes": nbytes,
+            "batch_ms": seconds * 1000,
+            "handoff_ms": handoff_s * 1000,
+            "slot_wait_ms": slot_wait_s * 1000,
+        }
+        if phases is not None:
+            record["phases_ms"] = {name: phase_s * 1000 for name, phase_s in phases.items()}
+        if codec is not None:
+            record["codec"] = {
+                "raw_bytes": codec.raw_bytes,
+                "compressed_bytes": codec.compressed_bytes,
+                "ratio": codec.ratio,
+                "mbs": codec.mbs,
+            }
+        if codec_level is not None:
+            record["codec_level"] = codec_level
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        """Close the trace file."""
+        self._file.close()
@@ -1,12 +1,17 @@
 """Core type definitions for voxel writers.
 
-Re-exports shared types from ome-zarr-writer for a unified API.
+Re-exports shared types from ome-zarr-writer for a unified API, extending
+StreamStatus with metrics reported by the voxel writer engine.
 """
 
 from __future__ import annotations
 
+from enum import StrEnum
 from math import ceil
 from pathlib import Path
+from typing import Self
+
+import numpy as np
 
 # Re-export types from ome-zarr-writer
 from ome_zarr_writer import (
@@ -15,21 +20,26 @@ from ome_zarr_writer import (
     Dtype,
     FrameShape,
     StreamMetrics,
-    StreamStatus,
     VolumeShape,
     VoxelSize,
 )
+from ome_zarr_writer import StreamStatus as _OZWStreamStatus
 from ome_zarr_writer.types import Vec3D
-from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator, model_validator
+
+from .noise import DEFAULT_GAIN, DEFAULT_READ_NOISE
 
 # Position is Vec3D[float] - used for physical positioning in multi-tile acquisitions
 Position = Vec3D[float]
 
 __all__ = [
+    "BdvWriterConfig",
     "BufferStage",
     "BufferStatus",
     "Dtype",
     "FrameShape",
+    "NoiseQuantization",
+    "OverflowPolicy",
     "Position",
     "StreamMetrics",
     "StreamStatus",
@@ -38,6 +48,76 @@ __all__ = [
 ]
 
 
+class StreamStatus(_OZWStreamStatus):
+    """Snapshot of a writer stream's progress and performance.
+
+    Extends the ome-zarr-writer StreamStatus with writer-engine metrics.
+    Extra fields have defaults so writers that don't track them can omit them.
+    """
+
+    handoff_latency_ms: float = Field(
+        default=0.0,
+        description="Mean delay between a batch being submitted and the writer picking it up (ms)",
+    )
+    overflow_policy: str = Field(default="block", description="Overflow policy in effect (block, drop, spill)")
+    frames_dropped: int = Field(default=0, description="Frames discarded because the ring was full (drop policy)")
+    spilled_bytes: int = Field(default=0, description="Bytes written to the scratch spill file (spill policy)")
+    max_queue_depth: int = Field(default=0, description="Most batches observed waiting for the writer at once")
+    batch_ms_p50: float = Field(default=0.0, description="Median batch processing time over recent batches (ms)")
+    batch_ms_p95: float = Field(default=0.0, description="95th percentile batch processing time (ms)")
+    batch_ms_p99: float = Field(default=0.0, description="99th percentile batch processing time (ms)")
+    slot_wait_ms_mean: float = Field(default=0.0, description="Mean time the producer waited for a free slot (ms)")
+    slot_wait_ms_max: float = Field(default=0.0, description="Longest wait for a free slot over recent batches (ms)")
+    phase_ms: dict[str, float] = Field(
+        default_factory=dict,
+        description="Total time per processing phase (quantize, compress, checksum, downsample, write, fsync) (ms)",
+    )
+    frames_drained: int = Field(default=0, description="Frames moved from scratch to the target (staged writers)")
+    drain_backlog: int = Field(default=0, description="Frames on scratch not yet drained (staged writers)")
+    drain_rate_gbs: float = Field(default=0.0, description="Mean drain throughput to the target (GB/s)")
+    drain_error: str = Field(default="", description="Why draining to the target failed (empty = no failure)")
+    failed_sinks: list[str] = Field(
+        default_factory=list,
+        description="Sinks that failed and stopped writing their output (fan-out writers)",
+    )
+    pyramid_levels_done: int = Field(default=0, description="Deferred pyramid levels complete (deferred pyramids)")
+    pyramid_progress: float = Field(default=0.0, description="Fraction of deferred pyramid shards built (0-1)")
+    codec: str = Field(default="", description="Codec in use, as a codec registry name with level")
+    compression_ratio: float = Field(default=0.0, description="Raw over compressed bytes for the job (0 = unmeasured)")
+    compress_mbs: float = Field(default=0.0, description="Encode speed per compression thread for the job (MB/s)")
+    batch_compression_ratio: float = Field(default=0.0, description="Raw over compressed bytes of the last batch")
+    batch_compress_mbs: float = Field(default=0.0, description="Encode speed per compression thread, last batch (MB/s)")
+
+
+class OverflowPolicy(StrEnum):
+    """What a writer does with a new frame when every ring slot is still being flushed.
+
+    BLOCK waits for a free slot, stalling the caller (and the camera).
+    DROP discards the frame and counts it, keeping the caller real-time.
+    SPILL appends the frame to a scratch file and replays it, in order, once slots free up.
+    """
+
+    BLOCK = "block"
+    DROP = "drop"
+    SPILL = "spill"
+
+
+class NoiseQuantization(BaseModel):
+    """Camera noise model and step for photon-noise-bounded lossy compression (see NoiseQuantizer).
+
+    Pixels are rounded to a grid spaced `step` noise standard deviations
+    apart before the lossless codec runs; the error per pixel stays within
+    step/2 sigma plus a small constant.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    step: float = Field(default=1.0, gt=0, description="Quantization step in units of each pixel's noise sigma")
+    gain: float = Field(default=DEFAULT_GAIN, gt=0, description="Camera conversion gain (ADU per electron)")
+    offset: float = Field(default=0.0, description="Camera baseline / dark level (ADU)")
+    read_noise: float = Field(default=DEFAULT_READ_NOISE, ge=0, description="Camera read noise (electrons RMS)")
+
+
 class WriterConfig(BaseModel):
     """Unified configuration for all voxel writers.
 
@@ -84,6 +164,15 @@ class WriterConfig(BaseModel):
     channel_name: str = Field(default="Channel0", description="Display name for the channel")
     channel_idx: int = Field(default=0, ge=0, description="Channel index for multi-channel data")
     compression: str | None = Field(default=None, description="Compression codec (format-specific)")
+    adaptive_compression: bool = Field(
+        default=False,
+        description="Lower/raise the codec level per batch so writing keeps up with acquisition (sharded OME-Zarr, "
+        "OME-TIFF zstd/deflate)",
+    )
+    lossy: NoiseQuantization | None = Field(
+        default=None,
+        description="Quantize pixels within their photon noise before compressing (not OMEZarrWriter). None = lossless",
+    )
     chunk_shape: VolumeShape | None = Field(
         default=None,
         description="Chunk dimensions (z, y, x). Imaris uses y/x for block size. None = auto",
@@ -94,12 +183,45 @@ class WriterConfig(BaseModel):
     )
     max_level: int = Field(default=5, ge=0, le=7, description="Maximum pyramid level (0-7)")
     batch_z_shards: int = Field(default=1, gt=0, description="Number of z-shards per batch")
+    pack_12bit: bool = Field(
+        default=False,
+        description="Pack 12-bit pixels (MONO10/12) two per three bytes in writer shared memory. Requires uint16",
+    )
+    overflow_policy: OverflowPolicy = Field(
+        default=OverflowPolicy.BLOCK,
+        description="Action taken when the writer falls behind and the ring is full",
+    )
+    spill_dir: Path | None = Field(
+        default=None,
+        description="Scratch directory for the spill overflow policy. None = system temp directory",
+    )
+    trace_path: Path | None = Field(
+        default=None,
+        description="Append one JSONL record per processed batch (timings, slot wait, phases) to this file",
+    )
 
-    @field_validator("path", mode="before")
+    @field_validator("path", "spill_dir", "trace_path", mode="before")
     @classmethod
-    def _coerce_path(cls, v: str | Path) -> Path:
+    def _coerce_path(cls, v: str | Path | None) -> Path | None:
         return Path(v) if isinstance(v, str) else v
 
+    @model_validator(mode="after")
+    def _check_packing(self) -> Self:
+        if self.pack_12bit:
+            if self.dtype != Dtype.UINT16:
+                msg = f"pack_12bit requires dtype uint16, got {self.dtype.value}"
+                raise ValueError(msg)
+            if (self.frame_shape.y * self.frame_shape.x) % 2:
+                msg = "pack_12bit requires an even number of pixels per frame"
+                raise ValueError(msg)
+        return self
+
+    @computed_field
+    @property
+    def frame_bytes(self) -> int:
+        """Size of one unpacked frame in bytes."""
+        return self.frame_shape.y * self.frame_shape.x * np.dtype(self.dtype.value).itemsize
+
     @computed_field
     @property
     def num_batches(self) -> int:
@@ -137,3 +259,9 @@ class WriterConfig(BaseModel):
         z_start = batch_idx * self.batch_size
         z_end = min(z_start + self.batch_size, self.frame_count)
         return z_start, z_end
+
+
+class BdvWriterConfig(WriterConfig):
+    """WriterConfig for BdvWriter, adding the light-sheet angle used for deskewing."""
+
+    theta_deg: float = Field(default=0.0, description="Light-sheet angle used for the deskew affine (degrees)")
@@ -0,0 +1,156 @@
+"""ZarrStore - One Zarr v3 store holding many tiles and channels.
+
+Each tile is a group named after `WriterConfig.name`, and each channel of a
+tile is an OME-Zarr image group inside it named after `channel_name`:
+
+    <store>.ome.zarr/
+        zarr.json                     root group + inline consolidated metadata
+        <tile>/zarr.json              tile group (position in attributes)
+        <tile>/<channel>/zarr.json    OME-Zarr multiscales (scale + tile translation)
+        <tile>/<channel>/0/...        sharded level-0 array
+
+Every node's metadata is also mirrored into the root's inline
+`consolidated_metadata` as it is written, so readers can list the whole
+acquisition from one file. The root is rewritten once per `write_nodes()`
+call, so writers batch all nodes of a tile (or pyramid level) into one update.
+Updates are serialized with an OS lock on `.zarr.lock` because writers and
+background pyramid builders in other processes share the store.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_fd(fd: int) -> None:
+        # LK_LOCK gives up after ~10 s of retries; keep waiting like flock does
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            except OSError:
+                continue
+            return
+
+    def _unlock_fd(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def replace_json(path: Path, meta: dict[str, Any], *, indent: int | None = 2) -> None:
+    """Atomically replace a zarr.json (or any small JSON) file."""
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(meta, indent=indent))
+    tmp.replace(path)
+
+
+class ZarrStore:
+    """Root of a multi-tile, multi-channel store with inline consolidated metadata.
+
+    Example:
+        ```python
+        store = ZarrStore("/data/output/experiment_001.ome.zarr")
+        store.write_nodes({"tile_000/488": image_group_meta, "tile_000/488/0": array_meta})
+        store.consolidated()  # {"tile_000/488": {...}, "tile_000/488/0": {...}}
+        ```
+    """
+
+    def __init__(self, root: Path | str) -> None:
+        """Open the store, creating the root group if it does not exist.
+
+        Args:
+            root: Store root directory
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            if not (self.root / "zarr.json").exists():
+                self._replace_root({})
+
+    @staticmethod
+    def find_root(path: Path | str) -> ZarrStore | None:
+        """Store containing `path`, if `path` is inside one (nearest ancestor with consolidated metadata)."""
+        for parent in Path(path).resolve().parents:
+            meta_path = parent / "zarr.json"
+            if meta_path.exists() and "consolidated_metadata" in json.loads(meta_path.read_text()):
+                return ZarrStore(parent)
+        return None
+
+    def write_node(self, key: str, meta: dict[str, Any]) -> None:
+        """Write a single node; see write_nodes()."""
+        self.write_nodes({key: meta})
+
+    def write_nodes(self, nodes: Mapping[str, dict[str, Any]]) -> None:
+        """Write nodes' zarr.json files and mirror them into the consolidated metadata in one update.
+
+        Args:
+            nodes: Zarr v3 group or array metadata keyed by node path relative
+                to the root, e.g. {"tile_000/488": {...}, "tile_000/488/0": {...}}
+        """
+        for key in nodes:
+            (self.root / key).mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            for key, meta in nodes.items():
+                replace_json(self.root / key / "zarr.json", meta)
+            consolidated = self.consolidated()
+            consolidated.update(nodes)
+            self._replace_root(consolidated)
+
+    def ensure_group(self, key: str, attributes: dict[str, Any] | None = None) -> None:
+        """Create a plain group node unless it already exists."""
+        if key not in self.consolidated():
+            self.write_node(key, self.group_meta(attributes))
+
+    @staticmethod
+    def group_meta(attributes: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Zarr v3 metadata of a plain group."""
+        return {"zarr_format": 3, "node_type": "group", "attributes": attributes or {}}
+
+    def consolidated(self) -> dict[str, dict[str, Any]]:
+        """Metadata of every node written so far, keyed by path relative to the root."""
+        root = json.loads((self.root / "zarr.json").read_text())
+        return dict(root.get("consolidated_metadata", {}).get("metadata", {}))
+
+    def _replace_root(self, consolidated: dict[str, dict[str, Any]]) -> None:
+        """Rewrite the root zarr.json; compact, since it grows with every tile."""
+        meta = {
+            "zarr_format": 3,
+            "node_type": "group",
+            "attributes": {"ome": {"version": "0.5"}},
+            "consolidated_metadata": {"kind": "inline", "must_understand": False, "metadata": consolidated},
+        }
+        replace_json(self.root / "zarr.json", meta, indent=None)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive OS lock on the store's lock file for a metadata update.
+
+        The lock file is never deleted, and the OS releases the lock if the
+        holder dies, so there is no stale lock to break.
+        """
+        fd = os.open(self.root / ".zarr.lock", os.O_CREAT | os.O_RDWR)
+        try:
+            _lock_fd(fd)
+            try:
+                yield
+            finally:
+                _unlock_fd(fd)
+        finally:
+            os.close(fd)